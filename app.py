@@ -1,220 +1,197 @@
+import hashlib
 import json
+import math
+import mimetypes
 import os
+import re
+import shutil
 import time
 import uuid
-from collections import defaultdict
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
-from queue import Queue
 from threading import Lock, Thread
 
 import cv2
 import numpy as np
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
-from notebook.utils import setup_sam_3d_body
-from sam_3d_body.metadata.mhr70 import pose_info as mhr70_pose_info
-from sam_3d_body.measurements import compute_measurements, MeasurementError
+from notebook.utils import setup_managed_sam_3d_body
+from sam_3d_body.measurements import measure_person, measurement_schema, scale_measurements, MeasurementError
+from sam_3d_body.serving import (
+    GZIP_MIN_BYTES,
+    GZIP_SUFFIX,
+    KEYPOINT_INDICES,
+    KEYPOINT_NAMES,
+    MHR70_NAMES,
+    AsyncFileWriter,
+    BatchStore,
+    CompressedBodyCache,
+    ImageValidationError,
+    InFlightJobs,
+    InferenceEngine,
+    PROMETHEUS_CONTENT_TYPE,
+    RIG_FIELDS,
+    MetricsRegistry,
+    MicroBatcher,
+    MovingAverage,
+    PersonRig,
+    QueueFullError,
+    ResultCache,
+    SessionEventBroker,
+    SessionStore,
+    StorageJanitor,
+    accepts_gzip,
+    build_rig_glb,
+    decode_image,
+    downscale_image,
+    extract_mhr_template,
+    freeze_template,
+    gzip_bytes,
+    parse_counts,
+    parse_resolutions,
+    prepare_person_rigs,
+    quantize_weights,
+    result_cache_key,
+    validate_image,
+    warmup_estimator,
+    with_precompressed,
+)
 
 app = Flask(__name__, static_folder='frontend/dist')
 CORS(app)
 
 UPLOAD_FOLDER = Path("uploads")
 OUTPUT_FOLDER = Path("outputs")
+# Server-side databases; kept outside OUTPUT_FOLDER, which is served over HTTP
+DATA_DIR = Path(os.environ.get('DATA_DIR', 'data'))
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 OUTPUT_FOLDER.mkdir(exist_ok=True)
+DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
-
-# ---------------------------------------------------------------------------
-# Rigged export helpers (integrated from inference-demo.py)
-# ---------------------------------------------------------------------------
 
-def rotate_points_x(points: np.ndarray) -> np.ndarray:
-    """Rotate points for coordinate system conversion."""
-    rotated = np.array(points, dtype=np.float32, copy=True)
-    rotated[..., 1] *= -1.0
-    rotated[..., 2] *= -1.0
-    return rotated
-
-
-def _build_mhr70_skeleton():
-    """Build skeleton structure from MHR70 metadata."""
-    kp_info = mhr70_pose_info["keypoint_info"]
-    skeleton_info = mhr70_pose_info["skeleton_info"]
-
-    joint_names = [kp_info[i]["name"] for i in range(len(kp_info))]
-    name_to_idx = {name: idx for idx, name in enumerate(joint_names)}
-
-    adjacency = {idx: [] for idx in range(len(joint_names))}
-    for link_def in skeleton_info.values():
-        joint_a, joint_b = link_def["link"]
-        ia, ib = name_to_idx[joint_a], name_to_idx[joint_b]
-        adjacency[ia].append(ib)
-        adjacency[ib].append(ia)
-
-    root_name = "neck" if "neck" in name_to_idx else joint_names[0]
-    root_idx = name_to_idx[root_name]
-    parents = [-1] * len(joint_names)
-    queue = [root_idx]
-    visited = {root_idx}
-
-    while queue:
-        current = queue.pop(0)
-        for nb in adjacency[current]:
-            if nb in visited:
-                continue
-            parents[nb] = current
-            visited.add(nb)
-            queue.append(nb)
+def _env_int(name, default):
+    return int(os.environ.get(name, str(default)))
 
-    return joint_names, parents
 
+def _env_float(name, default):
+    return float(os.environ.get(name, str(default)))
 
-MHR70_NAMES, _ = _build_mhr70_skeleton()
-MHR70_NAME_TO_IDX = {name: idx for idx, name in enumerate(MHR70_NAMES)}
 
-# Use ALL keypoint names for animation targets (including fingers)
-ANIMATION_NAMES = MHR70_NAMES
+# Single uploads are limited to 16MB; the request limit leaves room for batch jobs
+MAX_UPLOAD_BYTES = 16 * 1024 * 1024
+BATCH_UPLOAD_MAX_MB = max(16, _env_int('BATCH_UPLOAD_MAX_MB', 512))
+app.config['MAX_CONTENT_LENGTH'] = BATCH_UPLOAD_MAX_MB * 1024 * 1024
 
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
+RIG_GLB_FILENAME = "rig.glb"
+# Same rig with int16 positions and uint8 skinning (KHR_mesh_quantization)
+RIG_QUANTIZED_GLB_FILENAME = "rig_q.glb"
+RIG_ENCODINGS = ("float", "quantized")
+mimetypes.add_type("model/gltf-binary", ".glb")
+
+# Inference throughput/latency knobs. Workers decode, resize and export in
+# parallel while GPU inference is serialized; each worker pulls a micro-batch
+# of up to BATCH_MAX_IMAGES sessions that arrived within BATCH_MAX_WAIT_MS.
+INFERENCE_WORKERS = max(1, _env_int('INFERENCE_WORKERS', 2))
+BATCH_MAX_IMAGES = max(1, _env_int('BATCH_MAX_IMAGES', 4))
+BATCH_MAX_WAIT_MS = max(0.0, _env_float('BATCH_MAX_WAIT_MS', 50))
+# Sessions allowed to wait for a worker; further uploads get 429 (0 = unbounded)
+MAX_QUEUE_DEPTH = max(0, _env_int('MAX_QUEUE_DEPTH', 32))
+# Per-session processing time assumed until real jobs have been measured
+DEFAULT_JOB_SECONDS = 10.0
+MAX_RETRY_AFTER_SECONDS = 300
+# Retry-After for requests that need the rig template while the model loads
+MODEL_LOADING_RETRY_AFTER_SECONDS = 10
+# Batch jobs (/api/batches): images per request and background sessions
+# allowed to wait at once
+BATCH_JOB_MAX_IMAGES = max(1, _env_int('BATCH_JOB_MAX_IMAGES', 1000))
+BATCH_MAX_BACKLOG = max(1, _env_int('BATCH_MAX_BACKLOG', 10000))
+MAX_LONG_EDGE = 2048
+# Uploads are checked against these limits from the image header alone
+MIN_IMAGE_EDGE = 32
+MAX_IMAGE_PIXELS = max(1, _env_int('MAX_IMAGE_MEGAPIXELS', 100)) * 1_000_000
+# Set LIGHTWEIGHT_MODE=true to reduce VRAM usage (disables FOV estimation, uses default FOV)
+LIGHTWEIGHT_MODE = os.environ.get('LIGHTWEIGHT_MODE', 'false').lower() == 'true'
+INFERENCE_TYPE = os.environ.get('INFERENCE_TYPE', 'full')
+# INFERENCE_ENGINE=process runs decoding, inference and rig array export in
+# ENGINE_PROCESSES separate processes so the web tier keeps its own GIL;
+# per-person arrays come back through shared memory. 'thread' (default)
+# runs the estimator inside the worker threads.
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'thread').lower()
+ENGINE_PROCESSES = max(1, _env_int('ENGINE_PROCESSES', 1))
+# Sessions whose engine job takes longer fail instead of holding a worker
+# forever (0 waits indefinitely).
+ENGINE_JOB_TIMEOUT_SECONDS = max(0.0, _env_float('ENGINE_JOB_TIMEOUT_SECONDS', 300))
+# Model components (body model, detector, FOV estimator) are loaded on first
+# use. Components unused for MODEL_IDLE_UNLOAD_SECONDS are released (0 keeps
+# them resident), to CPU memory with MODEL_OFFLOAD_TO_CPU=true so they come
+# back quickly, otherwise entirely.
+MODEL_IDLE_UNLOAD_SECONDS = max(0.0, _env_float('MODEL_IDLE_UNLOAD_SECONDS', 0))
+MODEL_OFFLOAD_TO_CPU = os.environ.get('MODEL_OFFLOAD_TO_CPU', 'false').lower() == 'true'
+# Startup warmup on synthetic images: one detector pass per resolution and one
+# body-model pass per resolution and person count; the server reports ready
+# only afterwards. An empty WARMUP_RESOLUTIONS skips warmup.
+WARMUP_RESOLUTIONS = parse_resolutions(os.environ.get('WARMUP_RESOLUTIONS', '1536x2048,768x1024'))
+WARMUP_PERSONS = parse_counts(os.environ.get('WARMUP_PERSONS', '1,2'))
+
+# Session index lives in DATA_DIR; hot rig payloads are cached in memory up
+# to SESSION_CACHE_MB and idle sessions expire after the TTL.
+SESSION_DB_PATH = DATA_DIR / "sessions.sqlite3"
+SESSION_CACHE_MB = max(0.0, _env_float('SESSION_CACHE_MB', 512))
+SESSION_TTL_HOURS = max(0.0, _env_float('SESSION_TTL_HOURS', 24))
+
+# Re-uploads of identical bytes under identical settings reuse the earlier
+# completed session; RESULT_CACHE_MB=0 disables the cache.
+RESULT_CACHE_DB_PATH = DATA_DIR / "result_cache.sqlite3"
+RESULT_CACHE_MB = max(0.0, _env_float('RESULT_CACHE_MB', 2048))
+
+# Unscaled measurements are computed once per session after export and kept
+# for this many sessions; target heights only rescale them.
+MEASUREMENTS_FILENAME = "measurements.json"
+MEASUREMENT_CACHE_SESSIONS = max(0, _env_int('MEASUREMENT_CACHE_SESSIONS', 1024))
+# Per-request limits of POST /api/measurements/bulk
+BULK_MEASUREMENT_MAX_SESSIONS = 100
+BULK_MEASUREMENT_MAX_HEIGHTS = 100
+
+# Storage janitor: deletes uploads of finished sessions, expires sessions past
+# the TTL and evicts least recently used ones beyond STORAGE_QUOTA_MB (0 = no
+# quota). File operations are paced and deferred while workers are busy.
+STORAGE_QUOTA_MB = max(0.0, _env_float('STORAGE_QUOTA_MB', 0))
+JANITOR_INTERVAL_SECONDS = max(1.0, _env_float('JANITOR_INTERVAL_SECONDS', 60))
+JANITOR_MAX_OPS_PER_SECOND = max(0.0, _env_float('JANITOR_MAX_OPS_PER_SECOND', 20))
+
+# Skeleton/skinning template extracted from the MHR buffers, cached across restarts
+TEMPLATE_CACHE_DIR = Path(os.environ.get('TEMPLATE_CACHE_DIR', DATA_DIR / "template_cache"))
 
-def extract_mhr_template(mhr_module, max_influences=4):
-    """Extract skeleton and skinning data from MHR module."""
-    buffers = dict(mhr_module.named_buffers())
-
-    joint_parents = (
-        buffers["character_torch.skeleton.joint_parents"].detach().cpu().numpy().astype(np.int32)
-    )
-    joint_offsets = (
-        buffers["character_torch.skeleton.joint_translation_offsets"].detach().cpu().numpy()
-        / 100.0
-    )
-    joint_offsets = rotate_points_x(joint_offsets)
-    num_vertices = int(buffers["character_torch.mesh.rest_vertices"].shape[0])
-
-    vert_indices = (
-        buffers["character_torch.linear_blend_skinning.vert_indices_flattened"]
-        .detach()
-        .cpu()
-        .numpy()
-        .astype(np.int64)
-    )
-    skin_indices = (
-        buffers["character_torch.linear_blend_skinning.skin_indices_flattened"]
-        .detach()
-        .cpu()
-        .numpy()
-        .astype(np.int64)
-    )
-    skin_weights = (
-        buffers["character_torch.linear_blend_skinning.skin_weights_flattened"]
-        .detach()
-        .cpu()
-        .numpy()
-        .astype(np.float32)
-    )
-
-    per_vertex = defaultdict(list)
-    for vid, jid, weight in zip(vert_indices, skin_indices, skin_weights):
-        per_vertex[int(vid)].append((float(weight), int(jid)))
-
-    skin_index_array = np.zeros((num_vertices, max_influences), dtype=np.int32)
-    skin_weight_array = np.zeros((num_vertices, max_influences), dtype=np.float32)
-
-    for vid in range(num_vertices):
-        entries = per_vertex.get(vid, [])
-        if not entries:
-            continue
-        entries.sort(key=lambda item: item[0], reverse=True)
-        selected = entries[:max_influences]
-        total = sum(weight for weight, _ in selected) or 1.0
-        for slot, (weight, jid) in enumerate(selected):
-            skin_index_array[vid, slot] = jid
-            skin_weight_array[vid, slot] = weight / total
-
-    # Use MHR70_NAMES for proper joint naming instead of generic joint_{idx}
-    joint_names = MHR70_NAMES[:len(joint_parents)] if len(MHR70_NAMES) >= len(joint_parents) else [f"joint_{idx}" for idx in range(len(joint_parents))]
-    root_index = int(np.where(joint_parents == -1)[0][0])
-
-    print(f"[Extract] Using {len(joint_names)} joint names from MHR70_NAMES")
-    print(f"[Extract] Sample joint names: {joint_names[:10]}")
-
-    return {
-        "joint_names": joint_names,
-        "joint_parents": joint_parents,
-        "joint_offsets": joint_offsets,
-        "skin_indices": skin_index_array,
-        "skin_weights": skin_weight_array,
-        "root_index": root_index,
-    }
-
-
-def match_keypoints_to_joints(keypoints, joint_positions):
-    """Map semantic keypoints to skeleton joints."""
-    target_mapping = {}
-
-    # Map all available keypoints to nearest joints
-    for name, kp_idx in MHR70_NAME_TO_IDX.items():
-        if kp_idx >= len(keypoints):
-            continue
-
-        target_pos = keypoints[kp_idx]
-        dists = np.linalg.norm(joint_positions - target_pos[None, :], axis=1)
-        target_mapping[name] = int(np.argmin(dists))
-
-    return target_mapping
-
-
-def prepare_person_rig(person_output, template):
-    """Prepare rig data for a single person."""
-    vertices = np.array(person_output["pred_vertices"], dtype=np.float32)
-    joint_positions = np.array(person_output["pred_joint_coords"], dtype=np.float32)
-    joint_positions = joint_positions[: template["joint_parents"].shape[0]]
-    keypoints = np.array(person_output["pred_keypoints_3d"], dtype=np.float32)
-
-    cam_t = person_output.get("pred_cam_t")
-    if cam_t is not None:
-        vertices = vertices + cam_t
-        joint_positions = joint_positions + cam_t
-        keypoints = keypoints + cam_t
-
-    root_idx = template["root_index"]
-    root_offset = joint_positions[root_idx].copy()
-
-    vertices = vertices - root_offset
-    joint_positions = joint_positions - root_offset
-    keypoints = keypoints - root_offset
-
-    vertices = rotate_points_x(vertices)
-    joint_positions = rotate_points_x(joint_positions)
-    keypoints = rotate_points_x(keypoints)
-    root_offset = rotate_points_x(root_offset[None])[0]
-
-    target_mapping = match_keypoints_to_joints(keypoints, joint_positions)
-
-    return {
-        "vertices": np.round(vertices, 6),
-        "joint_positions": np.round(joint_positions, 6),
-        "keypoints": np.round(keypoints, 6),
-        "target_mapping": target_mapping,
-        "root_offset": root_offset,
-    }
+# ---------------------------------------------------------------------------
+# Rigged export helpers (integrated from inference-demo.py)
+# ---------------------------------------------------------------------------
 
+def export_rigged_models(outputs, rig_template):
+    """Build rigged models with skeleton data for every detected person.
 
-def export_rigged_models(predictions, faces, rig_template, export_dir="meshes"):
-    """Export rigged models with skeleton and skinning data."""
-    os.makedirs(export_dir, exist_ok=True)
-    rig_files = []
-    skin_indices_serialized = rig_template["skin_indices"].tolist()
-    skin_weights_serialized = rig_template["skin_weights"].tolist()
+    `outputs` are the estimator's per-person predictions, or the arrays
+    `prepare_person_rigs` already built from them in the inference engine
+    process. Returns one `PersonRig` per person, in memory only; the arrays
+    stay float32 and reference the shared template. Use `render_rig_files`
+    to serialize them for disk.
+    """
+    if isinstance(outputs, dict):
+        rigs = outputs
+    else:
+        rigs = prepare_person_rigs(outputs, rig_template) if outputs else {}
+    num_persons = len(rigs.get("vertices", ()))
+    if not num_persons:
+        return []
 
     print(f"[Export] Total keypoint names in MHR70: {len(MHR70_NAMES)}")
-    print(f"[Export] Keypoint names: {MHR70_NAMES}")
 
     # Identify head joint index (MHR template often stores head around joint_112/113)
     head_joint_idx = None
@@ -225,79 +202,309 @@ def export_rigged_models(predictions, faces, rig_template, export_dir="meshes"):
             print(f"[Export] Head joint candidate '{candidate}' found at index {head_joint_idx}")
             break
 
-    for idx, person_output in enumerate(predictions, start=1):
-        rig_info = prepare_person_rig(person_output, rig_template)
+    keypoint_names = np.asarray(KEYPOINT_NAMES, dtype=object)
+    template_joint_names = np.asarray(rig_template["joint_names"], dtype=object)
+
+    persons = []
+    for idx in range(num_persons):
+        target_indices = rigs["target_indices"][idx]
+        found = np.flatnonzero(target_indices >= 0)
+        target_mapping = dict(zip(keypoint_names[found], target_indices[found].tolist()))
 
-        print(f"[Export] Person {idx} animation_targets keys: {list(rig_info['target_mapping'].keys())}")
-        print(f"[Export] Person {idx} total animation targets: {len(rig_info['target_mapping'])}")
+        # Name each joint after the first keypoint mapped to it; others keep
+        # their template name
+        joint_names = template_joint_names.copy()
+        mapped_joints, first = np.unique(target_indices[found], return_index=True)
+        joint_names[mapped_joints] = keypoint_names[found[first]]
 
         # Ensure head control is available even if MHR70 metadata lacks explicit head joint
-        if head_joint_idx is not None and "head" not in rig_info["target_mapping"]:
-            rig_info["target_mapping"]["head"] = head_joint_idx
-            print(f"[Export] Person {idx} - Added synthetic 'head' target at joint index {head_joint_idx}")
-
-        # Create better joint names using animation_targets mapping
-        # Map skeleton joint indices to MHR70 keypoint names where available
-        joint_idx_to_name = {}
-        for kp_name, joint_idx in rig_info["target_mapping"].items():
-            if joint_idx not in joint_idx_to_name:
-                joint_idx_to_name[joint_idx] = kp_name
-        
-        # Build joint_names array: use mapped names where available, otherwise use joint_{idx}
-        improved_joint_names = []
-        for joint_idx in range(len(rig_template["joint_names"])):
-            if joint_idx in joint_idx_to_name:
-                improved_joint_names.append(joint_idx_to_name[joint_idx])
-            else:
-                # Use original name if it's not joint_{idx}, otherwise keep joint_{idx}
-                original_name = rig_template["joint_names"][joint_idx]
-                if original_name.startswith("joint_"):
-                    improved_joint_names.append(original_name)
-                else:
-                    improved_joint_names.append(original_name)
-
-        rig_payload = {
-            "mesh": {
-                "vertices": rig_info["vertices"].tolist(),
-                "faces": faces.astype(int).tolist(),
-                "skinIndices": skin_indices_serialized,
-                "skinWeights": skin_weights_serialized,
-            },
-            "skeleton": {
-                "joint_names": improved_joint_names,
-                "parents": rig_template["joint_parents"].tolist(),
-                "rest_offsets": rig_template["joint_offsets"].tolist(),
-                "joint_positions": rig_info["joint_positions"].tolist(),
-            },
-            "animation_targets": rig_info["target_mapping"],
-            "keypoints": [
-                {"name": name, "position": rig_info["keypoints"][kp_idx].tolist()}
-                for name, kp_idx in MHR70_NAME_TO_IDX.items()
-            ],
-            "metadata": {
-                "focal_length": float(person_output["focal_length"]),
-                "bbox": person_output["bbox"].tolist(),
-                "root_translation": rig_info["root_offset"].tolist(),
+        if head_joint_idx is not None and "head" not in target_mapping:
+            target_mapping["head"] = head_joint_idx
+            if head_joint_idx not in mapped_joints:
+                joint_names[head_joint_idx] = "head"
+
+        print(f"[Export] Person {idx + 1} total animation targets: {len(target_mapping)}")
+
+        persons.append(PersonRig(
+            template=rig_template,
+            vertices=rigs["vertices"][idx],
+            joint_positions=rigs["joint_positions"][idx],
+            keypoints=np.ascontiguousarray(rigs["keypoints"][idx, KEYPOINT_INDICES]),
+            keypoint_names=KEYPOINT_NAMES,
+            joint_names=tuple(joint_names.tolist()),
+            animation_targets=target_mapping,
+            focal_length=float(rigs["focal_length"][idx]),
+            bbox=np.asarray(rigs["bbox"][idx], dtype=np.float32),
+            root_translation=rigs["root_offset"][idx],
+        ))
+
+    return persons
+
+
+def render_rig_files(persons, faces, rig_template):
+    """Serialize a session's rigs into `{filename: bytes}` for persistence.
+
+    Produces one person_N_rig.json per person plus a single skinned rig.glb
+    holding every person. The JSON payloads only carry per-person arrays;
+    faces, skinning and the joint hierarchy are shared via the template
+    identified by `rig_template["template_hash"]`.
+    """
+    files = {}
+    glb_persons = []
+    parents_serialized = rig_template["joint_parents"].tolist()
+    rest_offsets_serialized = rig_template["joint_offsets"].tolist()
+
+    for idx, person in enumerate(persons, start=1):
+        rig_payload = person.to_payload()
+        files[f"person_{idx}_rig.json"] = json.dumps(rig_payload, separators=(",", ":")).encode("utf-8")
+
+        glb_persons.append({
+            "name": f"person_{idx}",
+            "vertices": person.vertices,
+            "joint_positions": person.joint_positions,
+            "joint_names": person.joint_names,
+            "extras": {
+                **{key: value for key, value in rig_payload.items() if key != "mesh"},
+                "skeleton": {
+                    **rig_payload["skeleton"],
+                    "parents": parents_serialized,
+                    "rest_offsets": rest_offsets_serialized,
+                },
             },
-        }
+        })
 
-        rig_path = os.path.join(export_dir, f"person_{idx}_rig.json")
-        with open(rig_path, "w", encoding="utf-8") as f:
-            json.dump(rig_payload, f, indent=2)
-        rig_files.append(rig_path)
+    if glb_persons:
+        glb_args = (
+            glb_persons,
+            faces,
+            rig_template["skin_indices"],
+            rig_template["skin_weights"],
+            rig_template["joint_parents"],
+        )
+        files[RIG_GLB_FILENAME] = build_rig_glb(*glb_args)
+        files[RIG_QUANTIZED_GLB_FILENAME] = build_rig_glb(*glb_args, quantize=True)
+    return files
 
-    return rig_files
+
+def build_template_asset(rig_template, faces):
+    """Serialize the shared rig template once and derive its content hash.
+
+    Returns `(template_hash, body, quantized_body)`: the JSON documents
+    served by /api/template, with float skin weights and with uint8 skin
+    weights (`weight = value * skinWeightScale`) respectively.
+    """
+    arrays = {
+        "faces": np.asarray(faces, dtype=np.int32),
+        "skinIndices": np.asarray(rig_template["skin_indices"], dtype=np.int32),
+        "skinWeights": np.asarray(rig_template["skin_weights"], dtype=np.float32),
+        "parents": np.asarray(rig_template["joint_parents"], dtype=np.int32),
+        "rest_offsets": np.asarray(rig_template["joint_offsets"], dtype=np.float32),
+    }
+    digest = hashlib.sha256()
+    for key, array in arrays.items():
+        digest.update(key.encode("utf-8"))
+        digest.update(np.ascontiguousarray(array).tobytes())
+    template_hash = digest.hexdigest()[:16]
+
+    document = {"version": template_hash}
+    document.update({key: array.tolist() for key, array in arrays.items()})
+    body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+    document["skinWeights"] = quantize_weights(arrays["skinWeights"]).tolist()
+    document["skinWeightScale"] = 1.0 / 255.0
+    quantized_body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    return template_hash, body, quantized_body
+
+
+# ---------------------------------------------------------------------------
+# Session storage
+# ---------------------------------------------------------------------------
+
+def _rig_file_index(path):
+    return int(path.stem.split("_")[1])
+
+
+def load_session_rig_data(session):
+    """Rehydrate a completed session's rig payloads from its export directory."""
+    if session["status"] != "completed" or not session["session_dir"]:
+        return None
+    RIG_WRITER.wait(session["session_id"], timeout=RIG_WRITE_WAIT_SECONDS)
+    rig_paths = sorted(Path(session["session_dir"]).glob("person_*_rig.json"), key=_rig_file_index)
+    if not rig_paths:
+        return None
+
+    if RIG_TEMPLATE is None:
+        return None
+
+    persons = []
+    for rig_path in rig_paths:
+        with open(rig_path, 'r', encoding='utf-8') as f:
+            persons.append(PersonRig.from_payload(json.load(f), RIG_TEMPLATE))
+    return persons, sum(person.nbytes for person in persons)
+
+
+def remove_session_files(session):
+    """Delete the upload and exported rigs of an evicted session."""
+    # Its queued render, which would release the key, may never run now
+    IN_FLIGHT_JOBS.release_session(session["session_id"])
+    PENDING_UPLOADS.pop(session["session_id"], None)
+    RIG_WRITER.discard(session["session_id"])
+    RESULT_CACHE.discard_session(session["session_id"])
+    drop_session_measurements(session["session_id"])
+    if session.get("session_dir"):
+        shutil.rmtree(session["session_dir"], ignore_errors=True)
+    if session.get("filepath"):
+        Path(session["filepath"]).unlink(missing_ok=True)
+
+
+def move_legacy_database(path):
+    """Move a database that earlier versions kept in OUTPUT_FOLDER to `path`."""
+    legacy = OUTPUT_FOLDER / path.name
+    if path.exists() or not legacy.exists():
+        return
+    for suffix in ("", "-wal", "-shm"):
+        source = legacy.with_name(legacy.name + suffix)
+        if source.exists():
+            shutil.move(str(source), str(path.with_name(path.name + suffix)))
+    print(f"[Storage] Moved {legacy} to {path}")
+
+
+# Latest progress event per session, pushed to SSE and long-poll clients
+SESSION_EVENTS = SessionEventBroker()
+TERMINAL_STATUSES = ("completed", "failed")
+SSE_KEEPALIVE_SECONDS = 15
+LONG_POLL_MAX_SECONDS = 30
+
+# Rig files are serialized and written off the inference workers; written
+# bytes are added to the session's disk usage for the storage janitor
+RIG_WRITER = AsyncFileWriter(on_written=lambda session_id, nbytes: SESSION_STORE.add_disk_bytes(session_id, nbytes))
+RIG_WRITE_WAIT_SECONDS = 30
+
+move_legacy_database(SESSION_DB_PATH)
+BATCH_STORE = BatchStore(SESSION_DB_PATH)
+
+# session_id -> unscaled measurements per person (see get_session_measurements)
+MEASUREMENT_CACHE = OrderedDict()
+MEASUREMENT_CACHE_LOCK = Lock()
+
+move_legacy_database(RESULT_CACHE_DB_PATH)
+RESULT_CACHE = ResultCache(RESULT_CACHE_DB_PATH, max_bytes=int(RESULT_CACHE_MB * 1024 * 1024))
+
+SESSION_STORE = SessionStore(
+    SESSION_DB_PATH,
+    loader=load_session_rig_data,
+    max_cache_bytes=int(SESSION_CACHE_MB * 1024 * 1024),
+    ttl_seconds=SESSION_TTL_HOURS * 3600,
+    on_evict=remove_session_files,
+)
+
+STORAGE_JANITOR = StorageJanitor(
+    SESSION_STORE,
+    quota_bytes=int(STORAGE_QUOTA_MB * 1024 * 1024),
+    interval_seconds=JANITOR_INTERVAL_SECONDS,
+    max_ops_per_second=JANITOR_MAX_OPS_PER_SECOND,
+    is_busy=lambda: PROCESS_BATCHER.in_flight > 0 or RIG_WRITER.qsize() > 0,
+    batches=BATCH_STORE,
+)
+
+
+# ---------------------------------------------------------------------------
+# Metrics (exposed at /api/metrics)
+# ---------------------------------------------------------------------------
+METRICS = MetricsRegistry()
+STAGE_SECONDS = METRICS.histogram(
+    "sam3d_stage_seconds",
+    "Time spent per pipeline stage (detection is per batch, other model stages per image).",
+    ("stage",),
+)
+QUEUE_WAIT_SECONDS = METRICS.histogram(
+    "sam3d_queue_wait_seconds",
+    "Time sessions spent queued before a worker picked them up.",
+)
+BATCH_SIZE = METRICS.histogram(
+    "sam3d_batch_size",
+    "Sessions per micro-batch handed to a worker.",
+    buckets=(1, 2, 4, 8, 16, 32),
+)
+PERSONS_PER_IMAGE = METRICS.histogram(
+    "sam3d_persons_per_image",
+    "Persons detected per processed image.",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 20),
+)
+SESSIONS_TOTAL = METRICS.counter(
+    "sam3d_sessions_total",
+    "Processed sessions by outcome (completed, failed).",
+    ("status",),
+)
+CACHE_HITS_TOTAL = METRICS.counter("sam3d_result_cache_hits_total", "Uploads answered from the result cache.")
+COALESCED_TOTAL = METRICS.counter(
+    "sam3d_coalesced_total", "Submissions attached to an identical queued or running job."
+)
+REJECTED_TOTAL = METRICS.counter("sam3d_rejected_total", "Submissions rejected with 429 because the queue was full.")
+WORKER_BUSY_SECONDS = METRICS.counter(
+    "sam3d_worker_busy_seconds_total",
+    "Seconds workers spent processing batches; divide its rate by sam3d_workers for utilization.",
+)
+WORKERS_BUSY = METRICS.gauge("sam3d_workers_busy", "Workers currently processing a batch.")
+METRICS.gauge("sam3d_workers", "Inference worker threads alive.", function=lambda: sum(
+    thread.is_alive() for thread in WORKER_THREADS
+))
+METRICS.gauge("sam3d_queue_depth", "Interactive sessions waiting to be processed.", function=lambda: PROCESS_BATCHER.qsize())
+METRICS.gauge(
+    "sam3d_background_queue_depth",
+    "Batch-job sessions waiting to be processed.",
+    function=lambda: PROCESS_BATCHER.background_size(),
+)
+METRICS.gauge("sam3d_ready", "1 once the model is loaded and warmed up.", function=lambda: MODEL_STATUS["state"] == "ready")
+METRICS.gauge("sam3d_in_flight_jobs", "Distinct uploads queued or running that duplicates can attach to.", function=lambda: len(IN_FLIGHT_JOBS))
+METRICS.gauge("sam3d_in_flight", "Sessions handed to workers and not yet finished.", function=lambda: PROCESS_BATCHER.in_flight)
+METRICS.gauge("sam3d_session_disk_bytes", "Bytes of uploads and exports recorded for sessions.", function=lambda: SESSION_STORE.disk_usage())
 
 
 # ---------------------------------------------------------------------------
 # Initialize model (only once, not during Flask reloader)
 # ---------------------------------------------------------------------------
 estimator = None
+# InferenceEngine when INFERENCE_ENGINE=process
+ENGINE = None
+# ComponentManager of the in-process estimator
+MODEL_COMPONENTS = None
 RIG_TEMPLATE = None
-SESSION_STORE = {}
-SESSION_LOCK = Lock()
-PROCESS_QUEUE = Queue()
-WORKER_THREAD = None
+MESH_FACES = None
+# (template_hash, serialized JSON body) of the shared rig template
+RIG_TEMPLATE_ASSET = None
+# The estimator keeps per-call state (batch, crops, cached outputs), so only
+# one worker may run it at a time.
+ESTIMATOR_LOCK = Lock()
+PROCESS_BATCHER = MicroBatcher(
+    max_batch_size=BATCH_MAX_IMAGES,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    max_queue_size=MAX_QUEUE_DEPTH,
+    on_wait=QUEUE_WAIT_SECONDS.observe,
+)
+# Model lifecycle reported by /api/health: starting -> loading -> warming ->
+# ready, or failed (with the error)
+MODEL_LOCK = Lock()
+MODEL_STATUS = {
+    "state": "starting",
+    "error": None,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "warmup": [],
+}
+# Moving average of the model's service time per session, as if sessions ran
+# one after another (engine time is divided by ENGINE_PROCESSES), for queue
+# start estimates. Time spent waiting for ESTIMATOR_LOCK is not included.
+JOB_SECONDS = MovingAverage(alpha=0.2)
+WORKER_THREADS = []
+# Upload bytes of queued sessions, so workers decode without re-reading the file
+PENDING_UPLOADS = {}
+# cache_key -> session queued or running for it; identical uploads attach to
+# that session instead of becoming another GPU job
+IN_FLIGHT_JOBS = InFlightJobs()
+# A holder with no session record counts as live only this long after its
+# claim, while the request is still storing the upload
+IN_FLIGHT_STORE_SECONDS = 30
 
 def init_model():
     """Initialize model - called only once
@@ -308,55 +515,147 @@ def init_model():
     - FOV Estimator (MoGe2) (~1-2GB)
     Total: ~4-7GB VRAM
 
-    Set USE_LIGHTWEIGHT=True to reduce memory usage (disable FOV estimator)
+    Set LIGHTWEIGHT_MODE=true to reduce memory usage (disable FOV estimator)
+
+    The model is then warmed up on synthetic images (WARMUP_RESOLUTIONS x
+    WARMUP_PERSONS) so the first real request does not pay for CUDA/cuDNN
+    initialization. Progress and timings are kept in MODEL_STATUS.
     """
-    global estimator, RIG_TEMPLATE
-    if estimator is None:
+    global estimator, ENGINE, MODEL_COMPONENTS, RIG_TEMPLATE, RIG_TEMPLATE_ASSET, MESH_FACES
+    with MODEL_LOCK:
+        if RIG_TEMPLATE is not None:
+            print("Model already loaded, skipping initialization")
+            return
+
         print("=" * 60)
         print("Loading SAM-3D-Body model (this may take a moment)...")
         print("This will load multiple models and consume ~6-8GB VRAM")
         print("=" * 60)
+        MODEL_STATUS.update(state="loading", error=None)
+        started = time.monotonic()
+        try:
+            if INFERENCE_ENGINE == 'process':
+                # Each engine process loads and warms up its own estimator
+                print(f"[Engine] Starting {ENGINE_PROCESSES} inference engine process(es)")
+                ENGINE = InferenceEngine(
+                    "sam_3d_body.serving.engine_tasks:init_estimator",
+                    "sam_3d_body.serving.engine_tasks:run_batch",
+                    init_args=(
+                        LIGHTWEIGHT_MODE,
+                        str(TEMPLATE_CACHE_DIR),
+                        INFERENCE_TYPE,
+                        MAX_LONG_EDGE,
+                        WARMUP_RESOLUTIONS,
+                        WARMUP_PERSONS,
+                        MODEL_IDLE_UNLOAD_SECONDS,
+                        MODEL_OFFLOAD_TO_CPU,
+                    ),
+                    processes=ENGINE_PROCESSES,
+                )
+                info = ENGINE.start()
+                template, MESH_FACES = info["template"], info["faces"]
+                load_seconds, warmup = info["load_seconds"], info["warmup"]
+            else:
+                if LIGHTWEIGHT_MODE:
+                    print("[LIGHTWEIGHT MODE] Disabling FOV estimator to save VRAM")
+                estimator, MODEL_COMPONENTS = setup_managed_sam_3d_body(
+                    hf_repo_id="facebook/sam-3d-body-dinov3",
+                    fov_name=None if LIGHTWEIGHT_MODE else "moge2",
+                    idle_seconds=MODEL_IDLE_UNLOAD_SECONDS,
+                    offload_to_cpu=MODEL_OFFLOAD_TO_CPU,
+                    lock=ESTIMATOR_LOCK,
+                )
+                estimator.stage_timer = lambda stage: STAGE_SECONDS.time(stage=stage)
+                MESH_FACES = estimator.faces
+
+                print("Extracting skeleton template...")
+                template = extract_mhr_template(estimator.model.head_pose.mhr, cache_dir=TEMPLATE_CACHE_DIR)
+                load_seconds = time.monotonic() - started
+
+                MODEL_STATUS["state"] = "warming"
+                print(f"[Warmup] {len(WARMUP_RESOLUTIONS)} resolution(s) x {len(WARMUP_PERSONS)} person count(s)")
+                with ESTIMATOR_LOCK:
+                    warmup = warmup_estimator(estimator, WARMUP_RESOLUTIONS, WARMUP_PERSONS, INFERENCE_TYPE)
+
+            template_asset = build_template_asset(template, MESH_FACES)
+            template["template_hash"] = template_asset[0]
+            # Shared by every session; never mutated after this point
+            freeze_template(template)
+            # Published last: workers read RIG_TEMPLATE without MODEL_LOCK and
+            # take a non-None value to mean the template is complete
+            RIG_TEMPLATE_ASSET = template_asset
+            RIG_TEMPLATE = template
+            print(f"Rig template version: {template_asset[0]}")
+        except Exception as exc:
+            MODEL_STATUS.update(state="failed", error=str(exc))
+            raise
+
+        if MODEL_COMPONENTS is not None:
+            MODEL_COMPONENTS.start()
+        warmup_seconds = sum(run["seconds"] for run in warmup)
+        MODEL_STATUS.update(
+            state="ready",
+            load_seconds=round(load_seconds, 3),
+            warmup_seconds=round(warmup_seconds, 3),
+            warmup=warmup,
+        )
+        print("=" * 60)
+        print(f"Model loaded in {load_seconds:.1f}s, warmed up in {warmup_seconds:.1f}s")
+        print("=" * 60)
 
-        # Set to True to reduce VRAM usage (disables FOV estimation, uses default FOV)
-        USE_LIGHTWEIGHT = os.environ.get('LIGHTWEIGHT_MODE', 'false').lower() == 'true'
-
-        if USE_LIGHTWEIGHT:
-            print("[LIGHTWEIGHT MODE] Disabling FOV estimator to save VRAM")
-            estimator = setup_sam_3d_body(
-                hf_repo_id="facebook/sam-3d-body-dinov3",
-                fov_name=None  # Disable FOV estimator
-            )
-        else:
-            estimator = setup_sam_3d_body(hf_repo_id="facebook/sam-3d-body-dinov3")
 
-        print("Extracting skeleton template...")
-        RIG_TEMPLATE = extract_mhr_template(estimator.model.head_pose.mhr)
+def load_model_in_background():
+    """Load the model off the main thread so /api/health answers while it loads."""
+    def load():
+        try:
+            init_model()
+        except Exception as exc:
+            print(f"[Model] Loading failed: {exc}")
 
-        print("=" * 60)
-        print("Model loaded successfully!")
-        print("=" * 60)
-    else:
-        print("Model already loaded, skipping initialization")
+    Thread(target=load, daemon=True, name="model-loader").start()
 
 
-def start_worker():
-    """Start background worker thread if not already running."""
-    global WORKER_THREAD
-    if WORKER_THREAD and WORKER_THREAD.is_alive():
-        return
+def start_workers():
+    """Start the inference worker pool if it is not already running."""
+    global WORKER_THREADS
+    WORKER_THREADS = [thread for thread in WORKER_THREADS if thread.is_alive()]
 
     def worker_loop():
         while True:
-            session_id = PROCESS_QUEUE.get()
+            session_ids = PROCESS_BATCHER.next_batch()
+            publish_queue_positions()
+            BATCH_SIZE.observe(len(session_ids))
+            WORKERS_BUSY.inc()
+            started = time.monotonic()
             try:
-                process_session_job(session_id)
+                process_session_batch(session_ids)
             except Exception as worker_exc:
-                print(f"[Worker] Error executing session {session_id}: {worker_exc}")
+                print(f"[Worker] Error executing sessions {session_ids}: {worker_exc}")
             finally:
-                PROCESS_QUEUE.task_done()
-
-    WORKER_THREAD = Thread(target=worker_loop, daemon=True)
-    WORKER_THREAD.start()
+                PROCESS_BATCHER.task_done(len(session_ids))
+                elapsed = time.monotonic() - started
+                WORKERS_BUSY.dec()
+                WORKER_BUSY_SECONDS.inc(elapsed)
+
+    while len(WORKER_THREADS) < INFERENCE_WORKERS:
+        thread = Thread(target=worker_loop, daemon=True, name=f"inference-worker-{len(WORKER_THREADS)}")
+        thread.start()
+        WORKER_THREADS.append(thread)
+    print(f"[Worker] {len(WORKER_THREADS)} worker(s), batch <= {BATCH_MAX_IMAGES} image(s) / {BATCH_MAX_WAIT_MS:.0f} ms")
+
+
+def requeue_interrupted_sessions():
+    """Requeue sessions left queued or processing by a previous server run."""
+    for session in SESSION_STORE.list_by_status("queued", "processing"):
+        session_id = session["session_id"]
+        if session["filepath"] and Path(session["filepath"]).exists():
+            SESSION_STORE.update(session_id, status="queued")
+            if session["cache_key"]:
+                IN_FLIGHT_JOBS.claim(session["cache_key"], session_id, stored=True)
+            PROCESS_BATCHER.put(session_id, force=True)
+            print(f"[Worker] Requeued interrupted session {session_id}")
+        else:
+            SESSION_STORE.update(session_id, status="failed", error="Upload lost during server restart")
 
 
 # Load model immediately when not in reloader process
@@ -366,8 +665,10 @@ print(f"[DEBUG] app.debug = {app.debug}")
 
 if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not app.debug:
     print("[DEBUG] Loading model in main process...")
-    init_model()
-    start_worker()
+    load_model_in_background()
+    start_workers()
+    requeue_interrupted_sessions()
+    STORAGE_JANITOR.start()
 else:
     print("[DEBUG] Skipping model load in reloader process")
 
@@ -380,101 +681,580 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def register_session(session_id, filepath, session_dir, original_filename):
-    with SESSION_LOCK:
-        SESSION_STORE[session_id] = {
-            "session_id": session_id,
-            "status": "queued",
-            "created_at": time.time(),
-            "updated_at": time.time(),
-            "filepath": str(filepath),
-            "session_dir": str(session_dir),
-            "original_filename": original_filename,
-            "num_persons": 0,
-            "rig_data": None,
-            "error": None,
-        }
+def estimated_wait_seconds(position):
+    """Seconds until the session at queue `position` starts: every session ahead of it,
+    including those already handed to workers, costs one serialized service time."""
+    job_seconds = JOB_SECONDS.value or DEFAULT_JOB_SECONDS
+    return (position + PROCESS_BATCHER.in_flight) * job_seconds
 
 
-def update_session(session_id, **kwargs):
-    with SESSION_LOCK:
-        session = SESSION_STORE.get(session_id)
-        if not session:
-            return None
-        session.update(kwargs)
-        session["updated_at"] = time.time()
-        return session
+def queue_status(session_id):
+    """`queue_position` / `estimated_start_seconds` of a waiting session, else `{}`."""
+    return queue_position_status(PROCESS_BATCHER.position(session_id))
+
 
+def queue_position_status(position):
+    if position is None:
+        return {}
+    return {
+        "queue_position": position + 1,
+        "estimated_start_seconds": round(estimated_wait_seconds(position), 1),
+    }
 
-def process_session_job(session_id):
-    """Background worker that performs long-running inference."""
+
+def publish_queue_position(session_id, status=None):
+    """Push a waiting session's queue position to its subscribers; `status`
+    (a `queue_position_status`) defaults to looking the session up."""
+    _, event = SESSION_EVENTS.latest(session_id)
+    if event is not None and event["status"] == "queued":
+        if status is None:
+            status = queue_status(session_id)
+        SESSION_EVENTS.publish(session_id, {**event, **status})
+
+
+def publish_queue_positions():
+    """Push updated queue positions to every waiting session's subscribers.
+
+    Positions come from one pass over a snapshot of the queue instead of a
+    lookup per session, which would be quadratic in the queue length.
+    """
+    for position, session_id in enumerate(PROCESS_BATCHER.snapshot()):
+        publish_queue_position(session_id, queue_position_status(position))
+
+
+def session_event(session, stage=None):
+    """Progress event for a session record, as pushed to clients."""
+    event = {
+        "session_id": session["session_id"],
+        "status": session["status"],
+        "stage": stage or session["status"],
+        "num_persons": session.get("num_persons", 0),
+        "error": session.get("error"),
+    }
+    if session["status"] == "queued":
+        event.update(queue_status(session["session_id"]))
+    if session["status"] == "completed":
+        event["rig_url"] = f"/api/sessions/{session['session_id']}/{RIG_GLB_FILENAME}"
+        event["rig_quantized_url"] = f"/api/sessions/{session['session_id']}/{RIG_QUANTIZED_GLB_FILENAME}"
+        if RIG_TEMPLATE_ASSET is not None:
+            event["template_url"] = f"/api/template/{RIG_TEMPLATE_ASSET[0]}"
+    return event
+
+
+def register_session(session_id, filepath, session_dir, original_filename, cache_key=None, upload_bytes=0):
+    session = SESSION_STORE.register(
+        session_id,
+        filepath=str(filepath),
+        session_dir=str(session_dir),
+        original_filename=original_filename,
+        cache_key=cache_key,
+        disk_bytes=upload_bytes,
+    )
+    IN_FLIGHT_JOBS.mark_stored(session_id)
+    SESSION_EVENTS.publish(session_id, session_event(session))
+    return session
+
+
+def update_session(session_id, stage=None, **kwargs):
+    """Update a session record and notify subscribers of the new stage."""
+    session = SESSION_STORE.update(session_id, **kwargs)
+    if session is not None:
+        if kwargs.get("status") == "failed":
+            # Completed sessions release their key once the result cache has them
+            IN_FLIGHT_JOBS.release(session.get("cache_key"), session_id)
+        SESSION_EVENTS.publish(session_id, session_event(session, stage))
+    return session
+
+
+def in_flight_session_live(session_id):
+    """Whether a session holding an in-flight key can still take attachments."""
+    session = SESSION_STORE.get(session_id, touch=False)
+    if session is None:
+        # Live only while the claiming request is still storing its upload;
+        # otherwise the session was evicted or deleted without releasing
+        unstored = IN_FLIGHT_JOBS.unstored_seconds(session_id)
+        return unstored is not None and unstored < IN_FLIGHT_STORE_SECONDS
+    return session["status"] != "failed"
+
+
+def attach_to_in_flight(cache_key, session_id):
+    """Claim `cache_key` for a new session; returns the session it attached to instead, if any."""
+    if cache_key is None:
+        return None
+    holder = IN_FLIGHT_JOBS.claim(cache_key, session_id, is_live=in_flight_session_live)
+    if holder is not None:
+        COALESCED_TOTAL.inc()
+    return holder
+
+
+def load_session_bytes(session_id, filepath):
+    """Upload bytes kept from the request, or read back from disk for sessions
+    requeued after a restart."""
+    image_bytes = PENDING_UPLOADS.pop(session_id, None)
+    if image_bytes is None:
+        image_bytes = Path(filepath).read_bytes()
+    return image_bytes
+
+
+def load_session_image(session_id, filepath):
+    """Decode an upload, downscaled to MAX_LONG_EDGE."""
+    image_bytes = load_session_bytes(session_id, filepath)
+    try:
+        with STAGE_SECONDS.time(stage="decode"):
+            img_bgr = decode_image(image_bytes, MAX_LONG_EDGE, resize=False)
+    except ImageValidationError as exc:
+        raise RuntimeError(f"Could not read image file: {exc}") from exc
+    with STAGE_SECONDS.time(stage="resize"):
+        return downscale_image(img_bgr, MAX_LONG_EDGE)
+
+
+def run_estimator_batch(session_ids, images_bgr):
+    """Run detection for all images in one pass, then the body model per image.
+
+    Returns one entry per image: the list of person outputs, or the exception
+    raised while processing that image.
+    """
+    with ESTIMATOR_LOCK:
+        started = time.monotonic()
+        for session_id in session_ids:
+            update_session(session_id, stage="detecting")
+        if estimator.detector is not None:
+            boxes_per_image = estimator.detect_humans(images_bgr)
+        else:
+            boxes_per_image = [None] * len(images_bgr)
+
+        results = []
+        for session_id, img_bgr, boxes in zip(session_ids, images_bgr, boxes_per_image):
+            if boxes is not None and len(boxes) == 0:
+                results.append([])
+                continue
+            update_session(session_id, stage="estimating")
+            try:
+                results.append(
+                    estimator.process_one_image(
+                        cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB),
+                        bboxes=boxes,
+                        inference_type=INFERENCE_TYPE,
+                    )
+                )
+            except Exception as exc:
+                results.append(exc)
+        JOB_SECONDS.update((time.monotonic() - started) / len(session_ids))
+        return results
+
+
+def run_engine_batch(session_ids, images):
+    """Send upload bytes to the inference engine; same result shape as
+    `run_estimator_batch`, except that each image's persons arrive as the
+    rig arrays built by `prepare_person_rigs`."""
+    for session_id in session_ids:
+        update_session(session_id, stage="estimating")
+    job = ENGINE.submit(images)
+    try:
+        meta, arrays = job.result(timeout=ENGINE_JOB_TIMEOUT_SECONDS or None)
+    except FutureTimeoutError:
+        job.cancel()
+        raise RuntimeError(f"Inference did not finish within {ENGINE_JOB_TIMEOUT_SECONDS:g}s")
+    for stage, seconds in meta["timings"]:
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    # Engine processes serve jobs in parallel
+    service_seconds = sum(seconds for _, seconds in meta["timings"])
+    JOB_SECONDS.update(service_seconds / ENGINE_PROCESSES / len(session_ids))
+
+    results = []
+    for index, image in enumerate(meta["images"]):
+        if "error" in image:
+            results.append(RuntimeError(image["error"]))
+        elif not image["num_persons"]:
+            results.append([])
+        else:
+            prefix = f"{index}."
+            results.append({
+                key[len(prefix):]: array for key, array in arrays.items() if key.startswith(prefix)
+            })
+    return results
+
+
+def processing_cache_key(image_bytes):
+    """Result cache key for an upload under the server's current settings.
+
+    None until the model is loaded: the template version is part of the
+    key, so uploads that arrive earlier are processed without caching or
+    coalescing.
+    """
+    if RIG_TEMPLATE_ASSET is None:
+        return None
+    return result_cache_key(image_bytes, (MAX_LONG_EDGE, LIGHTWEIGHT_MODE, INFERENCE_TYPE, RIG_TEMPLATE_ASSET[0]))
+
+
+def lookup_cached_session(cache_key):
+    """Completed session previously produced for `cache_key`, if still available."""
+    if cache_key is None or RESULT_CACHE.max_bytes <= 0:
+        return None
+    session_id = RESULT_CACHE.get(cache_key)
+    if session_id is None:
+        return None
     session = SESSION_STORE.get(session_id)
-    if not session:
-        print(f"[Worker] Missing session {session_id}")
-        return
+    if not session or session["status"] != "completed" or not Path(session["session_dir"]).is_dir():
+        RESULT_CACHE.discard(cache_key)
+        return None
+    CACHE_HITS_TOTAL.inc()
+    return session
+
+
+def finish_session(session, outputs):
+    """Build rigs for one session's estimator outputs and mark it completed.
 
-    update_session(session_id, status="processing")
-    filepath = Path(session["filepath"])
+    The rigs are kept in memory for immediate responses; JSON/GLB files and
+    their gzip siblings are handed to the background writer, which also
+    records the result in the result cache.
+    """
+    if isinstance(outputs, Exception):
+        raise outputs
+    num_persons = len(outputs["vertices"]) if isinstance(outputs, dict) else len(outputs)
+    PERSONS_PER_IMAGE.observe(num_persons)
+    if not outputs:
+        raise RuntimeError("No persons detected in image")
+
+    session_id = session["session_id"]
     session_dir = Path(session["session_dir"])
+    cache_key = session.get("cache_key")
+
+    update_session(session_id, stage="exporting")
+    with STAGE_SECONDS.time(stage="export"):
+        persons = export_rigged_models(outputs, RIG_TEMPLATE)
+    if not persons:
+        raise RuntimeError("Failed to generate rig data")
+
+    faces = MESH_FACES
+
+    def render():
+        try:
+            # Compressed once here so downloads never pay for gzip
+            with STAGE_SECONDS.time(stage="serialization"):
+                files = with_precompressed(render_rig_files(persons, faces, RIG_TEMPLATE))
+            if cache_key and RESULT_CACHE.max_bytes > 0:
+                RESULT_CACHE.put(cache_key, session_id, sum(len(data) for data in files.values()))
+        finally:
+            # Duplicates arriving from now on are answered by the result cache
+            IN_FLIGHT_JOBS.release(cache_key, session_id)
+        return {session_dir / filename: data for filename, data in files.items()}
+
+    RIG_WRITER.submit(session_id, render)
+
+    def render_measurements():
+        with STAGE_SECONDS.time(stage="measurement"):
+            measured = measure_persons(persons)
+        cache_session_measurements(session_id, measured)
+        return {session_dir / MEASUREMENTS_FILENAME: json.dumps(measured, separators=(",", ":")).encode("utf-8")}
+
+    RIG_WRITER.submit(session_id, render_measurements)
+
+    update_session(
+        session_id,
+        status="completed",
+        num_persons=len(persons),
+        rig_data=(persons, sum(person.nbytes for person in persons)),
+        error=None,
+    )
+    SESSIONS_TOTAL.inc(status="completed")
+    print(f"[Worker] Session {session_id} completed ({len(persons)} person)")
 
+
+def process_session_batch(session_ids):
+    """Background worker that performs long-running inference for a micro-batch."""
+    jobs = []
+    for session_id in session_ids:
+        session = SESSION_STORE.get(session_id, touch=False)
+        if not session:
+            print(f"[Worker] Missing session {session_id}")
+            IN_FLIGHT_JOBS.release_session(session_id)
+            PENDING_UPLOADS.pop(session_id, None)
+            continue
+
+        update_session(session_id, status="processing")
+        try:
+            if ENGINE is not None:
+                # Decoded inside the engine process
+                img_bgr = load_session_bytes(session_id, session["filepath"])
+            else:
+                img_bgr = load_session_image(session_id, session["filepath"])
+        except Exception as exc:
+            print(f"[Worker] Session {session_id} failed: {exc}")
+            update_session(session_id, status="failed", error=str(exc))
+            SESSIONS_TOTAL.inc(status="failed")
+            continue
+        jobs.append((session, img_bgr))
+
+    if not jobs:
+        return
+
+    job_ids = [session["session_id"] for session, _ in jobs]
+    print(f"[Worker] Processing {len(jobs)} session(s): {job_ids}")
     try:
-        if estimator is None:
+        if RIG_TEMPLATE is None:
             init_model()
+        images = [img_bgr for _, img_bgr in jobs]
+        if ENGINE is not None:
+            batch_outputs = run_engine_batch(job_ids, images)
+        else:
+            batch_outputs = run_estimator_batch(job_ids, images)
+    except Exception as exc:
+        print(f"[Worker] Batch failed: {exc}")
+        batch_outputs = [exc] * len(jobs)
 
-        img_bgr = cv2.imread(str(filepath))
-        if img_bgr is None:
-            raise RuntimeError("Could not read image file")
-
-        MAX_LONG_EDGE = 2048
-        height, width = img_bgr.shape[:2]
-        long_edge = max(height, width)
-        if long_edge > MAX_LONG_EDGE:
-            scale = MAX_LONG_EDGE / long_edge
-            new_size = (int(width * scale), int(height * scale))
-            print(f"[Worker] Resizing {session_id} from {width}x{height} to {new_size[0]}x{new_size[1]}")
-            img_bgr = cv2.resize(img_bgr, new_size, interpolation=cv2.INTER_AREA)
-
-        print(f"[Worker] Processing session {session_id}")
-        outputs = estimator.process_one_image(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB))
-        if not outputs:
-            raise RuntimeError("No persons detected in image")
-
-        rig_paths = export_rigged_models(
-            outputs,
-            estimator.faces,
-            RIG_TEMPLATE,
-            export_dir=str(session_dir)
-        )
+    for (session, _), outputs in zip(jobs, batch_outputs):
+        session_id = session["session_id"]
+        try:
+            finish_session(session, outputs)
+        except Exception as exc:
+            print(f"[Worker] Session {session_id} failed: {exc}")
+            update_session(session_id, status="failed", error=str(exc))
+            SESSIONS_TOTAL.inc(status="failed")
 
-        if not rig_paths:
-            raise RuntimeError("Failed to generate rig data")
 
-        rig_data_list = []
-        for rig_path in rig_paths:
-            with open(rig_path, 'r', encoding='utf-8') as f:
-                rig_data_list.append(json.load(f))
+def measure_persons(persons):
+    """Unscaled measurements per person; persons that cannot be measured get `{"error": ...}`."""
+    results = []
+    for person in persons:
+        try:
+            results.append(measure_person(person.to_payload(json_ready=False)))
+        except MeasurementError as err:
+            results.append({"error": str(err)})
+    return results
 
-        update_session(
-            session_id,
-            status="completed",
-            num_persons=len(rig_data_list),
-            rig_data=rig_data_list,
-            error=None,
-        )
-        print(f"[Worker] Session {session_id} completed ({len(rig_data_list)} person)")
 
-    except Exception as exc:
-        print(f"[Worker] Session {session_id} failed: {exc}")
-        update_session(session_id, status="failed", error=str(exc))
+def cache_session_measurements(session_id, measured):
+    if MEASUREMENT_CACHE_SESSIONS <= 0:
+        return
+    with MEASUREMENT_CACHE_LOCK:
+        MEASUREMENT_CACHE[session_id] = measured
+        MEASUREMENT_CACHE.move_to_end(session_id)
+        while len(MEASUREMENT_CACHE) > MEASUREMENT_CACHE_SESSIONS:
+            MEASUREMENT_CACHE.popitem(last=False)
+
+
+def drop_session_measurements(session_id):
+    with MEASUREMENT_CACHE_LOCK:
+        MEASUREMENT_CACHE.pop(session_id, None)
+
+
+def get_session_measurements(session):
+    """Unscaled measurements of a completed session's persons.
+
+    Normally computed by the writer right after export; sessions evicted
+    from memory are read back from measurements.json, and sessions exported
+    before it existed are measured once here. Returns None, caching nothing,
+    when the rig data cannot be loaded (e.g. while the model loads).
+    """
+    session_id = session["session_id"]
+    RIG_WRITER.wait(session_id, timeout=RIG_WRITE_WAIT_SECONDS)
+    with MEASUREMENT_CACHE_LOCK:
+        measured = MEASUREMENT_CACHE.get(session_id)
+        if measured is not None:
+            MEASUREMENT_CACHE.move_to_end(session_id)
+            return measured
+
+    path = Path(session["session_dir"]) / MEASUREMENTS_FILENAME
+    try:
+        measured = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        measured = None
+    if measured is None:
+        persons = SESSION_STORE.get_rig_data(session_id)
+        if persons is None:
+            return None
+        measured = measure_persons(persons)
+        body = json.dumps(measured, separators=(",", ":")).encode("utf-8")
+        RIG_WRITER.submit(session_id, lambda: {path: body})
+    cache_session_measurements(session_id, measured)
+    return measured
+
+
+# Compressed bodies of ETag-identified responses (rig JSON, template, frontend)
+GZIP_BODIES = CompressedBodyCache()
+# Vite emits content-hashed file names under assets/
+HASHED_ASSET_PREFIX = "assets/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSIBLE_MIMETYPES = ("application/javascript", "application/json", "image/svg+xml", "text/javascript")
+
+
+def cacheable_response(etag, render, mimetype="application/json", cache_control="no-cache"):
+    """Response with ETag/If-None-Match handling and gzip when accepted.
+
+    `render` returns the body bytes and is only called when the client's
+    copy is stale and no compressed body is cached for `etag`.
+    """
+    use_gzip = accepts_gzip(request.headers.get("Accept-Encoding"))
+    variant = f"{etag}-gz" if use_gzip else etag
+
+    if variant in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        body = GZIP_BODIES.get(variant) if use_gzip else None
+        if body is not None:
+            response = app.response_class(body, mimetype=mimetype)
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            body = render()
+            if use_gzip and len(body) >= GZIP_MIN_BYTES:
+                body = gzip_bytes(body)
+                GZIP_BODIES.put(variant, body)
+                response = app.response_class(body, mimetype=mimetype)
+                response.headers["Content-Encoding"] = "gzip"
+            else:
+                response = app.response_class(body, mimetype=mimetype)
+
+    response.set_etag(variant)
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# Exported files a session directory may serve; anything else under
+# OUTPUT_FOLDER (databases, template cache, stray files) is not public
+SESSION_FILE_PATTERN = re.compile("|".join([
+    r"person_\d+_rig\.json",
+    re.escape(RIG_GLB_FILENAME),
+    re.escape(RIG_QUANTIZED_GLB_FILENAME),
+    re.escape(MEASUREMENTS_FILENAME),
+]))
+
+
+def is_session_file(session_id, filename):
+    """True if `filename` is an export of a known session `session_id`."""
+    try:
+        if str(uuid.UUID(session_id)) != session_id:
+            return False
+    except ValueError:
+        return False
+    if SESSION_FILE_PATTERN.fullmatch(filename) is None:
+        return False
+    return SESSION_STORE.get(session_id, touch=False) is not None
+
+
+def send_precompressed(directory, filename, cache_control):
+    """Serve `filename`, preferring its `.gz` sibling when the client accepts gzip."""
+    gz_path = Path(directory) / f"{filename}{GZIP_SUFFIX}"
+    if accepts_gzip(request.headers.get("Accept-Encoding")) and gz_path.is_file():
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = send_from_directory(directory, f"{filename}{GZIP_SUFFIX}", mimetype=mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = send_from_directory(directory, filename)
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def health_report():
+    """Liveness, readiness and model load/warmup timings.
+
+    Live: the model has not failed to load and every worker thread runs.
+    Ready: live, and the model is loaded and warmed up.
+    """
+    state = MODEL_STATUS["state"]
+    live = state != "failed" and all(thread.is_alive() for thread in WORKER_THREADS)
+    ready = live and state == "ready"
+    return {
+        "status": "healthy" if ready else ("starting" if live else "unhealthy"),
+        "live": live,
+        "ready": ready,
+        "model_loaded": RIG_TEMPLATE is not None,
+        "model_state": state,
+        "error": MODEL_STATUS["error"],
+        "load_seconds": MODEL_STATUS["load_seconds"],
+        "warmup_seconds": MODEL_STATUS["warmup_seconds"],
+        "warmup": MODEL_STATUS["warmup"],
+        "workers": sum(thread.is_alive() for thread in WORKER_THREADS),
+        "components": MODEL_COMPONENTS.status() if MODEL_COMPONENTS is not None else None,
+    }
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "model_loaded": True})
+    return jsonify(health_report())
+
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: 200 while the process can serve, 503 once it should be restarted."""
+    report = health_report()
+    return jsonify(report), 200 if report["live"] else 503
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 only once the model is loaded and warmed up."""
+    report = health_report()
+    return jsonify(report), 200 if report["ready"] else 503
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Latency, throughput and queue metrics in the Prometheus text format."""
+    return Response(
+        METRICS.render(),
+        content_type=PROMETHEUS_CONTENT_TYPE,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def server_busy_payload():
+    """Body and headers of the 429 for a full queue, with Retry-After set to when a slot should free up."""
+    REJECTED_TOTAL.inc()
+    retry_after = min(max(1, math.ceil(estimated_wait_seconds(0))), MAX_RETRY_AFTER_SECONDS)
+    body = {
+        "error": "Server is busy, please retry later",
+        "queue_depth": PROCESS_BATCHER.qsize(),
+        "retry_after": retry_after,
+    }
+    return body, {"Retry-After": str(retry_after)}
+
+
+def server_busy_response():
+    body, headers = server_busy_payload()
+    response = jsonify(body)
+    response.status_code = 429
+    response.headers.update(headers)
+    return response
+
+
+def create_session(image_bytes, original_filename, cache_key, background=False, session_id=None):
+    """Store an upload, register its session and queue it.
+
+    Returns `(session_id, queue_position)`. Background sessions (batch jobs)
+    are read back from disk by the worker instead of being kept in memory.
+    Raises `QueueFullError`, after cleaning up, when the queue is full.
+    """
+    # Generate unique ID for this session
+    session_id = session_id or str(uuid.uuid4())
+    session_dir = OUTPUT_FOLDER / session_id
+    session_dir.mkdir(exist_ok=True)
+
+    # Save uploaded file
+    filename = secure_filename(original_filename) or "image"
+    filepath = UPLOAD_FOLDER / f"{session_id}_{filename}"
+    filepath.write_bytes(image_bytes)
+
+    if not background:
+        PENDING_UPLOADS[session_id] = image_bytes
+    register_session(session_id, filepath, session_dir, filename, cache_key=cache_key, upload_bytes=len(image_bytes))
+    try:
+        position = PROCESS_BATCHER.put(session_id, background=background)
+    except QueueFullError:
+        PENDING_UPLOADS.pop(session_id, None)
+        SESSION_STORE.delete(session_id)
+        remove_session_files({"session_id": session_id, "filepath": str(filepath), "session_dir": str(session_dir)})
+        raise
+    return session_id, position
 
 
 @app.route('/api/process', methods=['POST'])
 def process_image():
+    if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+        return jsonify({"error": "Image is larger than 16MB"}), 413
+
     if 'image' not in request.files:
         return jsonify({"error": "No image file provided"}), 400
 
@@ -486,58 +1266,535 @@ def process_image():
         return jsonify({"error": "Invalid file type. Allowed: png, jpg, jpeg, webp"}), 400
 
     try:
-        # Generate unique ID for this session
-        session_id = str(uuid.uuid4())
-        session_dir = OUTPUT_FOLDER / session_id
-        session_dir.mkdir(exist_ok=True)
+        body, status, headers = submit_upload(file.read(), file.filename)
+        response = jsonify(body)
+        response.status_code = status
+        response.headers.update(headers)
+        return response
+    except Exception as e:
+        print(f"Error processing image: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
 
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        filepath = UPLOAD_FOLDER / f"{session_id}_{filename}"
-        file.save(filepath)
 
-        register_session(session_id, filepath, session_dir, filename)
-        PROCESS_QUEUE.put(session_id)
+def submit_upload(image_bytes, original_filename):
+    """Validate one upload and queue it, or answer it from the result cache.
 
-        return jsonify({
+    Returns `(body, status, headers)` so the Flask route and the ASGI app
+    (asgi.py) share the same logic. An upload identical to one already
+    queued or running attaches to that session rather than queueing another
+    job, even when the queue is full.
+    """
+    try:
+        width, height, _ = validate_image(image_bytes, MIN_IMAGE_EDGE, MAX_IMAGE_PIXELS)
+    except ImageValidationError as exc:
+        return {"error": str(exc)}, 400, {}
+
+    cache_key = processing_cache_key(image_bytes)
+    cached = lookup_cached_session(cache_key)
+    if cached is not None:
+        print(f"[Cache] Reusing completed session {cached['session_id']}")
+        return {
             "success": True,
-            "session_id": session_id,
-            "status": "queued"
-        }), 202
+            "session_id": cached["session_id"],
+            "status": "completed",
+            "num_persons": cached["num_persons"],
+            "cached": True,
+        }, 200, {}
+
+    session_id = str(uuid.uuid4())
+    holder = attach_to_in_flight(cache_key, session_id)
+    if holder is not None:
+        print(f"[Upload] Attached to in-flight session {holder}")
+        body = attached_session_body(holder)
+        return body, 200 if body["status"] == "completed" else 202, {}
+
+    if PROCESS_BATCHER.full():
+        IN_FLIGHT_JOBS.release(cache_key, session_id)
+        body, headers = server_busy_payload()
+        return body, 429, headers
+    try:
+        session_id, position = create_session(image_bytes, original_filename, cache_key, session_id=session_id)
+    except QueueFullError:
+        # Lost the race for the last slot since the check above
+        IN_FLIGHT_JOBS.release(cache_key, session_id)
+        body, headers = server_busy_payload()
+        return body, 429, headers
+    except BaseException:
+        IN_FLIGHT_JOBS.release(cache_key, session_id)
+        raise
+    publish_queue_position(session_id)
+    print(f"[Upload] Queued {session_id} ({width}x{height}) at position {position + 1}")
 
+    return {
+        "success": True,
+        "session_id": session_id,
+        "status": "queued",
+        "queue_position": position + 1,
+        "estimated_start_seconds": round(estimated_wait_seconds(position), 1),
+    }, 202, {}
+
+
+def attached_session_body(session_id):
+    """`/api/process` response for an upload attached to an in-flight session.
+
+    A session still waiting in the batch lane is moved to the interactive
+    queue, since someone is now waiting on it.
+    """
+    PROCESS_BATCHER.promote(session_id)
+    session = SESSION_STORE.get(session_id, touch=False)
+    body = {
+        "success": True,
+        "session_id": session_id,
+        "status": session["status"] if session else "queued",
+        "coalesced": True,
+    }
+    if session and session["status"] == "completed":
+        body["num_persons"] = session["num_persons"]
+    position = PROCESS_BATCHER.position(session_id)
+    if position is not None:
+        publish_queue_position(session_id)
+        body.update(queue_status(session_id))
+    return body
+
+
+def iter_batch_uploads():
+    """Yield `(filename, bytes or None, error or None)` for every submitted image.
+
+    Images come from repeated `images` multipart fields and from the members
+    of an optional `archive` zip; directories and macOS metadata are skipped.
+    """
+    for file in request.files.getlist('images'):
+        if not file.filename:
+            continue
+        yield file.filename, file.read(MAX_UPLOAD_BYTES + 1), None
+
+    archive = request.files.get('archive')
+    if archive is None or not archive.filename:
+        return
+    try:
+        with zipfile.ZipFile(archive.stream) as bundle:
+            for info in bundle.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/") or Path(name).name.startswith("."):
+                    continue
+                if info.file_size > MAX_UPLOAD_BYTES:
+                    yield name, None, "Image is larger than 16MB"
+                    continue
+                with bundle.open(info) as member:
+                    yield name, member.read(MAX_UPLOAD_BYTES + 1), None
+    except zipfile.BadZipFile:
+        yield archive.filename, None, "Archive is not a valid zip file"
+
+
+def submit_batch_item(filename, image_bytes):
+    """Validate one batch image and queue it; returns its batch item record."""
+    item = {"filename": filename}
+    if not allowed_file(filename):
+        item["error"] = "Invalid file type. Allowed: png, jpg, jpeg, webp"
+        return item
+    if len(image_bytes) > MAX_UPLOAD_BYTES:
+        item["error"] = "Image is larger than 16MB"
+        return item
+    try:
+        validate_image(image_bytes, MIN_IMAGE_EDGE, MAX_IMAGE_PIXELS)
+    except ImageValidationError as exc:
+        item["error"] = str(exc)
+        return item
+
+    cache_key = processing_cache_key(image_bytes)
+    cached = lookup_cached_session(cache_key)
+    if cached is not None:
+        item.update(session_id=cached["session_id"], cached=True)
+        return item
+
+    session_id = str(uuid.uuid4())
+    holder = attach_to_in_flight(cache_key, session_id)
+    if holder is not None:
+        item.update(session_id=holder, coalesced=True)
+        return item
+
+    try:
+        create_session(image_bytes, Path(filename).name, cache_key, background=True, session_id=session_id)
+    except BaseException:
+        IN_FLIGHT_JOBS.release(cache_key, session_id)
+        raise
+    item["session_id"] = session_id
+    return item
+
+
+@app.route('/api/batches', methods=['POST'])
+def create_batch():
+    """Submit many images as one batch job.
+
+    Accepts repeated `images` files and/or an `archive` zip. Each valid image
+    becomes a session in the background lane of the queue, which workers
+    drain in model-sized micro-batches whenever no interactive upload is
+    waiting; images seen before reuse their cached results.
+    """
+    if PROCESS_BATCHER.background_size() >= BATCH_MAX_BACKLOG:
+        return server_busy_response()
+
+    items = []
+    try:
+        for filename, image_bytes, error in iter_batch_uploads():
+            if len(items) >= BATCH_JOB_MAX_IMAGES:
+                items.append({"filename": filename, "error": f"Batch limit of {BATCH_JOB_MAX_IMAGES} images exceeded"})
+            elif error is not None:
+                items.append({"filename": filename, "error": error})
+            else:
+                items.append(submit_batch_item(filename, image_bytes))
     except Exception as e:
-        print(f"Error processing image: {e}")
+        print(f"Error creating batch: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+    if not items:
+        return jsonify({"error": "No images provided (use 'images' files or an 'archive' zip)"}), 400
+
+    batch_id = str(uuid.uuid4())
+    BATCH_STORE.create(batch_id, items)
+    accepted = sum(1 for item in items if item.get("session_id"))
+    print(f"[Batch] {batch_id}: {accepted}/{len(items)} image(s) accepted")
+
+    return jsonify({
+        "success": True,
+        "batch_id": batch_id,
+        "total": len(items),
+        "accepted": accepted,
+        "cached": sum(1 for item in items if item.get("cached")),
+        "rejected": len(items) - accepted,
+        "status_url": f"/api/batches/{batch_id}",
+    }), 202
+
+
+@app.route('/api/batches/<batch_id>', methods=['GET'])
+def get_batch_status(batch_id):
+    """Aggregate progress of a batch job plus per-image results.
+
+    `?offset=&limit=` page through `items` (default: all); `counts` and
+    `progress` always cover the whole batch.
+    """
+    batch = BATCH_STORE.get(batch_id)
+    if not batch:
+        return jsonify({"error": "Batch not found"}), 404
+    try:
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = request.args.get("limit")
+        limit = max(0, int(limit)) if limit is not None else None
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+
+    counts = dict.fromkeys(("queued", "processing", "completed", "failed", "rejected", "expired"), 0)
+    counts.update(BATCH_STORE.status_counts(batch_id))
+    items = BATCH_STORE.items(batch_id, offset, limit)
+    sessions = SESSION_STORE.get_many([item["session_id"] for item in items if item["session_id"]])
+
+    results = []
+    for item in items:
+        session = sessions.get(item["session_id"]) if item["session_id"] else None
+        if item["error"]:
+            status = "rejected"
+        elif session is None:
+            status = "expired"
+        else:
+            status = session["status"]
+
+        result = {
+            "index": item["item_index"],
+            "filename": item["filename"],
+            "session_id": item["session_id"],
+            "status": status,
+            "cached": bool(item["cached"]),
+            "error": item["error"] or (session or {}).get("error"),
+        }
+        if status == "completed":
+            result["num_persons"] = session["num_persons"]
+            result["rig_url"] = f"/api/sessions/{session['session_id']}/{RIG_GLB_FILENAME}"
+        results.append(result)
+
+    pending = counts["queued"] + counts["processing"]
+    return jsonify({
+        "batch_id": batch_id,
+        "created_at": batch["created_at"],
+        "total": batch["total"],
+        "counts": counts,
+        "progress": round((batch["total"] - pending) / batch["total"], 4) if batch["total"] else 1.0,
+        "done": pending == 0,
+        "offset": offset,
+        "items": results,
+    })
+
 
 @app.route('/api/sessions/<session_id>', methods=['GET'])
 def get_session_status(session_id):
+    """Session status; completed sessions carry rig data.
+
+    `?format=json` (default) inlines `rig_data`; `?format=glb` returns a
+    `rig_url` pointing at the session's binary glTF instead.
+    `?encoding=quantized` switches either form to int16 positions.
+    `?fields=keypoints,skeleton,...` limits each `rig_data` entry to those
+    sections (see `RIG_FIELDS`); GET /api/sessions/<id>/persons/<index>
+    serves a single person.
+
+    Long-polling: with `?wait=<seconds>&since=<stage>` the request blocks
+    until the session leaves `since` or the timeout expires.
+    """
+    try:
+        rig_format, encoding, fields, wait_seconds, since = parse_session_status_args(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
     session = SESSION_STORE.get(session_id)
     if not session:
         return jsonify({"error": "Session not found"}), 404
 
+    if wait_seconds > 0 and since and session["status"] not in TERMINAL_STATUSES:
+        SESSION_EVENTS.wait_for(session_id, lambda _, event: event["stage"] != since, wait_seconds)
+        session = SESSION_STORE.get(session_id) or session
+
+    etag, render = session_status_snapshot(session, rig_format, encoding, fields)
+    return cacheable_response(etag, render)
+
+
+def parse_rig_fields(value):
+    """`fields=` query value as a tuple in `RIG_FIELDS` order; None selects every field."""
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(RIG_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(RIG_FIELDS)}")
+    return tuple(name for name in RIG_FIELDS if name in requested)
+
+
+def parse_rig_encoding(args):
+    encoding = args.get("encoding", "float")
+    if encoding not in RIG_ENCODINGS:
+        raise ValueError("encoding must be 'float' or 'quantized'")
+    return encoding
+
+
+def parse_session_status_args(args):
+    """`(format, encoding, fields, wait_seconds, since)` of a status request; ValueError on bad input."""
+    rig_format = args.get("format", "json")
+    if rig_format not in ("json", "glb"):
+        raise ValueError("format must be 'json' or 'glb'")
+    encoding = parse_rig_encoding(args)
+    fields = parse_rig_fields(args.get("fields"))
+    try:
+        wait_seconds = min(max(float(args.get("wait", 0)), 0.0), LONG_POLL_MAX_SECONDS)
+    except ValueError:
+        raise ValueError("wait must be numeric") from None
+    return rig_format, encoding, fields, wait_seconds, args.get("since")
+
+
+def session_status_snapshot(session, rig_format, encoding, fields=None):
+    """`(etag, render)` for a session's status; `render()` returns the JSON body bytes."""
+    session_id = session["session_id"]
+    quantized = encoding == "quantized"
+    _, latest_event = SESSION_EVENTS.latest(session_id)
+    stage = session["status"]
+    if latest_event is not None and latest_event["status"] == session["status"]:
+        stage = latest_event["stage"]
+
+    # Everything in the response derives from these fields, so unchanged
+    # sessions are answered with 304 before any rig data is serialized.
+    template_hash = RIG_TEMPLATE_ASSET[0] if RIG_TEMPLATE_ASSET is not None else None
+    queue = queue_status(session_id) if session["status"] == "queued" else {}
+    state = (
+        session_id, session["status"], stage, session["updated_at"], rig_format, encoding, fields, template_hash, queue,
+    )
+    etag = hashlib.sha1(repr(state).encode("utf-8")).hexdigest()[:20]
+
+    def render():
+        with STAGE_SECONDS.time(stage="response"):
+            payload = session_status_payload(session, stage, rig_format, quantized, fields)
+            payload.update(queue)
+            return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    return etag, render
+
+
+def session_status_payload(session, stage, rig_format, quantized, fields=None):
+    """Body of GET /api/sessions/<session_id>."""
+    session_id = session["session_id"]
     payload = {
         "session_id": session_id,
         "status": session.get("status", "unknown"),
+        "stage": stage,
         "num_persons": session.get("num_persons", 0),
         "error": session.get("error"),
     }
     if session.get("status") == "completed":
-        payload["rig_data"] = session.get("rig_data", [])
+        if rig_format == "glb":
+            filename = RIG_QUANTIZED_GLB_FILENAME if quantized else RIG_GLB_FILENAME
+            payload["rig_url"] = f"/api/sessions/{session_id}/{filename}"
+            payload["rig_quantized_url"] = f"/api/sessions/{session_id}/{RIG_QUANTIZED_GLB_FILENAME}"
+        else:
+            persons = SESSION_STORE.get_rig_data(session_id) or []
+            payload["rig_data"] = [person.to_payload(quantized=quantized, fields=fields) for person in persons]
+            if RIG_TEMPLATE_ASSET is not None:
+                payload["template_url"] = template_url(quantized)
+    return payload
+
+
+def template_url(quantized):
+    encoding_param = "?encoding=quantized" if quantized else ""
+    return f"/api/template/{RIG_TEMPLATE_ASSET[0]}{encoding_param}"
+
+
+@app.route('/api/sessions/<session_id>/persons/<int:index>', methods=['GET'])
+def get_session_person(session_id, index):
+    """One person of a completed session, optionally projected with `?fields=`.
 
-    return jsonify(payload)
+    Takes `?encoding=` like the status endpoint. Only this person's rig is
+    loaded and only the requested fields are serialized.
+    """
+    try:
+        encoding = parse_rig_encoding(request.args)
+        fields = parse_rig_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    session = SESSION_STORE.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    body, status = session_person_check(session, index)
+    if body is not None:
+        return jsonify(body), status
+
+    etag, render = session_person_snapshot(session, index, encoding, fields)
+    return cacheable_response(etag, render)
+
+
+def session_person_check(session, index):
+    """`(error body, status)` when `index` does not name a person of `session`, else `(None, 200)`."""
+    if session["status"] != "completed":
+        return {"error": "Session has no results yet", "status": session["status"]}, 409
+    if not 0 <= index < (session.get("num_persons") or 0):
+        return {"error": "Person not found", "num_persons": session.get("num_persons") or 0}, 404
+    return None, 200
+
+
+def session_person_snapshot(session, index, encoding, fields=None):
+    """`(etag, render)` for GET /api/sessions/<id>/persons/<index>."""
+    session_id = session["session_id"]
+    quantized = encoding == "quantized"
+    template_hash = RIG_TEMPLATE_ASSET[0] if RIG_TEMPLATE_ASSET is not None else None
+    state = (session_id, session["updated_at"], index, encoding, fields, template_hash)
+    etag = hashlib.sha1(repr(state).encode("utf-8")).hexdigest()[:20]
+
+    def render():
+        with STAGE_SECONDS.time(stage="response"):
+            head = {"session_id": session_id, "index": index, "num_persons": session.get("num_persons", 0)}
+            if template_hash is not None:
+                head["template_url"] = template_url(quantized)
+            person = session_person_json(session, index, quantized, fields)
+            # The person JSON may be a stored file; splice it in rather than re-encode it
+            return json.dumps(head, separators=(",", ":")).encode("utf-8")[:-1] + b',"person":' + person + b"}"
+
+    return etag, render
+
+
+def session_person_json(session, index, quantized, fields):
+    """Serialized payload of one person, loading nothing else of the session.
+
+    Uses the in-memory rigs when the session is cached; otherwise reads only
+    `person_<index+1>_rig.json`, which already is the full float payload.
+    """
+    session_id = session["session_id"]
+    persons = SESSION_STORE.peek_rig_data(session_id)
+    if persons is not None:
+        if index >= len(persons):
+            raise LookupError(f"Person {index} of session {session_id} is unavailable")
+        person = persons[index]
+    else:
+        RIG_WRITER.wait(session_id, timeout=RIG_WRITE_WAIT_SECONDS)
+        path = Path(session["session_dir"]) / f"person_{index + 1}_rig.json"
+        if fields is None and not quantized:
+            return path.read_bytes()
+        with open(path, 'r', encoding='utf-8') as f:
+            person = PersonRig.from_payload(json.load(f), RIG_TEMPLATE)
+    payload = person.to_payload(quantized=quantized, fields=fields)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+@app.route('/api/sessions/<session_id>/events', methods=['GET'])
+def stream_session_events(session_id):
+    """Server-Sent Events stream of a session's stage transitions.
+
+    Sends the current state immediately, then one event per transition
+    (queued, detecting, estimating, exporting, completed/failed) and closes
+    after the terminal event. Completed events carry `rig_url` rather than
+    the rig data itself.
+    """
+    session = SESSION_STORE.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+
+    def generate():
+        version, event = SESSION_EVENTS.latest(session_id)
+        if event is None or event["status"] != session["status"]:
+            event = session_event(session)
+        while True:
+            yield f"id: {version}\ndata: {json.dumps(event)}\n\n"
+            if event["status"] in TERMINAL_STATUSES:
+                return
+            while True:
+                next_version, next_event = SESSION_EVENTS.wait(session_id, version, SSE_KEEPALIVE_SECONDS)
+                if next_event is not None:
+                    version, event = next_version, next_event
+                    break
+                yield ": keep-alive\n\n"
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route('/api/template', methods=['GET'])
+@app.route('/api/template/<template_hash>', methods=['GET'])
+def get_rig_template(template_hash=None):
+    """Shared faces, skinning and joint hierarchy referenced by person payloads.
+
+    The hashed URL is immutable and cached for a year; the bare URL always
+    revalidates via its ETag. `?encoding=quantized` returns uint8 skin weights.
+    """
+    if RIG_TEMPLATE_ASSET is None:
+        return jsonify({"error": "Model is not loaded yet"}), 503
+    encoding = request.args.get("encoding", "float")
+    if encoding not in RIG_ENCODINGS:
+        return jsonify({"error": "encoding must be 'float' or 'quantized'"}), 400
+
+    current_hash, body, quantized_body = RIG_TEMPLATE_ASSET
+    if template_hash is not None and template_hash != current_hash:
+        return jsonify({"error": "Unknown template version", "current": current_hash}), 404
+
+    if encoding == "quantized":
+        etag, body = f"{current_hash}-q", quantized_body
+    else:
+        etag = current_hash
+    cache_control = IMMUTABLE_CACHE_CONTROL if template_hash is not None else "no-cache"
+    return cacheable_response(etag, lambda: body, cache_control=cache_control)
 
 
 @app.route('/api/sessions/<session_id>/<filename>')
 def get_session_file(session_id, filename):
-    """Serve files from session directory"""
+    """Serve files from session directory
+
+    Exported files never change once written, so they are cached as
+    immutable; gzip siblings written at export time are preferred.
+    """
+    if not is_session_file(session_id, filename):
+        return jsonify({"error": "File not found"}), 404
+    RIG_WRITER.wait(session_id, timeout=RIG_WRITE_WAIT_SECONDS)
     try:
-        return send_from_directory(
-            OUTPUT_FOLDER / session_id,
-            filename
-        )
+        return send_precompressed(OUTPUT_FOLDER / session_id, filename, IMMUTABLE_CACHE_CONTROL)
     except Exception as e:
         return jsonify({"error": str(e)}), 404
 
@@ -548,56 +1805,199 @@ def calculate_measurements():
         payload = request.get_json(force=True)
     except Exception:
         return jsonify({"error": "Invalid JSON payload"}), 400
+    body, status, headers = measurement_result(payload)
+    return jsonify(body), status, headers
+
+
+def rig_data_unavailable():
+    """`(body, status, headers)` when a completed session's rig data cannot be loaded."""
+    if RIG_TEMPLATE is None:
+        return {"error": "Model is not loaded yet"}, 503, {"Retry-After": str(MODEL_LOADING_RETRY_AFTER_SECONDS)}
+    return {"error": "Rig data not found"}, 404, {}
+
+
+def measurement_result(payload):
+    """`(body, status, headers)` of POST /api/measurements for a parsed JSON payload."""
+    if not isinstance(payload, dict):
+        return {"error": "Invalid JSON payload"}, 400, {}
 
     session_id = payload.get("session_id")
     if not session_id:
-        return jsonify({"error": "Missing session_id"}), 400
+        return {"error": "Missing session_id"}, 400, {}
 
     session = SESSION_STORE.get(session_id)
     if not session:
-        return jsonify({"error": "Session not found"}), 404
+        return {"error": "Session not found"}, 404, {}
 
     if session.get("status") != "completed":
-        return jsonify({"error": "Session is not ready"}), 409
-
-    rig_data = session.get("rig_data") or []
+        return {"error": "Session is not ready"}, 409, {}
 
     try:
         person_index = int(payload.get("person_index", 0))
     except (TypeError, ValueError):
-        return jsonify({"error": "Invalid person_index"}), 400
-
-    if person_index < 0 or person_index >= len(rig_data):
-        return jsonify({"error": "person_index out of range"}), 400
+        return {"error": "Invalid person_index"}, 400, {}
 
     target_height_cm = payload.get("target_height_cm")
     if target_height_cm is not None:
         try:
             target_height_cm = float(target_height_cm)
         except (TypeError, ValueError):
-            return jsonify({"error": "target_height_cm must be numeric"}), 400
+            return {"error": "target_height_cm must be numeric"}, 400, {}
 
     try:
-        result = compute_measurements(rig_data[person_index], target_height_cm=target_height_cm)
+        measured = get_session_measurements(session)
+        if measured is None:
+            return rig_data_unavailable()
+        if person_index < 0 or person_index >= len(measured):
+            return {"error": "person_index out of range"}, 400, {}
+        if "error" in measured[person_index]:
+            raise MeasurementError(measured[person_index]["error"])
+        result = scale_measurements(measured[person_index], target_height_cm)
         result.update({
             "session_id": session_id,
             "person_index": person_index,
         })
-        return jsonify(result)
+        return result, 200, {}
     except MeasurementError as err:
-        return jsonify({"error": str(err)}), 422
+        return {"error": str(err)}, 422, {}
     except Exception as exc:
         print(f"[Measurements] Failed for session {session_id}: {exc}")
-        return jsonify({"error": "Failed to compute measurements"}), 500
+        return {"error": "Failed to compute measurements"}, 500, {}
+
+
+def _bulk_list(payload, plural, singular, default):
+    """`payload[plural]`, or `[payload[singular]]`, or `default`; None if not a list."""
+    if plural in payload:
+        values = payload[plural]
+        return values if isinstance(values, list) else None
+    if singular in payload:
+        return [payload[singular]]
+    return default
+
+
+def bulk_person_tables(measured, target_heights):
+    """One person's landmarks plus a measurement table per target height."""
+    if "error" in measured:
+        return {"error": measured["error"]}
+    person = None
+    tables = []
+    for target_height_cm in target_heights:
+        result = scale_measurements(measured, target_height_cm)
+        if person is None:
+            person = {
+                "actual_height_cm": result["actual_height_cm"],
+                "landmarks": result["landmarks"],
+                "metadata": result["metadata"],
+            }
+        tables.append({
+            "target_height_cm": result["target_height_cm"],
+            "scale_factor": result["scale_factor"],
+            "measurements": result["measurements"],
+        })
+    person["tables"] = tables
+    return person
+
+
+@app.route('/api/measurements/bulk', methods=['POST'])
+def calculate_measurements_bulk():
+    """Measurement tables for several sessions, persons and target heights at once.
+
+    Accepts `session_ids` (or `session_id`), optional `person_indices`
+    (default: every person) and optional `target_heights_cm` (default: the
+    reconstructed height). Each person is measured once and every table is a
+    rescale of that result; landmarks and the schema are sent once.
+    """
+    try:
+        payload = request.get_json(force=True)
+    except Exception:
+        return jsonify({"error": "Invalid JSON payload"}), 400
+    body, status = bulk_measurement_result(payload)
+    return jsonify(body), status
+
+
+def bulk_measurement_result(payload):
+    """`(body, status)` of POST /api/measurements/bulk for a parsed JSON payload."""
+    if not isinstance(payload, dict):
+        return {"error": "Invalid JSON payload"}, 400
+
+    session_ids = _bulk_list(payload, "session_ids", "session_id", None)
+    if not session_ids or not all(isinstance(session_id, str) for session_id in session_ids):
+        return {"error": "Missing session_ids"}, 400
+    if len(session_ids) > BULK_MEASUREMENT_MAX_SESSIONS:
+        return {"error": f"At most {BULK_MEASUREMENT_MAX_SESSIONS} sessions per request"}, 400
+
+    person_indices = _bulk_list(payload, "person_indices", "person_index", [])
+    target_heights = _bulk_list(payload, "target_heights_cm", "target_height_cm", [None])
+    if person_indices is None or target_heights is None:
+        return {"error": "person_indices and target_heights_cm must be lists"}, 400
+    try:
+        person_indices = [int(index) for index in person_indices]
+    except (TypeError, ValueError):
+        return {"error": "Invalid person_indices"}, 400
+    try:
+        target_heights = [None if height is None else float(height) for height in target_heights]
+    except (TypeError, ValueError):
+        return {"error": "target_heights_cm must be numeric"}, 400
+    if not target_heights:
+        target_heights = [None]
+    if len(target_heights) > BULK_MEASUREMENT_MAX_HEIGHTS:
+        return {"error": f"At most {BULK_MEASUREMENT_MAX_HEIGHTS} target heights per request"}, 400
+    if any(height is not None and height <= 0 for height in target_heights):
+        return {"error": "Target height must be positive"}, 422
+
+    results = []
+    for session_id in session_ids:
+        session = SESSION_STORE.get(session_id)
+        if not session:
+            results.append({"session_id": session_id, "error": "Session not found"})
+            continue
+        if session.get("status") != "completed":
+            results.append({"session_id": session_id, "error": "Session is not ready"})
+            continue
+        try:
+            measured = get_session_measurements(session)
+            if measured is None:
+                body, _, _ = rig_data_unavailable()
+                results.append({"session_id": session_id, "error": body["error"]})
+                continue
+            persons = []
+            for person_index in person_indices or range(len(measured)):
+                if 0 <= person_index < len(measured):
+                    person = bulk_person_tables(measured[person_index], target_heights)
+                else:
+                    person = {"error": "person_index out of range"}
+                persons.append({"person_index": person_index, **person})
+            results.append({"session_id": session_id, "persons": persons})
+        except Exception as exc:
+            print(f"[Measurements] Failed for session {session_id}: {exc}")
+            results.append({"session_id": session_id, "error": "Failed to compute measurements"})
+
+    return {"schema": measurement_schema(), "results": results}, 200
 
 
 # Serve React frontend
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_frontend(path):
-    if path and Path(app.static_folder, path).exists():
-        return send_from_directory(app.static_folder, path)
-    return send_from_directory(app.static_folder, 'index.html')
+    """Serve the built frontend; content-hashed assets are cached as immutable."""
+    if path and Path(app.static_folder, path).is_file():
+        cache_control = IMMUTABLE_CACHE_CONTROL if path.startswith(HASHED_ASSET_PREFIX) else "no-cache"
+        return send_static_file_compressed(path, cache_control)
+    return send_static_file_compressed('index.html', "no-cache")
+
+
+def send_static_file_compressed(path, cache_control):
+    """Send a frontend file, gzipping text assets once per file version."""
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if not mimetype.startswith("text/") and mimetype not in COMPRESSIBLE_MIMETYPES:
+        response = send_from_directory(app.static_folder, path)
+        response.headers["Cache-Control"] = cache_control
+        return response
+
+    file_path = Path(app.static_folder, path)
+    stat = file_path.stat()
+    etag = hashlib.sha1(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")).hexdigest()[:20]
+    return cacheable_response(etag, file_path.read_bytes, mimetype=mimetype, cache_control=cache_control)
 
 
 if __name__ == '__main__':
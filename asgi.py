@@ -0,0 +1,229 @@
+"""ASGI serving mode for the SAM-3D-Body web API.
+
+Run with an ASGI server instead of `python app.py`, e.g.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Requires `starlette`, `python-multipart` and an ASGI server such as
+`uvicorn`. Uploads, status polls (including long polls), per-person
+resources, progress streams, session file downloads and measurements are
+served natively: waiting happens on the event loop, files are streamed
+without holding a thread, and CPU-bound work (validation, rig
+serialization, measurements) runs in executors. Every other route is
+forwarded to the Flask app unchanged.
+"""
+
+import asyncio
+import json
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as api
+from sam_3d_body.serving import GZIP_MIN_BYTES, GZIP_SUFFIX, accepts_gzip, gzip_bytes
+
+# Measurements are CPU-bound numpy work; a small dedicated pool keeps them
+# from starving the threadpool used for short blocking calls.
+MEASUREMENT_WORKERS = max(1, int(os.environ.get("ASGI_MEASUREMENT_WORKERS", "4")))
+MEASUREMENT_EXECUTOR = ThreadPoolExecutor(max_workers=MEASUREMENT_WORKERS, thread_name_prefix="measurements")
+WRITER_POLL_SECONDS = 0.05
+
+
+def _if_none_match(request):
+    tags = set()
+    for tag in request.headers.get("if-none-match", "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag.strip('"'))
+    return tags
+
+
+async def cacheable_response(request, etag, render, media_type="application/json", cache_control="no-cache"):
+    """Async counterpart of `app.cacheable_response`, sharing its gzip body cache."""
+    use_gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    variant = f"{etag}-gz" if use_gzip else etag
+    headers = {"ETag": f'"{variant}"', "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    if variant in _if_none_match(request):
+        return Response(status_code=304, headers=headers)
+
+    body = api.GZIP_BODIES.get(variant) if use_gzip else None
+    if body is None:
+        body = await run_in_threadpool(render)
+        if use_gzip and len(body) >= GZIP_MIN_BYTES:
+            body = await run_in_threadpool(gzip_bytes, body)
+            api.GZIP_BODIES.put(variant, body)
+        else:
+            use_gzip = False
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type=media_type, headers=headers)
+
+
+async def process_image(request):
+    if int(request.headers.get("content-length") or 0) > api.MAX_UPLOAD_BYTES:
+        return JSONResponse({"error": "Image is larger than 16MB"}, status_code=413)
+
+    form = await request.form()
+    upload = form.get("image")
+    if upload is None or not hasattr(upload, "filename"):
+        return JSONResponse({"error": "No image file provided"}, status_code=400)
+    if not upload.filename:
+        return JSONResponse({"error": "No file selected"}, status_code=400)
+    if not api.allowed_file(upload.filename):
+        return JSONResponse({"error": "Invalid file type. Allowed: png, jpg, jpeg, webp"}, status_code=400)
+
+    try:
+        image_bytes = await upload.read()
+        body, status, headers = await run_in_threadpool(api.submit_upload, image_bytes, upload.filename)
+    except Exception as exc:
+        print(f"Error processing image: {exc}")
+        return JSONResponse({"error": str(exc)}, status_code=500)
+    finally:
+        await form.close()
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+async def get_session_status(request):
+    session_id = request.path_params["session_id"]
+    try:
+        rig_format, encoding, fields, wait_seconds, since = api.parse_session_status_args(request.query_params)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    session = await run_in_threadpool(api.SESSION_STORE.get, session_id)
+    if not session:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+
+    if wait_seconds > 0 and since and session["status"] not in api.TERMINAL_STATUSES:
+        await api.SESSION_EVENTS.async_wait_for(session_id, lambda _, event: event["stage"] != since, wait_seconds)
+        session = await run_in_threadpool(api.SESSION_STORE.get, session_id) or session
+
+    etag, render = await run_in_threadpool(api.session_status_snapshot, session, rig_format, encoding, fields)
+    return await cacheable_response(request, etag, render)
+
+
+async def get_session_person(request):
+    session_id = request.path_params["session_id"]
+    index = request.path_params["index"]
+    try:
+        encoding = api.parse_rig_encoding(request.query_params)
+        fields = api.parse_rig_fields(request.query_params.get("fields"))
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    session = await run_in_threadpool(api.SESSION_STORE.get, session_id)
+    if not session:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+    body, status = api.session_person_check(session, index)
+    if body is not None:
+        return JSONResponse(body, status_code=status)
+
+    etag, render = api.session_person_snapshot(session, index, encoding, fields)
+    return await cacheable_response(request, etag, render)
+
+
+async def stream_session_events(request):
+    session_id = request.path_params["session_id"]
+    session = await run_in_threadpool(api.SESSION_STORE.get, session_id)
+    if not session:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+
+    async def generate():
+        version, event = api.SESSION_EVENTS.latest(session_id)
+        if event is None or event["status"] != session["status"]:
+            event = api.session_event(session)
+        while True:
+            yield f"id: {version}\ndata: {json.dumps(event)}\n\n"
+            if event["status"] in api.TERMINAL_STATUSES:
+                return
+            while True:
+                after = version
+                next_version, next_event = await api.SESSION_EVENTS.async_wait_for(
+                    session_id,
+                    lambda candidate, _: candidate > after,
+                    api.SSE_KEEPALIVE_SECONDS,
+                    default_version=after,
+                )
+                if next_event is not None:
+                    version, event = next_version, next_event
+                    break
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def get_session_file(request):
+    session_id = request.path_params["session_id"]
+    filename = request.path_params["filename"]
+    if not await run_in_threadpool(api.is_session_file, session_id, filename):
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    # Wait for pending exports without parking a thread
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + api.RIG_WRITE_WAIT_SECONDS
+    while api.RIG_WRITER.pending(session_id) and loop.time() < deadline:
+        await asyncio.sleep(WRITER_POLL_SECONDS)
+
+    directory = api.OUTPUT_FOLDER / session_id
+    path = directory / filename
+    gz_path = directory / f"{filename}{GZIP_SUFFIX}"
+    headers = {"Cache-Control": api.IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding")) and gz_path.is_file():
+        headers["Content-Encoding"] = "gzip"
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        return FileResponse(gz_path, media_type=media_type, headers=headers)
+    if not path.is_file():
+        return JSONResponse({"error": "File not found"}, status_code=404)
+    return FileResponse(path, headers=headers)
+
+
+async def _json_payload(request):
+    try:
+        return await request.json()
+    except Exception:
+        return None
+
+
+async def calculate_measurements(request):
+    payload = await _json_payload(request)
+    loop = asyncio.get_running_loop()
+    body, status, headers = await loop.run_in_executor(MEASUREMENT_EXECUTOR, api.measurement_result, payload)
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+async def calculate_measurements_bulk(request):
+    payload = await _json_payload(request)
+    loop = asyncio.get_running_loop()
+    body, status = await loop.run_in_executor(MEASUREMENT_EXECUTOR, api.bulk_measurement_result, payload)
+    return JSONResponse(body, status_code=status)
+
+
+application = Starlette(
+    routes=[
+        Route("/api/process", process_image, methods=["POST"]),
+        Route("/api/measurements", calculate_measurements, methods=["POST"]),
+        Route("/api/measurements/bulk", calculate_measurements_bulk, methods=["POST"]),
+        Route("/api/sessions/{session_id}", get_session_status, methods=["GET"]),
+        Route("/api/sessions/{session_id}/events", stream_session_events, methods=["GET"]),
+        Route("/api/sessions/{session_id}/persons/{index:int}", get_session_person, methods=["GET"]),
+        Route("/api/sessions/{session_id}/{filename}", get_session_file, methods=["GET"]),
+        # Everything else (health, metrics, batches, template, frontend)
+        Mount("/", app=WSGIMiddleware(api.app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+)
@@ -1,15 +1,18 @@
- import { useState, useCallback, useEffect, useRef, createContext } from 'react'
+ import { useState, useCallback, useEffect, createContext } from 'react'
 import { Flex, Box, Button } from '@radix-ui/themes'
 import UploadPanel from './components/UploadPanel'
 import ViewerPanel from './components/ViewerPanel'
 import ControlPanel from './components/ControlPanel'
 import MeasurementOverlay from './components/MeasurementOverlay'
 import { translations } from './i18n'
+import { fetchRigGlb } from './rigGlb'
 import './App.css'
 
 export const LanguageContext = createContext('en')
 
 const SESSION_CACHE_KEY = 'sam3d-body-session-v1'
+// The viewer loads the full-precision rig.glb; ?quantized=1 opts in to rig_q.glb
+const PREFER_QUANTIZED_RIG = new URLSearchParams(window.location.search).get('quantized') === '1'
 
 const readFileAsDataUrl = (file) => {
   return new Promise((resolve, reject) => {
@@ -51,7 +54,6 @@ function App() {
   const [measurementLoading, setMeasurementLoading] = useState(false)
   const [measurementError, setMeasurementError] = useState(null)
   const [isMeasurementOverlayOpen, setIsMeasurementOverlayOpen] = useState(false)
-  const pollAttemptRef = useRef(0)
 
   const persistSessionState = useCallback((payload) => {
     if (typeof window === 'undefined') return
@@ -107,9 +109,10 @@ function App() {
       setSessionMeta({
         sessionId: data.session_id,
         status: data.status || 'queued',
-        numPersons: data.num_persons || 0
+        numPersons: data.num_persons || 0,
+        queuePosition: data.queue_position ?? null,
+        estimatedStartSeconds: data.estimated_start_seconds ?? null
       })
-      pollAttemptRef.current = 0
       setRestoringSession(false)
     } catch (err) {
       setError(err.message)
@@ -165,7 +168,6 @@ function App() {
     setMeasurementError(null)
     setIsMeasurementOverlayOpen(false)
     setRestoringSession(false)
-    pollAttemptRef.current = 0
   }, [clearSessionCache])
 
   const handleReprocess = useCallback(() => {
@@ -288,103 +290,129 @@ function App() {
     setRestoringSession(false)
   }, [clearSessionCache])
 
-  useEffect(() => {
-    pollAttemptRef.current = 0
-  }, [sessionMeta?.sessionId])
-
   useEffect(() => {
     const sessionId = sessionMeta?.sessionId
-    const status = sessionMeta?.status
-
     if (!sessionId) return
-    if (status === 'failed') {
-      setLoading(false)
-      setRestoringSession(false)
-      return
-    }
-    if (status === 'completed' && rigData?.rig_data?.length) {
-      setLoading(false)
-      setRestoringSession(false)
-      return
-    }
 
     let cancelled = false
+    let source = null
     let timeoutId
 
-    const poll = async () => {
-      try {
-        const res = await fetch(`/api/sessions/${sessionId}`)
-        if (!res.ok) {
-          if (res.status === 404) {
-            clearSessionCache()
-            if (!cancelled) {
-              setError('Session expired or not found')
-              setLoading(false)
-              setRestoringSession(false)
-              setSessionMeta(null)
-            }
-            return
-          }
-          throw new Error('Failed to fetch session status')
-        }
+    const finish = () => {
+      if (source) {
+        source.close()
+        source = null
+      }
+      setLoading(false)
+      setRestoringSession(false)
+    }
 
-        const data = await res.json()
-        if (cancelled) {
-          return
-        }
+    const expireSession = () => {
+      clearSessionCache()
+      setError('Session expired or not found')
+      setSessionMeta(null)
+      finish()
+    }
 
-        setSessionMeta(prev => ({
-          sessionId: data.session_id,
-          status: data.status,
-          numPersons: data.num_persons ?? prev?.numPersons ?? 0
-        }))
+    // Returns true once the session reached a terminal state
+    const handleUpdate = async (data) => {
+      setSessionMeta(prev => ({
+        sessionId: data.session_id,
+        status: data.status,
+        stage: data.stage || data.status,
+        numPersons: data.num_persons ?? prev?.numPersons ?? 0,
+        queuePosition: data.queue_position ?? null,
+        estimatedStartSeconds: data.estimated_start_seconds ?? null
+      }))
 
-        if (data.status === 'completed' && data.rig_data) {
+      if (data.status === 'completed' && data.rig_url) {
+        if (source) {
+          source.close()
+          source = null
+        }
+        try {
+          // Sessions exported before rig_q.glb existed only have rig.glb
+          const rigList = PREFER_QUANTIZED_RIG && data.rig_quantized_url
+            ? await fetchRigGlb(data.rig_quantized_url).catch(() => fetchRigGlb(data.rig_url))
+            : await fetchRigGlb(data.rig_url)
+          if (cancelled) return true
           setRigData({
             success: true,
             session_id: data.session_id,
             num_persons: data.num_persons,
-            rig_data: data.rig_data
+            rig_data: rigList
           })
           setSelectedPerson(0)
           setJointRotationsByPerson({})
-          setLoading(false)
-          setRestoringSession(false)
-          pollAttemptRef.current = 0
-          return
+        } catch (err) {
+          if (!cancelled) setError(err.message)
         }
+        finish()
+        return true
+      }
+
+      if (data.status === 'failed') {
+        setError(data.error || 'Processing failed')
+        finish()
+        return true
+      }
+      return false
+    }
 
-        if (data.status === 'failed') {
-          setError(data.error || 'Processing failed')
-          setLoading(false)
-          setRestoringSession(false)
-          pollAttemptRef.current = 0
+    // Fallback when EventSource is unavailable or the stream cannot be opened
+    const longPoll = async (since) => {
+      try {
+        const sinceParam = since ? `&since=${encodeURIComponent(since)}` : ''
+        const res = await fetch(`/api/sessions/${sessionId}?format=glb&wait=25${sinceParam}`)
+        if (cancelled) return
+        if (res.status === 404) {
+          expireSession()
           return
         }
+        if (!res.ok) {
+          throw new Error('Failed to fetch session status')
+        }
+        const data = await res.json()
+        if (cancelled) return
+        if (!(await handleUpdate(data)) && !cancelled) {
+          longPoll(data.stage)
+        }
       } catch (pollErr) {
         if (!cancelled) {
           console.error('Session polling failed', pollErr)
+          timeoutId = setTimeout(() => longPoll(since), 5000)
         }
       }
+    }
 
-      if (!cancelled) {
-        const baseDelay = status === 'processing' ? 3000 : 4000
-        const multiplier = Math.pow(1.5, pollAttemptRef.current)
-        const delay = Math.min(baseDelay * multiplier, 15000)
-        pollAttemptRef.current += 1
-        timeoutId = setTimeout(poll, delay)
+    if (typeof EventSource === 'undefined') {
+      longPoll()
+    } else {
+      source = new EventSource(`/api/sessions/${sessionId}/events`)
+      source.onmessage = (event) => {
+        if (!cancelled) {
+          handleUpdate(JSON.parse(event.data))
+        }
+      }
+      source.onerror = () => {
+        // CONNECTING means the browser is retrying on its own
+        if (source && source.readyState === EventSource.CLOSED) {
+          source = null
+          if (!cancelled) longPoll()
+        }
       }
     }
 
-    poll()
-
     return () => {
       cancelled = true
+      if (source) {
+        source.close()
+      }
       if (timeoutId) {
         clearTimeout(timeoutId)
       }
     }
-  }, [sessionMeta?.sessionId, sessionMeta?.status, rigData, clearSessionCache])
+  }, [sessionMeta?.sessionId, clearSessionCache])
 
   useEffect(() => {
     if (!sessionMeta) return
@@ -477,7 +505,9 @@ function App() {
             onReprocess={handleReprocess}
             hasCachedResult={Boolean(sessionMeta?.status === 'completed' && rigData)}
             restoringSession={restoringSession}
-            sessionStatus={sessionMeta?.status}
+            sessionStatus={sessionMeta?.stage || sessionMeta?.status}
+            queuePosition={sessionMeta?.queuePosition}
+            estimatedStartSeconds={sessionMeta?.estimatedStartSeconds}
           />
 
           {rigData && (
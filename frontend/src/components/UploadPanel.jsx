@@ -15,11 +15,18 @@ export default function UploadPanel({
   onReprocess,
   hasCachedResult,
   restoringSession,
-  sessionStatus
+  sessionStatus,
+  queuePosition,
+  estimatedStartSeconds
 }) {
   const fileInputRef = useRef(null)
   const t = translations[language]
   const statusLabel = sessionStatus ? t.processingStatuses?.[sessionStatus] || sessionStatus : null
+  const queueLabel = sessionStatus === 'queued' && queuePosition
+    ? t.queuePosition
+      .replace('{position}', queuePosition)
+      .replace('{seconds}', Math.max(1, Math.round(estimatedStartSeconds ?? 0)))
+    : null
 
   const handleFileChange = useCallback((e) => {
     const file = e.target.files?.[0]
@@ -135,6 +142,12 @@ export default function UploadPanel({
         </Text>
       )}
 
+      {queueLabel && (
+        <Text size="1" color="gray" mt="1">
+          {queueLabel}
+        </Text>
+      )}
+
       {restoringSession && (
         <Text size="2" color="gray" mt="3">
           {t.restoringSession}
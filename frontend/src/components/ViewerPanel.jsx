@@ -5,6 +5,10 @@ import { Box, Text } from '@radix-ui/themes'
 import { translations } from '../i18n'
 import './ViewerPanel.css'
 
+const toTypedArray = (data, ArrayType) => (
+  ArrayBuffer.isView(data) ? data : new ArrayType(data.flat())
+)
+
 export default function ViewerPanel({
   allRigData,
   selectedPerson,
@@ -248,10 +252,11 @@ export default function ViewerPanel({
 
         // Create geometry
         const geometry = new THREE.BufferGeometry()
-        const vertices = new Float32Array(mesh.vertices.flat())
-        const indices = new Uint32Array(mesh.faces.flat())
-        const skinIndices = new Uint16Array(mesh.skinIndices.flat())
-        const skinWeights = new Float32Array(mesh.skinWeights.flat())
+        // GLB rigs already arrive as typed arrays; JSON rigs are nested lists
+        const vertices = toTypedArray(mesh.vertices, Float32Array)
+        const indices = toTypedArray(mesh.faces, Uint32Array)
+        const skinIndices = toTypedArray(mesh.skinIndices, Uint16Array)
+        const skinWeights = toTypedArray(mesh.skinWeights, Float32Array)
 
         geometry.setAttribute('position', new THREE.BufferAttribute(vertices, 3))
         geometry.setIndex(new THREE.BufferAttribute(indices, 1))
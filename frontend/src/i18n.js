@@ -75,9 +75,13 @@ export const translations = {
     clearResult: "Clear result",
     cachedSessionHint: "Latest result is cached locally. Refresh won't remove it.",
     restoringSession: "Restoring previous session...",
+    queuePosition: "Position {position} in queue · starts in ~{seconds}s",
     processingStatuses: {
       queued: "Queued – waiting for GPU...",
       processing: "Processing image...",
+      detecting: "Detecting people...",
+      estimating: "Estimating 3D body...",
+      exporting: "Building rig...",
       completed: "Processing finished",
       failed: "Processing failed"
     },
@@ -236,9 +240,13 @@ export const translations = {
     clearResult: "清除结果",
     cachedSessionHint: "已缓存最近一次结果，刷新也不会丢失。",
     restoringSession: "正在恢复上次的结果...",
+    queuePosition: "队列第 {position} 位 · 约 {seconds} 秒后开始",
     processingStatuses: {
       queued: "排队中，等待GPU资源...",
       processing: "图片处理中...",
+      detecting: "正在检测人物...",
+      estimating: "正在估计3D人体...",
+      exporting: "正在生成骨骼...",
       completed: "处理完成",
       failed: "处理失败"
     },
@@ -0,0 +1,118 @@
+// Minimal reader for the skinned rig.glb / rig_q.glb written by the backend.
+// Mesh buffers are returned as typed-array views over the downloaded bytes,
+// so no per-vertex parsing or copying happens on the client. Quantized files
+// (KHR_mesh_quantization) are expanded to float arrays once after download.
+
+const GLB_MAGIC = 0x46546c67
+const CHUNK_JSON = 0x4e4f534a
+const CHUNK_BIN = 0x004e4942
+
+const COMPONENT_ARRAYS = {
+  5121: Uint8Array,
+  5122: Int16Array,
+  5123: Uint16Array,
+  5125: Uint32Array,
+  5126: Float32Array
+}
+
+const TYPE_SIZES = {
+  SCALAR: 1,
+  VEC3: 3,
+  VEC4: 4,
+  MAT4: 16
+}
+
+export const parseRigGlb = (arrayBuffer) => {
+  const view = new DataView(arrayBuffer)
+  if (view.getUint32(0, true) !== GLB_MAGIC) {
+    throw new Error('Invalid rig file (not a GLB)')
+  }
+
+  let offset = 12
+  let gltf = null
+  let binOffset = -1
+  while (offset < view.byteLength) {
+    const chunkLength = view.getUint32(offset, true)
+    const chunkType = view.getUint32(offset + 4, true)
+    offset += 8
+    if (chunkType === CHUNK_JSON) {
+      gltf = JSON.parse(new TextDecoder().decode(new Uint8Array(arrayBuffer, offset, chunkLength)))
+    } else if (chunkType === CHUNK_BIN) {
+      binOffset = offset
+    }
+    offset += chunkLength
+  }
+  if (!gltf || binOffset < 0) {
+    throw new Error('Invalid rig file (missing chunks)')
+  }
+
+  const readAccessor = (index) => {
+    const accessor = gltf.accessors[index]
+    const bufferView = gltf.bufferViews[accessor.bufferView]
+    const ArrayType = COMPONENT_ARRAYS[accessor.componentType]
+    const byteOffset = binOffset + (bufferView.byteOffset || 0) + (accessor.byteOffset || 0)
+    const size = TYPE_SIZES[accessor.type]
+    const stride = (bufferView.byteStride || 0) / ArrayType.BYTES_PER_ELEMENT
+    if (!stride || stride === size) {
+      return new ArrayType(arrayBuffer, byteOffset, accessor.count * size)
+    }
+    // Padded elements (e.g. int16 VEC3 stored with an 8-byte stride)
+    const strided = new ArrayType(arrayBuffer, byteOffset, (accessor.count - 1) * stride + size)
+    const packed = new ArrayType(accessor.count * size)
+    for (let i = 0; i < accessor.count; i++) {
+      for (let c = 0; c < size; c++) {
+        packed[i * size + c] = strided[i * stride + c]
+      }
+    }
+    return packed
+  }
+
+  const dequantize = (values, { offset, scale }) => {
+    const out = new Float32Array(values.length)
+    for (let i = 0; i < values.length; i++) {
+      const axis = i % 3
+      out[i] = values[i] * scale[axis] + offset[axis]
+    }
+    return out
+  }
+
+  const readJoints = (index) => {
+    const values = readAccessor(index)
+    return values instanceof Uint8Array ? Uint16Array.from(values) : values
+  }
+
+  const readWeights = (index) => {
+    const values = readAccessor(index)
+    if (values instanceof Float32Array) return values
+    const out = new Float32Array(values.length)
+    for (let i = 0; i < values.length; i++) {
+      out[i] = values[i] / 255
+    }
+    return out
+  }
+
+  return gltf.nodes
+    .filter(node => node.mesh !== undefined)
+    .map(node => {
+      const primitive = gltf.meshes[node.mesh].primitives[0]
+      const { quantization, ...extras } = node.extras || {}
+      const positions = readAccessor(primitive.attributes.POSITION)
+      return {
+        ...extras,
+        mesh: {
+          vertices: quantization ? dequantize(positions, quantization) : positions,
+          faces: readAccessor(primitive.indices),
+          skinIndices: readJoints(primitive.attributes.JOINTS_0),
+          skinWeights: readWeights(primitive.attributes.WEIGHTS_0)
+        }
+      }
+    })
+}
+
+export const fetchRigGlb = async (url) => {
+  const res = await fetch(url)
+  if (!res.ok) {
+    throw new Error('Failed to download rig data')
+  }
+  return parseRigGlb(await res.arrayBuffer())
+}
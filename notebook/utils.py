@@ -96,6 +96,85 @@ def setup_sam_3d_body(
     return estimator
 
 
+def setup_managed_sam_3d_body(
+    hf_repo_id: str = "facebook/sam-3d-body-vith",
+    detector_name: str = "vitdet",
+    segmentor_name: str = "sam2",
+    fov_name: str = "moge2",
+    segmentor_path: str = "",
+    device: str = "cuda",
+    idle_seconds: float = 0.0,
+    offload_to_cpu: bool = False,
+    lock: Optional[Any] = None,
+):
+    """
+    Set up SAM 3D Body with components managed by a `ComponentManager`.
+
+    Same components as `setup_sam_3d_body`, but the detector, segmentor and
+    FOV estimator are only loaded on first use, and every component
+    (including the body model) is released after `idle_seconds` without use,
+    either to CPU memory (`offload_to_cpu`) or entirely. The body model is
+    loaded right away since the estimator reads its config and mesh faces.
+
+    Args:
+        idle_seconds: Release components unused for this long (0 = never)
+        offload_to_cpu: Move idle components to CPU instead of dropping them
+        lock: Lock held while the estimator runs; releases wait for it
+
+    Returns:
+        (estimator, manager): call `manager.start()` to begin idle releases
+    """
+    from sam_3d_body.serving.components import ComponentManager
+
+    manager = ComponentManager(
+        idle_seconds=idle_seconds, offload_to_cpu=offload_to_cpu, device=device, lock=lock
+    )
+
+    print(f"Loading SAM 3D Body model from {hf_repo_id}...")
+    model, model_cfg = load_sam_3d_body_hf(hf_repo_id, device=device)
+    body_model = manager.register(
+        "body_model",
+        lambda: load_sam_3d_body_hf(hf_repo_id, device=device)[0],
+        instance=model,
+    )
+
+    human_detector, human_segmentor, fov_estimator = None, None, None
+
+    if detector_name:
+        def load_detector():
+            from tools.build_detector import HumanDetector
+
+            return HumanDetector(name=detector_name, device=device)
+
+        human_detector = manager.register("detector", load_detector)
+
+    if segmentor_path:
+        def load_segmentor():
+            from tools.build_sam import HumanSegmentor
+
+            return HumanSegmentor(name=segmentor_name, device=device, path=segmentor_path)
+
+        human_segmentor = manager.register("segmentor", load_segmentor)
+
+    if fov_name:
+        def load_fov_estimator():
+            from tools.build_fov_estimator import FOVEstimator
+
+            return FOVEstimator(name=fov_name, device=device)
+
+        fov_estimator = manager.register("fov_estimator", load_fov_estimator)
+
+    estimator = SAM3DBodyEstimator(
+        sam_3d_body_model=body_model,
+        model_cfg=model_cfg,
+        human_detector=human_detector,
+        human_segmentor=human_segmentor,
+        fov_estimator=fov_estimator,
+    )
+    print(f"Setup complete! Components load on first use: {', '.join(manager.status())}")
+    return estimator, manager
+
+
 def setup_visualizer():
     """Set up skeleton visualizer with MHR70 pose info"""
     visualizer = SkeletonVisualizer(line_width=2, radius=5)
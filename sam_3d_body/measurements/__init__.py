@@ -1,6 +1,5 @@
 """Utilities for deriving anthropometric measurements from SAM-3D body rigs."""
 
-from .body_metrics import compute_measurements, MeasurementError
-
-__all__ = ["compute_measurements", "MeasurementError"]
+from .body_metrics import compute_measurements, measure_person, measurement_schema, scale_measurements, MeasurementError
 
+__all__ = ["compute_measurements", "measure_person", "measurement_schema", "scale_measurements", "MeasurementError"]
@@ -263,8 +263,13 @@ def _landmark_to_list(point: Optional[np.ndarray]) -> Optional[List[float]]:
     return point.astype(float).round(6).tolist()
 
 
-def compute_measurements(person_rig: Dict, target_height_cm: Optional[float] = None) -> Dict[str, object]:
-    """Compute anthropometric measurements for a reconstructed person."""
+def measure_person(person_rig: Dict) -> Dict[str, object]:
+    """Measure a reconstructed person at its reconstructed size.
+
+    Returns the unscaled values (metres, degrees) plus landmarks; the result
+    is JSON-serializable and can be cached and passed to
+    :func:`scale_measurements` for any target height.
+    """
     mesh = person_rig.get("mesh") or {}
     skeleton = person_rig.get("skeleton") or {}
 
@@ -283,16 +288,6 @@ def compute_measurements(person_rig: Dict, target_height_cm: Optional[float] = N
     if actual_height_m <= 0:
         raise MeasurementError("Invalid reconstructed height")
 
-    actual_height_cm = actual_height_m * 100.0
-    if target_height_cm is None:
-        target_height_cm = actual_height_cm
-
-    target_height_cm = float(target_height_cm)
-    if target_height_cm <= 0:
-        raise MeasurementError("Target height must be positive")
-
-    scale_factor = float(target_height_cm) / actual_height_cm
-
     joint_map = _vector_map(joint_names, joint_positions) if joint_positions.size else {}
     keypoint_map = _keypoint_map(keypoints)
 
@@ -456,18 +451,6 @@ def compute_measurements(person_rig: Dict, target_height_cm: Optional[float] = N
         "shoulder_slope": shoulder_slope,
     }
 
-    scaled_measurements: Dict[str, float] = {}
-    for key, value in raw_measurements.items():
-        if value is None:
-            continue
-        meta = MEASUREMENT_META.get(key)
-        if meta is None:
-            continue
-        if meta.unit == "deg" or not meta.scales_with_height:
-            scaled_measurements[key] = round(float(value), 2)
-        else:
-            scaled_measurements[key] = round(float(value) * scale_factor * 100.0, 2)
-
     landmarks = {
         "head_top": _landmark_to_list(head_vertex),
         "cervicale": _landmark_to_list(neck_point),
@@ -488,7 +471,23 @@ def compute_measurements(person_rig: Dict, target_height_cm: Optional[float] = N
         "lateral_malleolus_right": _landmark_to_list(right_ankle),
     }
 
-    schema = {
+    return {
+        "actual_height_cm": actual_height_m * 100.0,
+        "raw_measurements": {
+            key: float(value) if value is not None else None for key, value in raw_measurements.items()
+        },
+        "landmarks": landmarks,
+        "metadata": {
+            "waist_level_y": round(float(waist_level_y), 5),
+            "hip_level_y": round(float(hip_level_y), 5),
+            "bust_level_y": round(float(bust_level_y), 5),
+        },
+    }
+
+
+def measurement_schema() -> Dict[str, Dict[str, object]]:
+    """Unit, category and scaling behaviour of every measurement key."""
+    return {
         key: {
             "unit": meta.unit,
             "category": meta.category,
@@ -497,17 +496,47 @@ def compute_measurements(person_rig: Dict, target_height_cm: Optional[float] = N
         for key, meta in MEASUREMENT_META.items()
     }
 
+
+def scale_measurements(measured: Dict[str, object], target_height_cm: Optional[float] = None) -> Dict[str, object]:
+    """Scale the output of :func:`measure_person` to ``target_height_cm``.
+
+    Only values whose ``MEASUREMENT_META`` entry scales with height are
+    multiplied; angles are passed through.
+    """
+    actual_height_cm = float(measured["actual_height_cm"])
+    if target_height_cm is None:
+        target_height_cm = actual_height_cm
+
+    target_height_cm = float(target_height_cm)
+    if target_height_cm <= 0:
+        raise MeasurementError("Target height must be positive")
+
+    scale_factor = target_height_cm / actual_height_cm
+
+    scaled_measurements: Dict[str, float] = {}
+    for key, value in measured["raw_measurements"].items():
+        if value is None:
+            continue
+        meta = MEASUREMENT_META.get(key)
+        if meta is None:
+            continue
+        if meta.unit == "deg" or not meta.scales_with_height:
+            scaled_measurements[key] = round(float(value), 2)
+        else:
+            scaled_measurements[key] = round(float(value) * scale_factor * 100.0, 2)
+
     return {
         "actual_height_cm": round(actual_height_cm, 2),
         "target_height_cm": round(target_height_cm, 2),
         "scale_factor": round(scale_factor, 4),
         "measurements": scaled_measurements,
-        "landmarks": landmarks,
-        "metadata": {
-            "waist_level_y": round(float(waist_level_y), 5),
-            "hip_level_y": round(float(hip_level_y), 5),
-            "bust_level_y": round(float(bust_level_y), 5),
-        },
-        "schema": schema,
+        "landmarks": measured["landmarks"],
+        "metadata": measured["metadata"],
+        "schema": measurement_schema(),
     }
 
+
+def compute_measurements(person_rig: Dict, target_height_cm: Optional[float] = None) -> Dict[str, object]:
+    """Compute anthropometric measurements for a reconstructed person."""
+    return scale_measurements(measure_person(person_rig), target_height_cm)
+
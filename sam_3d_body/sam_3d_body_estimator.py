@@ -1,5 +1,6 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
-from typing import Optional, Union
+from contextlib import nullcontext
+from typing import List, Optional, Union
 
 import cv2
 
@@ -34,6 +35,9 @@ class SAM3DBodyEstimator:
         self.sam = human_segmentor
         self.fov_estimator = fov_estimator
         self.thresh_wrist_angle = 1.4
+        # Optional callable ``stage_timer(name)`` returning a context manager
+        # wrapped around each pipeline stage (e.g. to record latency metrics).
+        self.stage_timer = None
 
         # For mesh visualization
         self.faces = self.model.head_pose.faces.cpu().numpy()
@@ -60,6 +64,34 @@ class SAM3DBodyEstimator:
             ]
         )
 
+    def _stage(self, name: str):
+        return self.stage_timer(name) if self.stage_timer is not None else nullcontext()
+
+    @torch.no_grad()
+    def detect_humans(
+        self,
+        imgs: List[np.ndarray],
+        det_cat_id: int = 0,
+        bbox_thr: float = 0.5,
+        nms_thr: float = 0.3,
+    ) -> List[np.ndarray]:
+        """
+        Run the human detector over several BGR images in one forward pass.
+
+        The returned per-image boxes can be passed to `process_one_image` as
+        `bboxes`, which then skips its own detection step.
+        """
+        assert self.detector is not None, "Batched detection requires a detector!"
+        print(f"Running object detector on {len(imgs)} image(s)...")
+        with self._stage("detection"):
+            return self.detector.run_human_detection_batch(
+                imgs,
+                det_cat_id=det_cat_id,
+                bbox_thr=bbox_thr,
+                nms_thr=nms_thr,
+                default_to_full_image=False,
+            )
+
     @torch.no_grad()
     def process_one_image(
         self,
@@ -112,13 +144,14 @@ class SAM3DBodyEstimator:
                 img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
                 image_format = "bgr"
             print("Running object detector...")
-            boxes = self.detector.run_human_detection(
-                img,
-                det_cat_id=det_cat_id,
-                bbox_thr=bbox_thr,
-                nms_thr=nms_thr,
-                default_to_full_image=False,
-            )
+            with self._stage("detection"):
+                boxes = self.detector.run_human_detection(
+                    img,
+                    det_cat_id=det_cat_id,
+                    bbox_thr=bbox_thr,
+                    nms_thr=nms_thr,
+                    default_to_full_image=False,
+                )
             print("Found boxes:", boxes)
             self.is_crop = True
         else:
@@ -149,16 +182,18 @@ class SAM3DBodyEstimator:
         elif use_mask and self.sam is not None:
             print("Running SAM to get mask from bbox...")
             # Generate masks using SAM2
-            masks, masks_score = self.sam.run_sam(img, boxes)
+            with self._stage("sam2"):
+                masks, masks_score = self.sam.run_sam(img, boxes)
         else:
             masks, masks_score = None, None
 
         #################### Construct batch data samples ####################
-        batch = prepare_batch(img, self.transform, boxes, masks, masks_score)
+        with self._stage("preprocess"):
+            batch = prepare_batch(img, self.transform, boxes, masks, masks_score)
 
-        #################### Run model inference on an image ####################
-        batch = recursive_to(batch, "cuda")
-        self.model._initialize_batch(batch)
+            #################### Run model inference on an image ####################
+            batch = recursive_to(batch, "cuda")
+            self.model._initialize_batch(batch)
 
         # Handle camera intrinsics
         # - either provided externally or generated via default FOV estimator
@@ -169,27 +204,31 @@ class SAM3DBodyEstimator:
         elif self.fov_estimator is not None:
             print("Running FOV estimator ...")
             input_image = batch["img_ori"][0].data
-            cam_int = self.fov_estimator.get_cam_intrinsics(input_image).to(
-                batch["img"]
-            )
+            with self._stage("fov"):
+                cam_int = self.fov_estimator.get_cam_intrinsics(input_image).to(
+                    batch["img"]
+                )
             batch["cam_int"] = cam_int.clone()
         else:
             cam_int = batch["cam_int"].clone()
 
-        outputs = self.model.run_inference(
-            img,
-            batch,
-            inference_type=inference_type,
-            transform_hand=self.transform_hand,
-            thresh_wrist_angle=self.thresh_wrist_angle,
-        )
-        if inference_type == "full":
-            pose_output, batch_lhand, batch_rhand, _, _ = outputs
-        else:
-            pose_output = outputs
+        # The device-to-host copy is timed with the model: it is where queued
+        # CUDA work is waited on.
+        with self._stage("model"):
+            outputs = self.model.run_inference(
+                img,
+                batch,
+                inference_type=inference_type,
+                transform_hand=self.transform_hand,
+                thresh_wrist_angle=self.thresh_wrist_angle,
+            )
+            if inference_type == "full":
+                pose_output, batch_lhand, batch_rhand, _, _ = outputs
+            else:
+                pose_output = outputs
 
-        out = pose_output["mhr"]
-        out = recursive_to(out, "cpu")
+            out = pose_output["mhr"]
+            out = recursive_to(out, "cpu")
         out = recursive_to(out, "numpy")
         all_out = []
         for idx in range(batch["img"].shape[1]):
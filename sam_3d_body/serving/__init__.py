@@ -0,0 +1,95 @@
+"""Serving infrastructure for the SAM-3D-Body web API."""
+
+from .batch_store import BatchStore
+from .batching import MicroBatcher, MovingAverage, QueueFullError
+from .coalescing import InFlightJobs
+from .components import ComponentManager, ComponentProxy
+from .compression import (
+    GZIP_MIN_BYTES,
+    GZIP_SUFFIX,
+    CompressedBodyCache,
+    accepts_gzip,
+    gzip_bytes,
+    with_precompressed,
+)
+from .engine import EngineError, InferenceEngine, pack_arrays, unpack_arrays
+from .events import SessionEventBroker
+from .gltf import build_rig_glb
+from .image_io import ImageValidationError, decode_image, downscale_image, probe_image, validate_image
+from .janitor import StorageJanitor, tree_size
+from .metrics import LATENCY_BUCKETS, PROMETHEUS_CONTENT_TYPE, MetricsRegistry
+from .mhr_export import (
+    KEYPOINT_INDICES,
+    KEYPOINT_NAMES,
+    MHR70_NAMES,
+    extract_mhr_template,
+    match_keypoints_to_joints,
+    prepare_person_rigs,
+    rotate_points_x,
+)
+from .quantize import encode_array, quantize_positions, quantize_weights
+from .result_cache import ResultCache, result_cache_key
+from .rig import RIG_FIELDS, PersonRig, freeze_template
+from .session_store import SessionStore
+from .template import buffer_checksum, load_template_npz, save_template_npz, top_k_influences
+from .warmup import parse_counts, parse_resolutions, synthetic_boxes, synthetic_image, warmup_estimator
+from .writer import AsyncFileWriter, atomic_write_bytes
+
+__all__ = [
+    "GZIP_MIN_BYTES",
+    "GZIP_SUFFIX",
+    "KEYPOINT_INDICES",
+    "KEYPOINT_NAMES",
+    "LATENCY_BUCKETS",
+    "MHR70_NAMES",
+    "PROMETHEUS_CONTENT_TYPE",
+    "RIG_FIELDS",
+    "AsyncFileWriter",
+    "BatchStore",
+    "ComponentManager",
+    "ComponentProxy",
+    "CompressedBodyCache",
+    "EngineError",
+    "ImageValidationError",
+    "InFlightJobs",
+    "InferenceEngine",
+    "MetricsRegistry",
+    "MicroBatcher",
+    "MovingAverage",
+    "PersonRig",
+    "QueueFullError",
+    "ResultCache",
+    "SessionEventBroker",
+    "SessionStore",
+    "StorageJanitor",
+    "accepts_gzip",
+    "build_rig_glb",
+    "atomic_write_bytes",
+    "buffer_checksum",
+    "decode_image",
+    "downscale_image",
+    "encode_array",
+    "extract_mhr_template",
+    "freeze_template",
+    "gzip_bytes",
+    "load_template_npz",
+    "match_keypoints_to_joints",
+    "pack_arrays",
+    "parse_counts",
+    "parse_resolutions",
+    "prepare_person_rigs",
+    "probe_image",
+    "quantize_positions",
+    "quantize_weights",
+    "result_cache_key",
+    "rotate_points_x",
+    "save_template_npz",
+    "synthetic_boxes",
+    "synthetic_image",
+    "top_k_influences",
+    "tree_size",
+    "unpack_arrays",
+    "validate_image",
+    "warmup_estimator",
+    "with_precompressed",
+]
@@ -0,0 +1,128 @@
+import sqlite3
+import time
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class BatchStore:
+    """SQLite registry of batch jobs and the sessions created for their images.
+
+    A batch is an ordered list of items, one per submitted image. Accepted
+    items reference a session (possibly an earlier one reused through the
+    result cache); rejected items carry an ``error`` instead. Progress is
+    derived from the referenced sessions, so nothing here changes after
+    :meth:`create`. The store shares its database with
+    :class:`~sam_3d_body.serving.session_store.SessionStore` and reads its
+    ``sessions`` table to count progress and to find stale batches.
+    """
+
+    def __init__(self, db_path):
+        self._lock = Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                total INTEGER NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS batch_items (
+                batch_id TEXT NOT NULL,
+                item_index INTEGER NOT NULL,
+                filename TEXT,
+                session_id TEXT,
+                cached INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                PRIMARY KEY (batch_id, item_index)
+            )
+            """
+        )
+
+    def create(self, batch_id: str, items: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Record a batch; each item has ``filename`` and either ``session_id`` or ``error``."""
+        record = {"batch_id": batch_id, "created_at": time.time(), "total": len(items)}
+        rows = [
+            (
+                batch_id,
+                index,
+                item.get("filename"),
+                item.get("session_id"),
+                int(bool(item.get("cached"))),
+                item.get("error"),
+            )
+            for index, item in enumerate(items)
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute(
+                    "INSERT INTO batches (batch_id, created_at, total) VALUES (?, ?, ?)",
+                    (batch_id, record["created_at"], record["total"]),
+                )
+                self._db.executemany(
+                    "INSERT INTO batch_items (batch_id, item_index, filename, session_id, cached, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return record
+
+    def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def items(self, batch_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT item_index, filename, session_id, cached, error FROM batch_items "
+                "WHERE batch_id = ? ORDER BY item_index LIMIT ? OFFSET ?",
+                (batch_id, -1 if limit is None else int(limit), int(offset)),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def status_counts(self, batch_id: str) -> Dict[str, int]:
+        """Items per status: the session's status, ``rejected`` or ``expired``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT CASE WHEN batch_items.error IS NOT NULL THEN 'rejected' "
+                "WHEN sessions.session_id IS NULL THEN 'expired' ELSE sessions.status END AS status, "
+                "COUNT(*) AS items FROM batch_items "
+                "LEFT JOIN sessions ON sessions.session_id = batch_items.session_id "
+                "WHERE batch_items.batch_id = ? GROUP BY 1",
+                (batch_id,),
+            ).fetchall()
+        return {row["status"]: row["items"] for row in rows}
+
+    def purge(self, created_before: float) -> int:
+        """Delete batches created before ``created_before`` none of whose
+        sessions still exist; returns how many were deleted."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT batch_id FROM batches WHERE created_at < ? AND NOT EXISTS ("
+                "SELECT 1 FROM batch_items JOIN sessions ON sessions.session_id = batch_items.session_id "
+                "WHERE batch_items.batch_id = batches.batch_id)",
+                (created_before,),
+            ).fetchall()
+            batch_ids = [(row["batch_id"],) for row in rows]
+            if not batch_ids:
+                return 0
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("DELETE FROM batch_items WHERE batch_id = ?", batch_ids)
+                self._db.executemany("DELETE FROM batches WHERE batch_id = ?", batch_ids)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(batch_ids)
@@ -0,0 +1,163 @@
+import time
+from collections import deque
+from threading import Condition, Lock
+from typing import Any, Callable, Dict, List, Optional
+
+
+class QueueFullError(RuntimeError):
+    """Raised by :meth:`MicroBatcher.put` when the queue is at capacity."""
+
+
+class MovingAverage:
+    """Exponentially weighted moving average of recent samples."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = float(alpha)
+        self._value: Optional[float] = None
+        self._lock = Lock()
+
+    def update(self, sample: float) -> float:
+        with self._lock:
+            if self._value is None:
+                self._value = float(sample)
+            else:
+                self._value += self.alpha * (float(sample) - self._value)
+            return self._value
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._value
+
+
+class MicroBatcher:
+    """Group work items that arrive close together into small batches.
+
+    Consumers block in :meth:`next_batch` until one item is queued, then keep
+    draining the queue until ``max_batch_size`` items are collected or
+    ``max_wait_ms`` has elapsed since the first one. Only one consumer gathers
+    at a time, so concurrent workers receive full batches instead of racing
+    for single items. ``max_wait_ms=0`` hands out whatever is already queued.
+
+    With ``max_queue_size > 0`` the queue is bounded and :meth:`put` raises
+    :class:`QueueFullError` instead of accepting more work. Items handed out
+    count as in flight until the consumer calls :meth:`task_done`.
+
+    Items put with ``background=True`` (bulk jobs) wait in a separate,
+    unbounded lane that is only drained when no foreground item is waiting,
+    so large submissions fill batches without delaying interactive work.
+
+    ``on_wait``, if given, is called with each item's time in the queue (in
+    seconds) when it is handed out.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 4,
+        max_wait_ms: float = 50.0,
+        max_queue_size: int = 0,
+        on_wait: Optional[Callable[[float], None]] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.max_queue_size = max(0, int(max_queue_size))
+        self._items: "deque[Any]" = deque()
+        self._background: "deque[Any]" = deque()
+        self._in_flight = 0
+        self._enqueued_at: Dict[Any, float] = {}
+        self.on_wait = on_wait
+        self._cond = Condition()
+        self._gather_lock = Lock()
+
+    def put(self, item: Any, force: bool = False, background: bool = False) -> int:
+        """Queue ``item`` and return its position; ``force`` ignores the bound."""
+        with self._cond:
+            if background:
+                self._enqueued_at[item] = time.monotonic()
+                self._background.append(item)
+                self._cond.notify()
+                return len(self._items) + len(self._background) - 1
+            if not force and self.max_queue_size and len(self._items) >= self.max_queue_size:
+                raise QueueFullError(f"Queue is full ({self.max_queue_size} waiting)")
+            self._enqueued_at[item] = time.monotonic()
+            self._items.append(item)
+            self._cond.notify()
+            return len(self._items) - 1
+
+    def promote(self, item: Any) -> Optional[int]:
+        """Move a waiting background item to the back of the foreground queue.
+
+        Returns its new position, or ``None`` if it is not waiting in the
+        background lane. Like ``force``, this ignores the queue bound.
+        """
+        with self._cond:
+            try:
+                self._background.remove(item)
+            except ValueError:
+                return None
+            self._items.append(item)
+            return len(self._items) - 1
+
+    def qsize(self) -> int:
+        """Foreground items waiting; background items are counted by :meth:`background_size`."""
+        with self._cond:
+            return len(self._items)
+
+    def background_size(self) -> int:
+        with self._cond:
+            return len(self._background)
+
+    def full(self) -> bool:
+        with self._cond:
+            return bool(self.max_queue_size) and len(self._items) >= self.max_queue_size
+
+    def position(self, item: Any) -> Optional[int]:
+        """Zero-based position of a waiting item, or ``None`` once handed out."""
+        with self._cond:
+            try:
+                return self._items.index(item)
+            except ValueError:
+                pass
+            try:
+                return len(self._items) + self._background.index(item)
+            except ValueError:
+                return None
+
+    def snapshot(self, background: bool = False) -> List[Any]:
+        with self._cond:
+            return list(self._background if background else self._items)
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+
+    def task_done(self, count: int = 1) -> None:
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - count)
+
+    def next_batch(self) -> List[Any]:
+        with self._gather_lock, self._cond:
+            self._cond.wait_for(self._has_items)
+            batch = [self._pop()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                if not self._has_items():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait_for(self._has_items, remaining):
+                        break
+                batch.append(self._pop())
+            self._in_flight += len(batch)
+            now = time.monotonic()
+            waits = [now - self._enqueued_at.pop(item, now) for item in batch]
+        if self.on_wait is not None:
+            for wait in waits:
+                self.on_wait(wait)
+        return batch
+
+    def _has_items(self) -> bool:
+        return bool(self._items or self._background)
+
+    def _pop(self) -> Any:
+        return self._items.popleft() if self._items else self._background.popleft()
@@ -0,0 +1,85 @@
+import time
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+
+class InFlightJobs:
+    """Index of queued and running jobs by content key, to coalesce duplicates.
+
+    :meth:`claim` atomically either registers a session as the job for a key
+    or returns the session already holding it, so identical requests that
+    arrive while the first is waiting or running attach to that job instead
+    of starting another. The holder releases the key once its result is
+    final (see :meth:`release`). Between claiming a key and storing its
+    session the holder is *unstored*; :meth:`mark_stored` ends that window
+    and :meth:`unstored_seconds` tells how long it has lasted.
+    """
+
+    def __init__(self):
+        self._holders: Dict[str, str] = {}
+        # session_id -> (key, claim time while unstored, else None)
+        self._claims: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = Lock()
+
+    def claim(
+        self,
+        key: str,
+        session_id: str,
+        is_live: Optional[Callable[[str], bool]] = None,
+        stored: bool = False,
+    ) -> Optional[str]:
+        """Session already holding ``key``, or ``None`` after registering ``session_id``.
+
+        ``is_live(holder)`` guards against holders that ended without
+        releasing; a holder it rejects is replaced. It runs without the lock
+        held, and the holder is re-checked afterwards. ``stored`` marks a
+        claim for a session that already exists.
+        """
+        checked: Dict[str, bool] = {}
+        while True:
+            with self._lock:
+                holder = self._holders.get(key)
+                if holder is None or checked.get(holder) is False:
+                    if holder is not None:
+                        self._claims.pop(holder, None)
+                    self._holders[key] = session_id
+                    self._claims[session_id] = (key, None if stored else time.monotonic())
+                    return None
+                if is_live is None or checked.get(holder):
+                    return holder
+            checked[holder] = bool(is_live(holder))
+
+    def mark_stored(self, session_id: str) -> None:
+        """Record that the session claiming a key now exists."""
+        with self._lock:
+            claim = self._claims.get(session_id)
+            if claim is not None:
+                self._claims[session_id] = (claim[0], None)
+
+    def unstored_seconds(self, session_id: str) -> Optional[float]:
+        """Seconds since ``session_id`` claimed its key without being stored, else ``None``."""
+        with self._lock:
+            claim = self._claims.get(session_id)
+        if claim is None or claim[1] is None:
+            return None
+        return time.monotonic() - claim[1]
+
+    def release(self, key: Optional[str], session_id: str) -> None:
+        """Forget ``key`` if ``session_id`` holds it."""
+        if key is None:
+            return
+        with self._lock:
+            if self._holders.get(key) == session_id:
+                del self._holders[key]
+                self._claims.pop(session_id, None)
+
+    def release_session(self, session_id: str) -> None:
+        """Forget whichever key ``session_id`` holds."""
+        with self._lock:
+            claim = self._claims.pop(session_id, None)
+            if claim is not None and self._holders.get(claim[0]) == session_id:
+                del self._holders[claim[0]]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._holders)
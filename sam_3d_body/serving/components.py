@@ -0,0 +1,213 @@
+import gc
+import time
+import types
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+# Component states reported by ComponentManager.status()
+UNLOADED = "unloaded"
+LOADED = "loaded"
+OFFLOADED = "offloaded"
+
+
+def _move_modules(obj: Any, device: str, depth: int = 2) -> None:
+    """Move ``obj`` if it is a torch module, else the modules among its attributes.
+
+    Component wrappers (``HumanDetector``, ``FOVEstimator``, ...) keep their
+    model in an attribute, sometimes one object deeper (SAM2's predictor).
+    """
+    import torch
+
+    if isinstance(obj, torch.nn.Module):
+        obj.to(device)
+        return
+    if depth <= 0 or not hasattr(obj, "__dict__"):
+        return
+    for value in vars(obj).values():
+        if isinstance(value, (type, types.FunctionType, types.MethodType, types.ModuleType)):
+            continue
+        _move_modules(value, device, depth - 1)
+
+
+def _free_device_memory() -> None:
+    gc.collect()
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+class ComponentProxy:
+    """Stand-in for a model component; attribute access loads it on demand.
+
+    The estimator keeps using ``estimator.detector.run_human_detection(...)``
+    and friends unchanged; every access marks the component as used.
+    """
+
+    def __init__(self, manager: "ComponentManager", name: str):
+        object.__setattr__(self, "_component_manager", manager)
+        object.__setattr__(self, "_component_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self._component_manager.get(self._component_name), attr)
+
+    def __repr__(self) -> str:
+        return f"<ComponentProxy {self._component_name}>"
+
+
+class _Component:
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.instance: Any = None
+        self.state = UNLOADED
+        self.last_used = 0.0
+        self.loads = 0
+        self.load_seconds = 0.0
+        # Serializes loading and releasing this component only
+        self.load_lock = Lock()
+
+
+class ComponentManager:
+    """Load model components on first use and release them when idle.
+
+    ``register(name, loader)`` returns a :class:`ComponentProxy` to hand to the
+    estimator in place of the component. Components unused for
+    ``idle_seconds`` (``0`` keeps them resident) are released by a background
+    thread: moved to CPU memory when ``offload_to_cpu`` is set, so the next use
+    only pays for a host-to-device copy, otherwise dropped and rebuilt by
+    their loader. Releases only happen while ``lock`` (the lock callers hold
+    while running the estimator) can be taken without waiting, so a component
+    is never moved out from under a running inference. Loads and releases
+    hold a per-component lock, so :meth:`status` and other components stay
+    available while one component loads.
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float = 0.0,
+        offload_to_cpu: bool = False,
+        device: str = "cuda",
+        lock: Optional[Any] = None,
+    ):
+        self.idle_seconds = max(0.0, float(idle_seconds))
+        self.offload_to_cpu = offload_to_cpu
+        self.device = device
+        self.lock = lock
+        self._components: Dict[str, _Component] = {}
+        self._state_lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], instance: Any = None) -> ComponentProxy:
+        """Add a component; ``instance`` marks it as already loaded."""
+        component = _Component(name, loader)
+        if instance is not None:
+            component.instance, component.state = instance, LOADED
+            component.last_used = time.monotonic()
+        with self._state_lock:
+            self._components[name] = component
+        return ComponentProxy(self, name)
+
+    def get(self, name: str) -> Any:
+        """The loaded component, loading or restoring it from CPU first if needed."""
+        with self._state_lock:
+            component = self._components[name]
+            if component.state == LOADED:
+                component.last_used = time.monotonic()
+                return component.instance
+        with component.load_lock:
+            with self._state_lock:
+                state, instance = component.state, component.instance
+            if state != LOADED:
+                started = time.perf_counter()
+                if state == OFFLOADED:
+                    print(f"[Components] Restoring {name} to {self.device}")
+                    _move_modules(instance, self.device)
+                else:
+                    print(f"[Components] Loading {name}")
+                    instance = component.loader()
+                load_seconds = time.perf_counter() - started
+            with self._state_lock:
+                if state != LOADED:
+                    component.instance, component.state = instance, LOADED
+                    component.loads += 1
+                    component.load_seconds = load_seconds
+                component.last_used = time.monotonic()
+                return component.instance
+
+    def release(self, name: str) -> bool:
+        """Offload or drop one loaded component; True if anything was released."""
+        with self._state_lock:
+            component = self._components[name]
+        with component.load_lock:
+            with self._state_lock:
+                if component.state != LOADED:
+                    return False
+                instance = component.instance
+            if self.offload_to_cpu:
+                _move_modules(instance, "cpu")
+            with self._state_lock:
+                if self.offload_to_cpu:
+                    component.state = OFFLOADED
+                else:
+                    component.instance, component.state = None, UNLOADED
+            del instance
+        _free_device_memory()
+        print(f"[Components] Released {name} ({component.state})")
+        return True
+
+    def release_idle(self, now: Optional[float] = None) -> List[str]:
+        """Release components idle for ``idle_seconds``; skipped while ``lock`` is held."""
+        if not self.idle_seconds:
+            return []
+        if self.lock is not None and not self.lock.acquire(blocking=False):
+            return []
+        try:
+            now = time.monotonic() if now is None else now
+            with self._state_lock:
+                idle = [
+                    name for name, component in self._components.items()
+                    if component.state == LOADED and now - component.last_used >= self.idle_seconds
+                ]
+            return [name for name in idle if self.release(name)]
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._state_lock:
+            return {
+                name: {
+                    "state": component.state,
+                    "idle_seconds": round(now - component.last_used, 1) if component.last_used else None,
+                    "loads": component.loads,
+                    "last_load_seconds": round(component.load_seconds, 3),
+                }
+                for name, component in self._components.items()
+            }
+
+    def start(self) -> None:
+        """Start the idle-release thread (no-op when ``idle_seconds`` is 0)."""
+        if not self.idle_seconds or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True, name="component-reaper")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        interval = max(1.0, min(self.idle_seconds / 4, 30.0))
+        while not self._stop.wait(interval):
+            try:
+                self.release_idle()
+            except Exception as exc:
+                print(f"[Components] Idle release failed: {exc}")
@@ -0,0 +1,83 @@
+import gzip
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+GZIP_SUFFIX = ".gz"
+# Below this size the gzip header and CPU time outweigh the savings.
+GZIP_MIN_BYTES = 1024
+
+
+def gzip_bytes(data: bytes, level: int = 6) -> bytes:
+    """Deterministic gzip (no timestamp), so identical inputs give identical files."""
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (honours ``q=0``)."""
+    if not accept_encoding:
+        return False
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+def with_precompressed(files: Dict[str, bytes], level: int = 9, min_bytes: int = GZIP_MIN_BYTES) -> Dict[str, bytes]:
+    """Add a ``<name>.gz`` sibling for every file worth compressing.
+
+    Meant for artifacts written once and served many times, so the higher
+    default level is paid only at export time.
+    """
+    result = dict(files)
+    for name, data in files.items():
+        if len(data) < min_bytes:
+            continue
+        compressed = gzip_bytes(data, level)
+        if len(compressed) < len(data):
+            result[f"{name}{GZIP_SUFFIX}"] = compressed
+    return result
+
+
+class CompressedBodyCache:
+    """Byte-bounded LRU of gzip bodies keyed by ETag.
+
+    Responses whose ETag is unchanged are compressed once and then served
+    from memory.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = int(max_bytes)
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._bodies[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._bytes -= len(evicted)
@@ -0,0 +1,315 @@
+import importlib
+import multiprocessing
+import queue
+import time
+import traceback
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (name, [(key, dtype, shape, offset), ...]) of a shared-memory block
+ArrayDescriptor = Tuple[Optional[str], List[Tuple[str, str, Tuple[int, ...], int]]]
+
+_ALIGNMENT = 64
+
+
+def pack_arrays(arrays: Dict[str, np.ndarray]) -> ArrayDescriptor:
+    """Copy ``arrays`` into one new shared-memory block and describe its layout.
+
+    The creating process drops its handle; the receiver owns the block and
+    releases it in :func:`unpack_arrays`.
+    """
+    layout = []
+    offset = 0
+    for key, array in arrays.items():
+        array = np.asarray(array)
+        layout.append((key, array.dtype.str, tuple(array.shape), offset))
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    if offset == 0:
+        return None, layout
+
+    block = shared_memory.SharedMemory(create=True, size=offset)
+    try:
+        for (key, dtype, shape, start) in layout:
+            target = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+            target[...] = arrays[key]
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    _untrack(block)
+    block.close()
+    return block.name, layout
+
+
+def unpack_arrays(descriptor: ArrayDescriptor) -> Dict[str, np.ndarray]:
+    """Read a block written by :func:`pack_arrays` into private arrays and free it."""
+    name, layout = descriptor
+    if name is None:
+        return {key: np.empty(shape, dtype=dtype) for key, dtype, shape, _ in layout}
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return {
+            key: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start).copy()
+            for key, dtype, shape, start in layout
+        }
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _untrack(block: shared_memory.SharedMemory) -> None:
+    # Ownership passes to the receiver; without this the creator's resource
+    # tracker would unlink the block (or warn) when the engine exits.
+    try:
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(block._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _resolve(path: str) -> Callable:
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _engine_main(index: int, initializer: str, handler: str, init_args: Sequence[Any], requests, results) -> None:
+    try:
+        state, info = _resolve(initializer)(*init_args)
+        handle = _resolve(handler)
+    except BaseException:
+        results.put(("failed", index, traceback.format_exc(), None))
+        return
+    results.put(("ready", index, info, None))
+    while True:
+        message = requests.get()
+        if message is None:
+            return
+        job_id, payload = message
+        try:
+            meta, arrays = handle(state, payload)
+            results.put(("done", job_id, meta, pack_arrays(arrays)))
+        except Exception as exc:
+            results.put(("error", job_id, f"{type(exc).__name__}: {exc}", None))
+
+
+class EngineError(RuntimeError):
+    """Raised for jobs that failed inside, or were lost with, an engine process."""
+
+
+class InferenceEngine:
+    """Run a model in dedicated processes, each fed through its own queue.
+
+    Each process calls ``initializer(*init_args)`` once, which returns
+    ``(state, info)``; ``info`` is sent back to :meth:`start`. Jobs are then
+    handled by ``handler(state, payload)`` returning ``(meta, arrays)``:
+    ``meta`` is pickled as usual while the numpy ``arrays`` travel through a
+    shared-memory block, so large per-person buffers are never pickled.
+    Both callables are given as ``"module:function"`` and must be importable
+    without side effects, since processes are started with ``spawn``.
+
+    :meth:`submit` returns a :class:`concurrent.futures.Future` resolving to
+    ``(meta, arrays)`` and hands the job to the least busy process. If a
+    process dies, only the jobs it owned fail with :class:`EngineError` and
+    the process is restarted with a fresh queue. A process that dies before
+    finishing initialization is restarted after an exponential backoff
+    (``restart_backoff`` seconds, doubling up to ``max_restart_backoff``) and
+    given up on after ``max_start_failures`` consecutive failures.
+    """
+
+    def __init__(
+        self,
+        initializer: str,
+        handler: str,
+        init_args: Sequence[Any] = (),
+        processes: int = 1,
+        start_method: str = "spawn",
+        max_start_failures: int = 5,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 60.0,
+    ):
+        self.initializer = initializer
+        self.handler = handler
+        self.init_args = tuple(init_args)
+        self.num_processes = max(1, int(processes))
+        self.max_start_failures = max(1, int(max_start_failures))
+        self.restart_backoff = max(0.0, float(restart_backoff))
+        self.max_restart_backoff = max(self.restart_backoff, float(max_restart_backoff))
+        self._ctx = multiprocessing.get_context(start_method)
+        self._results = self._ctx.Queue()
+        self._requests: List[Any] = [None] * self.num_processes
+        self._processes: List[Any] = [None] * self.num_processes
+        # Per process: initialized, consecutive start failures, earliest restart
+        self._initialized = [False] * self.num_processes
+        self._start_failures = [0] * self.num_processes
+        self._restart_at: List[Optional[float]] = [None] * self.num_processes
+        self._pending: Dict[int, Future] = {}
+        self._owner: Dict[int, int] = {}
+        self._next_job = 0
+        self._lock = Lock()
+        self._collector: Optional[Thread] = None
+        self._ready: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._starting = True
+        self._stopped = False
+        self.info: Any = None
+
+    def start(self, timeout: Optional[float] = None) -> Any:
+        """Start the processes and wait until all are initialized; returns the first ``info``."""
+        for index in range(self.num_processes):
+            self._spawn(index)
+        self._collector = Thread(target=self._collect, daemon=True, name="engine-results")
+        self._collector.start()
+        try:
+            for _ in range(self.num_processes):
+                kind, info = self._ready.get(timeout=timeout)
+                if kind == "failed":
+                    raise EngineError(f"Engine process failed to start:\n{info}")
+                if self.info is None:
+                    self.info = info
+        except BaseException:
+            self.stop()
+            raise
+        self._starting = False
+        return self.info
+
+    def submit(self, payload: Any) -> Future:
+        future: Future = Future()
+        with self._lock:
+            index = self._pick_process()
+            if index is None:
+                future.set_exception(EngineError("No engine process is available"))
+                return future
+            job_id = self._next_job
+            self._next_job += 1
+            self._pending[job_id] = future
+            self._owner[job_id] = index
+            requests = self._requests[index]
+        requests.put((job_id, payload))
+        return future
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            queues = list(self._requests)
+        for requests in queues:
+            if requests is not None:
+                requests.put(None)
+
+    def _pick_process(self) -> Optional[int]:
+        # Least loaded process, preferring initialized ones; given-up ones
+        # (no queue) are skipped. Called with _lock held.
+        load = [0] * self.num_processes
+        for index in self._owner.values():
+            load[index] += 1
+        candidates = [index for index in range(self.num_processes) if self._requests[index] is not None]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda index: (not self._initialized[index], load[index]))
+
+    def _spawn(self, index: int) -> None:
+        # Jobs submitted while a restart was pending already wait in the queue
+        requests = self._requests[index] or self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_engine_main,
+            args=(index, self.initializer, self.handler, self.init_args, requests, self._results),
+            daemon=True,
+            name=f"inference-engine-{index}",
+        )
+        with self._lock:
+            self._requests[index] = requests
+            self._initialized[index] = False
+            self._restart_at[index] = None
+        process.start()
+        self._processes[index] = process
+
+    def _collect(self) -> None:
+        while True:
+            try:
+                kind, key, value, descriptor = self._results.get(timeout=1.0)
+            except queue.Empty:
+                self._check_processes()
+                continue
+            if kind in ("ready", "failed"):
+                if kind == "ready":
+                    with self._lock:
+                        self._initialized[key] = True
+                        self._start_failures[key] = 0
+                if self._starting:
+                    self._ready.put((kind, value))
+                elif kind == "failed":
+                    print(f"[Engine] Process {key} failed to initialize:\n{value}")
+                continue
+            with self._lock:
+                future = self._pending.pop(key, None)
+                self._owner.pop(key, None)
+            if kind == "done":
+                try:
+                    arrays = unpack_arrays(descriptor)
+                except Exception as exc:
+                    _settle(future, error=EngineError(f"Could not read engine result: {exc}"))
+                    continue
+                _settle(future, result=(value, arrays))
+            else:
+                _settle(future, error=EngineError(value))
+
+    def _check_processes(self) -> None:
+        now = time.monotonic()
+        for index, process in enumerate(self._processes):
+            if process is None or self._stopped:
+                continue
+            restart_at = self._restart_at[index]
+            if restart_at is not None:
+                if now >= restart_at:
+                    self._spawn(index)
+                continue
+            if process.is_alive():
+                continue
+            with self._lock:
+                initialized = self._initialized[index]
+                lost = [job_id for job_id, owner in self._owner.items() if owner == index]
+                futures = [self._pending.pop(job_id) for job_id in lost]
+                for job_id in lost:
+                    del self._owner[job_id]
+                if not initialized:
+                    self._start_failures[index] += 1
+                failures = self._start_failures[index]
+                if failures >= self.max_start_failures:
+                    # Given up: no queue, so submit() routes around it
+                    self._requests[index] = None
+                    self._processes[index] = None
+                else:
+                    # Jobs left in the old queue were failed above and must not run
+                    self._requests[index] = self._ctx.Queue()
+                    delay = 0.0 if not failures else min(
+                        self.restart_backoff * 2 ** (failures - 1), self.max_restart_backoff
+                    )
+                    self._restart_at[index] = now + delay
+            for future in futures:
+                _settle(future, error=EngineError("Engine process exited while the job was pending"))
+            if failures >= self.max_start_failures:
+                print(f"[Engine] Process {process.name} failed to start {failures} times in a row; giving up")
+                if self._starting:
+                    self._ready.put(("failed", f"{process.name} exited with code {process.exitcode}"))
+            else:
+                print(
+                    f"[Engine] Process {process.name} exited with code {process.exitcode}; "
+                    f"restarting in {self._restart_at[index] - now:.1f}s"
+                )
+
+
+def _settle(future: Optional[Future], result: Any = None, error: Optional[BaseException] = None) -> None:
+    """Resolve ``future`` unless the caller already cancelled it (e.g. after a timeout)."""
+    if future is None or not future.set_running_or_notify_cancel():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
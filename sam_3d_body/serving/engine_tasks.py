@@ -0,0 +1,130 @@
+"""Estimator jobs run inside :class:`~sam_3d_body.serving.engine.InferenceEngine` processes."""
+
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .image_io import decode_image, downscale_image
+from .mhr_export import extract_mhr_template, prepare_person_rigs
+from .warmup import warmup_estimator
+
+
+@contextmanager
+def _timed(timings: List[Tuple[str, float]], stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((stage, time.perf_counter() - started))
+
+
+def init_estimator(
+    lightweight: bool,
+    template_cache_dir: str,
+    inference_type: str,
+    max_long_edge: int,
+    warmup_resolutions: Sequence[Tuple[int, int]] = (),
+    warmup_persons: Sequence[int] = (),
+    idle_seconds: float = 0.0,
+    offload_to_cpu: bool = False,
+):
+    """Load SAM-3D-Body and its rig template, then warm it up.
+
+    ``info`` carries what the web tier needs: the template, mesh faces and
+    the load and warmup timings of this process.
+    """
+    started = time.perf_counter()
+    from notebook.utils import setup_managed_sam_3d_body
+
+    # Held by run_batch so idle components are never released mid-batch
+    lock = Lock()
+    estimator, components = setup_managed_sam_3d_body(
+        hf_repo_id="facebook/sam-3d-body-dinov3",
+        fov_name=None if lightweight else "moge2",
+        idle_seconds=idle_seconds,
+        offload_to_cpu=offload_to_cpu,
+        lock=lock,
+    )
+    template = extract_mhr_template(estimator.model.head_pose.mhr, cache_dir=template_cache_dir)
+
+    state = {
+        "estimator": estimator,
+        "components": components,
+        "lock": lock,
+        "template": template,
+        "inference_type": inference_type,
+        "max_long_edge": int(max_long_edge),
+        "timings": [],
+    }
+    estimator.stage_timer = lambda stage: _timed(state["timings"], stage)
+    load_seconds = time.perf_counter() - started
+    warmup = warmup_estimator(estimator, warmup_resolutions, warmup_persons, inference_type)
+    components.start()
+    return state, {
+        "template": template,
+        "faces": estimator.faces,
+        "load_seconds": load_seconds,
+        "warmup": warmup,
+    }
+
+
+def run_batch(state: Dict[str, Any], images: List[bytes]):
+    """Decode, detect and estimate a batch of uploads; returns ``(meta, arrays)``.
+
+    ``meta["images"][i]`` is ``{"num_persons": n}`` or ``{"error": message}``;
+    the rig arrays of image ``i`` are stored under ``"<i>.<name>"``.
+    ``meta["timings"]`` lists ``(stage, seconds)`` for the metrics endpoint.
+    """
+    with state["lock"]:
+        return _run_batch(state, images)
+
+
+def _run_batch(state: Dict[str, Any], images: List[bytes]):
+    estimator = state["estimator"]
+    timings = state["timings"] = []
+    results: List[Any] = [None] * len(images)
+
+    decoded = []
+    for index, data in enumerate(images):
+        try:
+            with _timed(timings, "decode"):
+                img_bgr = decode_image(data, state["max_long_edge"], resize=False)
+            with _timed(timings, "resize"):
+                decoded.append((index, downscale_image(img_bgr, state["max_long_edge"])))
+        except Exception as exc:
+            results[index] = exc
+
+    if decoded and estimator.detector is not None:
+        boxes_per_image = estimator.detect_humans([img_bgr for _, img_bgr in decoded])
+    else:
+        boxes_per_image = [None] * len(decoded)
+
+    for (index, img_bgr), boxes in zip(decoded, boxes_per_image):
+        if boxes is not None and len(boxes) == 0:
+            results[index] = []
+            continue
+        try:
+            results[index] = estimator.process_one_image(
+                cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB),
+                bboxes=boxes,
+                inference_type=state["inference_type"],
+            )
+        except Exception as exc:
+            results[index] = exc
+
+    meta = {"images": [], "timings": timings}
+    arrays: Dict[str, np.ndarray] = {}
+    for index, outputs in enumerate(results):
+        if isinstance(outputs, Exception):
+            meta["images"].append({"error": str(outputs)})
+            continue
+        if outputs:
+            with _timed(timings, "export"):
+                rigs = prepare_person_rigs(outputs, state["template"])
+            arrays.update((f"{index}.{name}", array) for name, array in rigs.items())
+        meta["images"].append({"num_persons": len(outputs)})
+    return meta, arrays
@@ -0,0 +1,103 @@
+import asyncio
+from collections import OrderedDict
+from threading import Condition
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Event = Dict[str, Any]
+
+
+class SessionEventBroker:
+    """Latest-value pub/sub for session progress events.
+
+    Each session keeps only its most recent event and a monotonically
+    increasing version. Subscribers remember the version they last saw and
+    block in :meth:`wait` until a newer one is published, which serves both
+    Server-Sent Events streams and long-polling requests without per-client
+    queues. At most ``max_sessions`` sessions are tracked; the oldest are
+    forgotten first.
+
+    Coroutines wait with :meth:`async_wait_for` instead, which parks them on
+    the event loop rather than on a thread.
+    """
+
+    def __init__(self, max_sessions: int = 10000):
+        self.max_sessions = max_sessions
+        self._events: "OrderedDict[str, Tuple[int, Event]]" = OrderedDict()
+        self._cond = Condition()
+        self._listeners: Dict[str, List[Callable[[], None]]] = {}
+
+    def publish(self, session_id: str, event: Event) -> int:
+        with self._cond:
+            version = self._events.get(session_id, (0, None))[0] + 1
+            self._events[session_id] = (version, event)
+            self._events.move_to_end(session_id)
+            while len(self._events) > self.max_sessions:
+                self._events.popitem(last=False)
+            self._cond.notify_all()
+            listeners = list(self._listeners.get(session_id, ()))
+        for listener in listeners:
+            listener()
+        return version
+
+    def latest(self, session_id: str) -> Tuple[int, Optional[Event]]:
+        with self._cond:
+            return self._events.get(session_id, (0, None))
+
+    def wait(self, session_id: str, after: int, timeout: Optional[float]) -> Tuple[int, Optional[Event]]:
+        """Return the first event newer than version ``after``, or ``(after, None)`` on timeout."""
+        return self.wait_for(session_id, lambda version, _: version > after, timeout, default_version=after)
+
+    def wait_for(
+        self,
+        session_id: str,
+        predicate: Callable[[int, Event], bool],
+        timeout: Optional[float],
+        default_version: int = 0,
+    ) -> Tuple[int, Optional[Event]]:
+        def ready():
+            entry = self._events.get(session_id)
+            return entry is not None and predicate(*entry)
+
+        with self._cond:
+            if self._cond.wait_for(ready, timeout):
+                return self._events[session_id]
+            return default_version, None
+
+    async def async_wait_for(
+        self,
+        session_id: str,
+        predicate: Callable[[int, Event], bool],
+        timeout: Optional[float],
+        default_version: int = 0,
+    ) -> Tuple[int, Optional[Event]]:
+        """Coroutine version of :meth:`wait_for`; publishers wake it via the running loop."""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def notify():
+            loop.call_soon_threadsafe(changed.set)
+
+        with self._cond:
+            self._listeners.setdefault(session_id, []).append(notify)
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            while True:
+                # Cleared before checking, so a publish in between is not lost
+                changed.clear()
+                entry = self.latest(session_id)
+                if entry[1] is not None and predicate(*entry):
+                    return entry
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return default_version, None
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                listeners = self._listeners.get(session_id, [])
+                if notify in listeners:
+                    listeners.remove(notify)
+                if not listeners:
+                    self._listeners.pop(session_id, None)
@@ -0,0 +1,245 @@
+import json
+import struct
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .quantize import INT16_MAX, quantize_positions, quantize_weights
+
+GLB_MAGIC = 0x46546C67
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_FLOAT = 5126
+COMPONENT_UNSIGNED_BYTE = 5121
+COMPONENT_SHORT = 5122
+COMPONENT_UNSIGNED_SHORT = 5123
+COMPONENT_UNSIGNED_INT = 5125
+
+TARGET_ARRAY_BUFFER = 34962
+TARGET_ELEMENT_ARRAY_BUFFER = 34963
+
+_COMPONENT_DTYPES = {
+    COMPONENT_FLOAT: np.float32,
+    COMPONENT_UNSIGNED_BYTE: np.uint8,
+    COMPONENT_SHORT: np.int16,
+    COMPONENT_UNSIGNED_SHORT: np.uint16,
+    COMPONENT_UNSIGNED_INT: np.uint32,
+}
+
+
+class _BinaryBuffer:
+    """Accumulates typed arrays into one 4-byte aligned glTF buffer."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.byte_length = 0
+        self.buffer_views: List[Dict] = []
+        self.accessors: List[Dict] = []
+
+    def add(
+        self,
+        array: np.ndarray,
+        component_type: int,
+        accessor_type: str,
+        target: Optional[int] = None,
+        with_bounds: bool = False,
+        normalized: bool = False,
+        padded_components: Optional[int] = None,
+    ) -> int:
+        """Append ``array`` and return its accessor index.
+
+        ``padded_components`` pads each element with zeros to that many
+        components and sets the matching byteStride, which keeps 2-byte VEC3
+        attributes 4-byte aligned as glTF requires.
+        """
+        array = np.ascontiguousarray(array, dtype=_COMPONENT_DTYPES[component_type])
+        bounds_source = array
+        if padded_components is not None:
+            padded = np.zeros((array.shape[0], padded_components), dtype=array.dtype)
+            padded[:, : array.shape[1]] = array
+            array = padded
+        data = array.tobytes()
+        view = {"buffer": 0, "byteOffset": self.byte_length, "byteLength": len(data)}
+        if padded_components is not None:
+            view["byteStride"] = padded_components * array.itemsize
+        if target is not None:
+            view["target"] = target
+        self.buffer_views.append(view)
+
+        padding = (-len(data)) % 4
+        self.chunks.append(data + b"\x00" * padding)
+        self.byte_length += len(data) + padding
+
+        accessor = {
+            "bufferView": len(self.buffer_views) - 1,
+            "componentType": component_type,
+            "count": int(array.shape[0]),
+            "type": accessor_type,
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if with_bounds:
+            # Bounds are in stored units, also for normalized accessors
+            accessor["min"] = bounds_source.min(axis=0).astype(float).tolist()
+            accessor["max"] = bounds_source.max(axis=0).astype(float).tolist()
+        self.accessors.append(accessor)
+        return len(self.accessors) - 1
+
+    def tobytes(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+def _inverse_bind_matrices(
+    joint_positions: np.ndarray,
+    offset: Optional[np.ndarray] = None,
+    scale: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Column-major inverse bind matrices for joints bound without rotation.
+
+    ``offset`` and ``scale`` fold position dequantization into the matrices,
+    so skinned quantized meshes render without a separate decode step.
+    """
+    matrices = np.tile(np.eye(4, dtype=np.float32), (joint_positions.shape[0], 1, 1))
+    matrices[:, 3, :3] = -joint_positions
+    if offset is not None:
+        matrices[:, 3, :3] += offset
+    if scale is not None:
+        matrices[:, [0, 1, 2], [0, 1, 2]] = scale
+    return matrices.reshape(-1, 16)
+
+
+def build_rig_glb(
+    persons: Sequence[Dict],
+    faces: np.ndarray,
+    skin_indices: np.ndarray,
+    skin_weights: np.ndarray,
+    parents: np.ndarray,
+    quantize: bool = False,
+) -> bytes:
+    """Pack skinned person meshes into a binary glTF 2.0 container.
+
+    Each entry of ``persons`` provides ``vertices`` (V, 3), ``joint_positions``
+    (J, 3), ``joint_names`` and an ``extras`` dict stored on the mesh node.
+    Faces and skinning buffers come from the shared rig template and are
+    written once for all persons. Joints are bound in the rest pose given by
+    ``joint_positions``, with node translations relative to their parent.
+
+    With ``quantize=True`` the file uses ``KHR_mesh_quantization``: positions
+    are normalized int16 against each person's bounding box and skin joints
+    and weights are uint8. The mesh node extras carry ``quantization``
+    (``position = q * scale + offset`` for the raw int16 values).
+    """
+    buffer = _BinaryBuffer()
+    indices_accessor = buffer.add(
+        np.asarray(faces).reshape(-1), COMPONENT_UNSIGNED_INT, "SCALAR", TARGET_ELEMENT_ARRAY_BUFFER
+    )
+    if quantize:
+        joint_component = COMPONENT_UNSIGNED_BYTE if len(parents) <= 256 else COMPONENT_UNSIGNED_SHORT
+        joints_accessor = buffer.add(skin_indices, joint_component, "VEC4", TARGET_ARRAY_BUFFER)
+        weights_accessor = buffer.add(
+            quantize_weights(skin_weights), COMPONENT_UNSIGNED_BYTE, "VEC4", TARGET_ARRAY_BUFFER, normalized=True
+        )
+    else:
+        joints_accessor = buffer.add(skin_indices, COMPONENT_UNSIGNED_SHORT, "VEC4", TARGET_ARRAY_BUFFER)
+        weights_accessor = buffer.add(skin_weights, COMPONENT_FLOAT, "VEC4", TARGET_ARRAY_BUFFER)
+
+    parents = np.asarray(parents)
+    nodes: List[Dict] = []
+    meshes: List[Dict] = []
+    skins: List[Dict] = []
+    scene_nodes: List[int] = []
+
+    for person_idx, person in enumerate(persons):
+        vertices = np.asarray(person["vertices"], dtype=np.float32)
+        joint_positions = np.asarray(person["joint_positions"], dtype=np.float32)
+        name = person.get("name", f"person_{person_idx + 1}")
+
+        extras = dict(person.get("extras", {}))
+
+        if quantize:
+            (quantized_vertices,), offset, scale = quantize_positions(vertices)
+            position_accessor = buffer.add(
+                quantized_vertices, COMPONENT_SHORT, "VEC3", TARGET_ARRAY_BUFFER,
+                with_bounds=True, normalized=True, padded_components=4,
+            )
+            bind_matrices = _inverse_bind_matrices(joint_positions, offset, scale * INT16_MAX)
+            extras["quantization"] = {"offset": offset.tolist(), "scale": scale.tolist()}
+        else:
+            position_accessor = buffer.add(
+                vertices, COMPONENT_FLOAT, "VEC3", TARGET_ARRAY_BUFFER, with_bounds=True
+            )
+            bind_matrices = _inverse_bind_matrices(joint_positions)
+        bind_accessor = buffer.add(bind_matrices, COMPONENT_FLOAT, "MAT4")
+
+        meshes.append({
+            "name": name,
+            "primitives": [{
+                "attributes": {
+                    "POSITION": position_accessor,
+                    "JOINTS_0": joints_accessor,
+                    "WEIGHTS_0": weights_accessor,
+                },
+                "indices": indices_accessor,
+                "mode": 4,
+            }],
+        })
+
+        mesh_node = len(nodes)
+        nodes.append({
+            "name": name,
+            "mesh": len(meshes) - 1,
+            "skin": len(skins),
+            "extras": extras,
+        })
+
+        first_joint = len(nodes)
+        joint_names = person["joint_names"]
+        for joint_idx, joint_name in enumerate(joint_names):
+            parent_idx = int(parents[joint_idx])
+            translation = joint_positions[joint_idx]
+            if parent_idx >= 0:
+                translation = translation - joint_positions[parent_idx]
+            nodes.append({"name": joint_name, "translation": translation.astype(float).tolist()})
+        for joint_idx in range(len(joint_names)):
+            parent_idx = int(parents[joint_idx])
+            if parent_idx >= 0:
+                nodes[first_joint + parent_idx].setdefault("children", []).append(first_joint + joint_idx)
+
+        root_joints = [first_joint + idx for idx in range(len(joint_names)) if parents[idx] < 0]
+        skins.append({
+            "name": f"{name}_skin",
+            "inverseBindMatrices": bind_accessor,
+            "joints": list(range(first_joint, first_joint + len(joint_names))),
+        })
+
+        nodes.append({"name": f"{name}_root", "children": [mesh_node, *root_joints]})
+        scene_nodes.append(len(nodes) - 1)
+
+    binary = buffer.tobytes()
+    document = {
+        "asset": {"version": "2.0", "generator": "sam-3d-body"},
+        "scene": 0,
+        "scenes": [{"nodes": scene_nodes}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "skins": skins,
+        "accessors": buffer.accessors,
+        "bufferViews": buffer.buffer_views,
+        "buffers": [{"byteLength": len(binary)}],
+    }
+    if quantize:
+        document["extensionsUsed"] = ["KHR_mesh_quantization"]
+        document["extensionsRequired"] = ["KHR_mesh_quantization"]
+
+    json_chunk = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    json_chunk += b" " * ((-len(json_chunk)) % 4)
+    total_length = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    return b"".join([
+        struct.pack("<III", GLB_MAGIC, GLB_VERSION, total_length),
+        struct.pack("<II", len(json_chunk), CHUNK_JSON),
+        json_chunk,
+        struct.pack("<II", len(binary), CHUNK_BIN),
+        binary,
+    ])
@@ -0,0 +1,77 @@
+import io
+from typing import Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# OpenCV decodes JPEGs at 1/2, 1/4 or 1/8 scale directly in libjpeg (DCT
+# scaling), which is far cheaper than a full decode followed by a resize.
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class ImageValidationError(ValueError):
+    """Raised when an upload is not a decodable image within the size limits."""
+
+
+def probe_image(data: bytes) -> Tuple[int, int, str]:
+    """Read ``(width, height, format)`` from the image header without decoding pixels."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return int(image.width), int(image.height), str(image.format or "").upper()
+    except Image.DecompressionBombError as exc:
+        raise ImageValidationError(f"Image is too large: {exc}") from exc
+    except Exception as exc:
+        raise ImageValidationError(f"Unrecognized image data: {exc}") from exc
+
+
+def validate_image(data: bytes, min_edge: int, max_pixels: int) -> Tuple[int, int, str]:
+    """Probe an upload and check its dimensions; returns ``(width, height, format)``."""
+    width, height, image_format = probe_image(data)
+    if min(width, height) < min_edge:
+        raise ImageValidationError(f"Image is too small ({width}x{height}); minimum edge is {min_edge}px")
+    if width * height > max_pixels:
+        raise ImageValidationError(
+            f"Image is too large ({width}x{height}, {width * height / 1e6:.1f} MP); "
+            f"maximum is {max_pixels / 1e6:.1f} MP"
+        )
+    return width, height, image_format
+
+
+def downscale_image(img_bgr: np.ndarray, max_long_edge: int) -> np.ndarray:
+    """Shrink an image with ``INTER_AREA`` so its long edge is at most ``max_long_edge``."""
+    height, width = img_bgr.shape[:2]
+    long_edge = max(height, width)
+    if long_edge <= max_long_edge:
+        return img_bgr
+    scale = max_long_edge / long_edge
+    new_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(img_bgr, new_size, interpolation=cv2.INTER_AREA)
+
+
+def decode_image(data: bytes, max_long_edge: int, resize: bool = True) -> np.ndarray:
+    """Decode image bytes to BGR with the long edge at most ``max_long_edge``.
+
+    JPEGs far larger than the target are decoded at a reduced scale first;
+    the remainder is downscaled with ``INTER_AREA``. With ``resize=False`` the
+    remainder is left to the caller (see :func:`downscale_image`).
+    """
+    width, height, image_format = probe_image(data)
+    long_edge = max(width, height)
+
+    flags = cv2.IMREAD_COLOR
+    if image_format in ("JPEG", "MPO"):
+        for factor, reduced_flag in _REDUCED_FLAGS:
+            if long_edge // factor >= max_long_edge:
+                flags = reduced_flag
+                break
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    img_bgr = cv2.imdecode(buffer, flags)
+    if img_bgr is None:
+        raise ImageValidationError("Could not decode image data")
+    return downscale_image(img_bgr, max_long_edge) if resize else img_bgr
@@ -0,0 +1,188 @@
+import os
+import time
+from pathlib import Path
+from threading import Event, Thread
+from typing import Callable, Dict, Optional
+
+from .batch_store import BatchStore
+from .session_store import SessionStore
+
+
+def tree_size(path) -> int:
+    """Total size in bytes of the files under ``path`` (0 if it does not exist)."""
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total
+
+
+def _file_size(path) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+class StorageJanitor:
+    """Background cleanup of session files: TTL, uploads and a byte quota.
+
+    Every ``interval_seconds`` a pass:
+
+    1. expires sessions idle past the store's TTL,
+    2. deletes the original uploads of finished (completed/failed) sessions,
+    3. measures the disk usage of sessions recorded before it was tracked,
+    4. evicts least recently accessed finished sessions while the recorded
+       usage exceeds ``quota_bytes`` (``0`` disables the quota),
+    5. deletes batches in ``batches`` none of whose sessions remain, once
+       they are older than the store's TTL.
+
+    File operations are paced to at most ``max_ops_per_second`` and, while
+    ``is_busy()`` is true, postponed for up to ``max_defer_seconds`` each, so
+    cleanup yields to inference without stalling indefinitely under load.
+    Evicted sessions go through the store's ``on_evict`` callback.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        quota_bytes: int = 0,
+        interval_seconds: float = 60.0,
+        max_ops_per_second: float = 20.0,
+        is_busy: Optional[Callable[[], bool]] = None,
+        max_defer_seconds: float = 30.0,
+        batch_size: int = 100,
+        batches: Optional[BatchStore] = None,
+    ):
+        self.store = store
+        self.batches = batches
+        self.quota_bytes = max(0, int(quota_bytes))
+        self.interval_seconds = max(1.0, float(interval_seconds))
+        self.op_interval = 1.0 / max_ops_per_second if max_ops_per_second > 0 else 0.0
+        self.is_busy = is_busy
+        self.max_defer_seconds = max(0.0, float(max_defer_seconds))
+        self.batch_size = max(1, int(batch_size))
+        self.last_pass: Dict[str, float] = {}
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True, name="storage-janitor")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> Dict[str, float]:
+        """One cleanup pass; returns counts of what was removed."""
+        started = time.monotonic()
+        stats = {
+            "expired": len(self.store.expire()),
+            "uploads_removed": self._remove_uploads(),
+            "sessions_measured": self._measure_unknown(),
+            "sessions_evicted": self._enforce_quota(),
+            "batches_purged": self._purge_batches(),
+        }
+        stats["disk_bytes"] = self.store.disk_usage()
+        stats["seconds"] = round(time.monotonic() - started, 3)
+        self.last_pass = stats
+        return stats
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                stats = self.run_once()
+                if stats["expired"] or stats["uploads_removed"] or stats["sessions_evicted"] or stats["batches_purged"]:
+                    print(f"[Janitor] {stats}")
+            except Exception as exc:
+                print(f"[Janitor] Cleanup pass failed: {exc}")
+
+    def _pace(self) -> bool:
+        """Wait for a free I/O slot; False once the janitor is stopping."""
+        if self.is_busy is not None:
+            deadline = time.monotonic() + self.max_defer_seconds
+            while self.is_busy() and time.monotonic() < deadline:
+                if self._stop.wait(min(0.5, self.max_defer_seconds)):
+                    return False
+        if self.op_interval:
+            return not self._stop.wait(self.op_interval)
+        return not self._stop.is_set()
+
+    def _remove_uploads(self) -> int:
+        removed = 0
+        while True:
+            records = self.store.list_finished(self.batch_size, with_upload=True)
+            if not records:
+                return removed
+            batch_removed = removed
+            for record in records:
+                if not self._pace():
+                    return removed
+                path = Path(record["filepath"])
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                except FileNotFoundError:
+                    size = 0
+                except OSError as exc:
+                    print(f"[Janitor] Could not remove {path}: {exc}")
+                    continue
+                self.store.annotate(record["session_id"], filepath=None)
+                if size and record["disk_bytes"] is not None:
+                    self.store.add_disk_bytes(record["session_id"], -size)
+                removed += 1
+            if removed == batch_removed:
+                # Every remaining upload failed to delete; retry next pass
+                return removed
+
+    def _measure_unknown(self) -> int:
+        measured = 0
+        while True:
+            records = self.store.list_finished(self.batch_size, unmeasured=True)
+            if not records:
+                return measured
+            for record in records:
+                if not self._pace():
+                    return measured
+                size = tree_size(record["session_dir"]) if record["session_dir"] else 0
+                if record["filepath"]:
+                    size += _file_size(record["filepath"])
+                self.store.annotate(record["session_id"], disk_bytes=size)
+                measured += 1
+
+    def _enforce_quota(self) -> int:
+        if not self.quota_bytes:
+            return 0
+        evicted = 0
+        usage = self.store.disk_usage()
+        while usage > self.quota_bytes:
+            records = self.store.list_finished(self.batch_size)
+            if not records:
+                break
+            for record in records:
+                if usage <= self.quota_bytes or not self._pace():
+                    return evicted
+                self.store.evict([record])
+                usage -= record["disk_bytes"] or 0
+                evicted += 1
+        return evicted
+
+    def _purge_batches(self) -> int:
+        if self.batches is None:
+            return 0
+        return self.batches.purge(time.time() - (self.store.ttl_seconds or 0))
@@ -0,0 +1,176 @@
+from pathlib import Path
+
+import numpy as np
+
+from sam_3d_body.metadata.mhr70 import pose_info as mhr70_pose_info
+
+from .template import buffer_checksum, load_template_npz, save_template_npz, top_k_influences
+
+
+def rotate_points_x(points: np.ndarray) -> np.ndarray:
+    """Rotate points for coordinate system conversion."""
+    rotated = np.array(points, dtype=np.float32, copy=True)
+    rotated[..., 1] *= -1.0
+    rotated[..., 2] *= -1.0
+    return rotated
+
+
+def _build_mhr70_skeleton():
+    """Build skeleton structure from MHR70 metadata."""
+    kp_info = mhr70_pose_info["keypoint_info"]
+    skeleton_info = mhr70_pose_info["skeleton_info"]
+
+    joint_names = [kp_info[i]["name"] for i in range(len(kp_info))]
+    name_to_idx = {name: idx for idx, name in enumerate(joint_names)}
+
+    adjacency = {idx: [] for idx in range(len(joint_names))}
+    for link_def in skeleton_info.values():
+        joint_a, joint_b = link_def["link"]
+        ia, ib = name_to_idx[joint_a], name_to_idx[joint_b]
+        adjacency[ia].append(ib)
+        adjacency[ib].append(ia)
+
+    root_name = "neck" if "neck" in name_to_idx else joint_names[0]
+    root_idx = name_to_idx[root_name]
+    parents = [-1] * len(joint_names)
+    queue = [root_idx]
+    visited = {root_idx}
+
+    while queue:
+        current = queue.pop(0)
+        for nb in adjacency[current]:
+            if nb in visited:
+                continue
+            parents[nb] = current
+            visited.add(nb)
+            queue.append(nb)
+
+    return joint_names, parents
+
+
+MHR70_NAMES, _ = _build_mhr70_skeleton()
+MHR70_NAME_TO_IDX = {name: idx for idx, name in enumerate(MHR70_NAMES)}
+KEYPOINT_NAMES = tuple(MHR70_NAME_TO_IDX)
+KEYPOINT_INDICES = np.array(list(MHR70_NAME_TO_IDX.values()), dtype=np.int64)
+
+# Use ALL keypoint names for animation targets (including fingers)
+ANIMATION_NAMES = MHR70_NAMES
+
+
+def extract_mhr_template(mhr_module, max_influences=4, cache_dir=None):
+    """Extract skeleton and skinning data from MHR module.
+
+    The template is derived from the MHR buffers only, so when `cache_dir` is
+    given it is stored there as an .npz keyed by the buffers' checksum and
+    reloaded on later starts.
+    """
+    buffer_names = {
+        "joint_parents": "character_torch.skeleton.joint_parents",
+        "joint_offsets": "character_torch.skeleton.joint_translation_offsets",
+        "rest_vertices": "character_torch.mesh.rest_vertices",
+        "vert_indices": "character_torch.linear_blend_skinning.vert_indices_flattened",
+        "skin_indices": "character_torch.linear_blend_skinning.skin_indices_flattened",
+        "skin_weights": "character_torch.linear_blend_skinning.skin_weights_flattened",
+    }
+    named_buffers = dict(mhr_module.named_buffers())
+    buffers = {key: named_buffers[name].detach().cpu().numpy() for key, name in buffer_names.items()}
+
+    cache_path = None
+    if cache_dir is not None:
+        checksum = buffer_checksum(buffers, max_influences, len(MHR70_NAMES))
+        cache_path = Path(cache_dir) / f"mhr_template_{checksum[:24]}.npz"
+        cached = load_template_npz(cache_path)
+        if cached is not None:
+            print(f"[Extract] Loaded cached template from {cache_path}")
+            return cached
+
+    joint_parents = buffers["joint_parents"].astype(np.int32)
+    joint_offsets = rotate_points_x(buffers["joint_offsets"] / 100.0)
+    num_vertices = int(buffers["rest_vertices"].shape[0])
+
+    skin_index_array, skin_weight_array = top_k_influences(
+        buffers["vert_indices"],
+        buffers["skin_indices"],
+        buffers["skin_weights"],
+        num_vertices,
+        max_influences=max_influences,
+    )
+
+    # Use MHR70_NAMES for proper joint naming instead of generic joint_{idx}
+    joint_names = MHR70_NAMES[:len(joint_parents)] if len(MHR70_NAMES) >= len(joint_parents) else [f"joint_{idx}" for idx in range(len(joint_parents))]
+    root_index = int(np.where(joint_parents == -1)[0][0])
+
+    print(f"[Extract] Using {len(joint_names)} joint names from MHR70_NAMES")
+    print(f"[Extract] Sample joint names: {joint_names[:10]}")
+
+    template = {
+        "joint_names": joint_names,
+        "joint_parents": joint_parents,
+        "joint_offsets": joint_offsets,
+        "skin_indices": skin_index_array,
+        "skin_weights": skin_weight_array,
+        "root_index": root_index,
+    }
+    if cache_path is not None:
+        try:
+            save_template_npz(cache_path, template)
+            print(f"[Extract] Cached template at {cache_path}")
+        except OSError as exc:
+            print(f"[Extract] Could not cache template: {exc}")
+    return template
+
+
+def match_keypoints_to_joints(keypoints, joint_positions):
+    """Map semantic keypoints to their nearest skeleton joints for all persons at once.
+
+    `keypoints` is (P, K, 3) and `joint_positions` is (P, J, 3). Returns a
+    (P, len(KEYPOINT_NAMES)) int array of joint indices, ordered like
+    `KEYPOINT_NAMES`, with -1 for keypoints the estimator did not provide.
+    """
+    num_persons = keypoints.shape[0]
+    available = KEYPOINT_INDICES < keypoints.shape[1]
+    nearest = np.full((num_persons, len(KEYPOINT_INDICES)), -1, dtype=np.int64)
+    if num_persons == 0 or not available.any():
+        return nearest
+
+    targets = keypoints[:, KEYPOINT_INDICES[available]]
+    # (P, K, J) squared distances; argmin is the same as for the norm
+    deltas = targets[:, :, None, :] - joint_positions[:, None, :, :]
+    nearest[:, available] = np.einsum("pkjc,pkjc->pkj", deltas, deltas).argmin(axis=2)
+    return nearest
+
+
+def prepare_person_rigs(predictions, template):
+    """Prepare rig arrays for every person of a session in one pass."""
+    num_joints = template["joint_parents"].shape[0]
+    vertices = np.stack([np.asarray(p["pred_vertices"], dtype=np.float32) for p in predictions])
+    joint_positions = np.stack([
+        np.asarray(p["pred_joint_coords"], dtype=np.float32)[:num_joints] for p in predictions
+    ])
+    keypoints = np.stack([np.asarray(p["pred_keypoints_3d"], dtype=np.float32) for p in predictions])
+    cam_t = np.stack([
+        np.asarray(p["pred_cam_t"], dtype=np.float32) if p.get("pred_cam_t") is not None
+        else np.zeros(3, dtype=np.float32)
+        for p in predictions
+    ])
+
+    # Re-centering on the camera-space root cancels the camera translation,
+    # which only survives in the root offset itself.
+    root_joint = joint_positions[:, template["root_index"]]
+    root_offset = root_joint + cam_t
+    shift = -root_joint[:, None, :]
+
+    vertices = rotate_points_x(vertices + shift)
+    joint_positions = rotate_points_x(joint_positions + shift)
+    keypoints = rotate_points_x(keypoints + shift)
+    root_offset = rotate_points_x(root_offset)
+
+    return {
+        "vertices": np.round(vertices, 6),
+        "joint_positions": np.round(joint_positions, 6),
+        "keypoints": np.round(keypoints, 6),
+        "target_indices": match_keypoints_to_joints(keypoints, joint_positions),
+        "root_offset": root_offset,
+        "focal_length": np.array([float(p["focal_length"]) for p in predictions], dtype=np.float32),
+        "bbox": np.stack([np.asarray(p["bbox"], dtype=np.float32) for p in predictions]),
+    }
@@ -0,0 +1,96 @@
+import hashlib
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+
+def result_cache_key(image_bytes: bytes, settings: Iterable) -> str:
+    """Content address of an upload under a given set of processing settings."""
+    digest = hashlib.sha256(image_bytes)
+    for value in settings:
+        digest.update(b"\x00")
+        digest.update(str(value).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk index from upload content keys to completed sessions.
+
+    Entries record the session holding the result and the bytes its
+    artifacts occupy. When the total exceeds ``max_bytes`` the least
+    recently used entries are dropped from the index; the sessions
+    themselves are left to the session store's own eviction.
+    """
+
+    def __init__(self, db_path, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.max_bytes = int(max_bytes)
+        self._lock = Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                cache_key TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                nbytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_session_id ON results (session_id)")
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """Session id holding the result for ``cache_key``, marking it recently used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT session_id FROM results WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE results SET accessed_at = ? WHERE cache_key = ?", (time.time(), cache_key)
+            )
+            return row[0]
+
+    def put(self, cache_key: str, session_id: str, nbytes: int) -> List[str]:
+        """Record a result; returns the keys evicted to stay within ``max_bytes``."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (cache_key, session_id, nbytes, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key, session_id, int(nbytes), now, now),
+            )
+            return self._evict_over_budget()
+
+    def discard(self, cache_key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM results WHERE cache_key = ?", (cache_key,))
+
+    def discard_session(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM results WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def _evict_over_budget(self) -> List[str]:
+        evicted = []
+        total = self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return evicted
+        for cache_key, nbytes in self._db.execute(
+            "SELECT cache_key, nbytes FROM results ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM results WHERE cache_key = ?", (cache_key,))
+            evicted.append(cache_key)
+            total -= nbytes
+        return evicted
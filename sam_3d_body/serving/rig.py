@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .quantize import encode_array, quantize_positions
+
+# Top-level sections of a person payload, selectable with ``fields``
+RIG_FIELDS = ("mesh", "skeleton", "animation_targets", "keypoints", "metadata")
+
+
+def freeze_template(template: Dict[str, Any]) -> Dict[str, Any]:
+    """Make a rig template's arrays read-only so sessions can share it safely."""
+    for key, value in template.items():
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        elif isinstance(value, list):
+            template[key] = tuple(value)
+    return template
+
+
+@dataclass(frozen=True)
+class PersonRig:
+    """Compact per-person rig held by sessions between requests.
+
+    Only the arrays that differ between persons are stored, as float32.
+    Faces, skinning and the joint hierarchy stay in the shared ``template``,
+    which every session references instead of copying. JSON serialization
+    happens in :meth:`to_payload`, at response time.
+    """
+
+    template: Mapping[str, Any]
+    vertices: np.ndarray
+    joint_positions: np.ndarray
+    keypoints: np.ndarray
+    keypoint_names: Tuple[str, ...]
+    joint_names: Tuple[str, ...]
+    animation_targets: Mapping[str, int]
+    focal_length: float
+    bbox: np.ndarray
+    root_translation: np.ndarray
+
+    @property
+    def template_hash(self) -> str:
+        return self.template["template_hash"]
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.vertices.nbytes
+            + self.joint_positions.nbytes
+            + self.keypoints.nbytes
+            + self.bbox.nbytes
+            + self.root_translation.nbytes
+        )
+
+    def to_payload(
+        self,
+        json_ready: bool = True,
+        quantized: bool = False,
+        fields: Optional[Collection[str]] = None,
+    ) -> Dict[str, Any]:
+        """Person rig payload; ``json_ready=False`` keeps numpy arrays.
+
+        With ``quantized=True`` the positions are int16 against the person's
+        bounding box (see :meth:`to_quantized_payload`). ``fields`` limits the
+        payload to those :data:`RIG_FIELDS` sections (``None`` = all); only
+        the requested sections are built.
+        """
+        if quantized:
+            return self.to_quantized_payload(fields)
+        if fields is None:
+            fields = RIG_FIELDS
+        convert = (lambda array: array.tolist()) if json_ready else (lambda array: array)
+        payload: Dict[str, Any] = {"template": self.template_hash}
+        if "mesh" in fields:
+            payload["mesh"] = {
+                "vertices": convert(self.vertices),
+            }
+        if "skeleton" in fields:
+            payload["skeleton"] = {
+                "joint_names": list(self.joint_names),
+                "joint_positions": convert(self.joint_positions),
+            }
+        if "animation_targets" in fields:
+            payload["animation_targets"] = dict(self.animation_targets)
+        if "keypoints" in fields:
+            payload["keypoints"] = [
+                {"name": name, "position": convert(self.keypoints[idx])}
+                for idx, name in enumerate(self.keypoint_names)
+            ]
+        if "metadata" in fields:
+            payload["metadata"] = {
+                "focal_length": self.focal_length,
+                "bbox": self.bbox.tolist(),
+                "root_translation": self.root_translation.tolist(),
+            }
+        return payload
+
+    def to_quantized_payload(self, fields: Optional[Collection[str]] = None) -> Dict[str, Any]:
+        """Compact payload with int16 positions.
+
+        Vertices and joint positions are base64-encoded little-endian int16
+        triples, keypoint positions are int16 lists. All share the person's
+        ``quantization`` parameters: ``position = q * scale + offset``,
+        computed over the position arrays included by ``fields``.
+        """
+        if fields is None:
+            fields = RIG_FIELDS
+        positions = {"mesh": self.vertices, "skeleton": self.joint_positions, "keypoints": self.keypoints}
+        included = [name for name in positions if name in fields]
+        payload = self.to_payload(json_ready=False, fields=fields)
+        if not included:
+            return payload
+
+        quantized, offset, scale = quantize_positions(*(positions[name] for name in included))
+        quantized = dict(zip(included, quantized))
+        payload["encoding"] = "int16"
+        payload["quantization"] = {"offset": offset.tolist(), "scale": scale.tolist()}
+        if "mesh" in quantized:
+            payload["mesh"]["vertices"] = encode_array(quantized["mesh"])
+        if "skeleton" in quantized:
+            payload["skeleton"]["joint_positions"] = encode_array(quantized["skeleton"])
+        if "keypoints" in quantized:
+            payload["keypoints"] = [
+                {"name": name, "position": quantized["keypoints"][idx].tolist()}
+                for idx, name in enumerate(self.keypoint_names)
+            ]
+        return payload
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any], template: Mapping[str, Any]) -> "PersonRig":
+        """Rebuild a person rig from a serialized payload (e.g. person_N_rig.json)."""
+        mesh = payload.get("mesh") or {}
+        skeleton = payload.get("skeleton") or {}
+        metadata = payload.get("metadata") or {}
+        keypoints = payload.get("keypoints") or []
+        return cls(
+            template=template,
+            vertices=np.asarray(mesh.get("vertices", []), dtype=np.float32).reshape(-1, 3),
+            joint_positions=np.asarray(skeleton.get("joint_positions", []), dtype=np.float32).reshape(-1, 3),
+            keypoints=np.asarray([entry["position"] for entry in keypoints], dtype=np.float32).reshape(-1, 3),
+            keypoint_names=tuple(entry["name"] for entry in keypoints),
+            joint_names=tuple(skeleton.get("joint_names", [])),
+            animation_targets={name: int(idx) for name, idx in (payload.get("animation_targets") or {}).items()},
+            focal_length=float(metadata.get("focal_length", 0.0)),
+            bbox=np.asarray(metadata.get("bbox", []), dtype=np.float32),
+            root_translation=np.asarray(metadata.get("root_translation", [0.0, 0.0, 0.0]), dtype=np.float32),
+        )
@@ -0,0 +1,307 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Metadata columns persisted in the index; everything else lives in the cache.
+# New columns are added to existing databases on startup.
+SESSION_COLUMNS = {
+    "session_id": "TEXT PRIMARY KEY",
+    "status": "TEXT NOT NULL",
+    "created_at": "REAL NOT NULL",
+    "updated_at": "REAL NOT NULL",
+    "accessed_at": "REAL NOT NULL",
+    "filepath": "TEXT",
+    "session_dir": "TEXT",
+    "original_filename": "TEXT",
+    "num_persons": "INTEGER NOT NULL DEFAULT 0",
+    "error": "TEXT",
+    "cache_key": "TEXT",
+    # Bytes of the upload plus exported files; NULL for sessions not yet measured
+    "disk_bytes": "INTEGER",
+}
+SESSION_FIELDS = tuple(SESSION_COLUMNS)
+# Stay well below SQLite's limit on bound parameters per statement
+_QUERY_CHUNK = 500
+
+RigLoader = Callable[[Dict[str, Any]], Optional[Tuple[Any, int]]]
+
+
+class SessionStore:
+    """Session registry backed by SQLite with an LRU cache of rig payloads.
+
+    Session metadata (status, paths, timestamps) is stored in an SQLite index
+    so it survives restarts. Rig payloads are kept in memory only while they
+    fit in ``max_cache_bytes``; on a cache miss ``loader`` is called with the
+    session metadata and must return ``(payload, nbytes)`` rehydrated from
+    disk, or ``None`` when nothing is available. Sessions not accessed for
+    ``ttl_seconds`` are no longer returned by :meth:`get`; :meth:`expire`
+    (run by the storage janitor) drops them from the index and calls
+    ``on_evict`` with their metadata so the caller can clean up files.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        loader: Optional[RigLoader] = None,
+        max_cache_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 24 * 3600,
+        on_evict: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.loader = loader
+        self.max_cache_bytes = int(max_cache_bytes)
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.on_evict = on_evict
+
+        self._lock = RLock()
+        self._cache: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._cache_bytes = 0
+
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = ",\n".join(f"{name} {ddl}" for name, ddl in SESSION_COLUMNS.items())
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS sessions ({columns})")
+        existing = {row["name"] for row in self._db.execute("PRAGMA table_info(sessions)")}
+        for name, ddl in SESSION_COLUMNS.items():
+            if name not in existing:
+                self._db.execute(f"ALTER TABLE sessions ADD COLUMN {name} {ddl}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_accessed_at ON sessions (accessed_at)")
+
+    # ------------------------------------------------------------------
+    # Metadata index
+    # ------------------------------------------------------------------
+
+    def register(self, session_id: str, **fields) -> Dict[str, Any]:
+        now = time.time()
+        record = {field: None for field in SESSION_FIELDS}
+        record.update(
+            session_id=session_id,
+            status="queued",
+            created_at=now,
+            updated_at=now,
+            accessed_at=now,
+            num_persons=0,
+        )
+        record.update({key: value for key, value in fields.items() if key in SESSION_FIELDS})
+        columns = ", ".join(SESSION_FIELDS)
+        placeholders = ", ".join("?" for _ in SESSION_FIELDS)
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO sessions ({columns}) VALUES ({placeholders})",
+                [record[field] for field in SESSION_FIELDS],
+            )
+            self._drop_cached(session_id)
+        return record
+
+    def update(self, session_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Update metadata; a ``rig_data=(payload, nbytes)`` entry is cached."""
+        rig_data = fields.pop("rig_data", None)
+        now = time.time()
+        fields = {key: value for key, value in fields.items() if key in SESSION_FIELDS and key != "session_id"}
+        fields["updated_at"] = now
+        fields["accessed_at"] = now
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE sessions SET {assignments} WHERE session_id = ?",
+                [*fields.values(), session_id],
+            )
+            if cursor.rowcount == 0:
+                return None
+            if rig_data is not None:
+                payload, nbytes = rig_data
+                self._put_cached(session_id, payload, nbytes)
+            return self._fetch(session_id)
+
+    def get(self, session_id: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._fetch(session_id)
+            if record is None or self._is_expired(record):
+                return None
+            if touch:
+                record["accessed_at"] = time.time()
+                self._db.execute(
+                    "UPDATE sessions SET accessed_at = ? WHERE session_id = ?",
+                    (record["accessed_at"], session_id),
+                )
+            return record
+
+    def get_many(self, session_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Metadata for several sessions, keyed by id; does not touch access times."""
+        records = {}
+        session_ids = list(session_ids)
+        with self._lock:
+            for start in range(0, len(session_ids), _QUERY_CHUNK):
+                chunk = session_ids[start:start + _QUERY_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self._db.execute(
+                    f"SELECT * FROM sessions WHERE session_id IN ({placeholders})", chunk
+                ).fetchall()
+                records.update((row["session_id"], dict(row)) for row in rows)
+        return records
+
+    def annotate(self, session_id: str, **fields) -> None:
+        """Update metadata without counting as an access or a state change."""
+        fields = {key: value for key, value in fields.items() if key in SESSION_FIELDS and key != "session_id"}
+        if not fields:
+            return
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE sessions SET {assignments} WHERE session_id = ?",
+                [*fields.values(), session_id],
+            )
+
+    def add_disk_bytes(self, session_id: str, nbytes: int) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE sessions SET disk_bytes = COALESCE(disk_bytes, 0) + ? WHERE session_id = ?",
+                (int(nbytes), session_id),
+            )
+
+    def disk_usage(self) -> int:
+        """Total ``disk_bytes`` of all sessions (unmeasured sessions count as 0)."""
+        with self._lock:
+            row = self._db.execute("SELECT COALESCE(SUM(disk_bytes), 0) FROM sessions").fetchone()
+        return int(row[0])
+
+    def list_finished(
+        self,
+        limit: int = 100,
+        with_upload: bool = False,
+        unmeasured: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Completed/failed sessions, least recently accessed first.
+
+        ``with_upload`` keeps only sessions whose upload is still recorded and
+        ``unmeasured`` only those without ``disk_bytes``.
+        """
+        conditions = ["status IN ('completed', 'failed')"]
+        if with_upload:
+            conditions.append("filepath IS NOT NULL")
+        if unmeasured:
+            conditions.append("disk_bytes IS NULL")
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM sessions WHERE {' AND '.join(conditions)} ORDER BY accessed_at LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_by_status(self, *statuses: str) -> List[Dict[str, Any]]:
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM sessions WHERE status IN ({placeholders}) ORDER BY created_at",
+                statuses,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._drop_cached(session_id)
+
+    # ------------------------------------------------------------------
+    # Rig payload cache
+    # ------------------------------------------------------------------
+
+    def peek_rig_data(self, session_id: str) -> Optional[Any]:
+        """Cached rig data of a session, without calling the loader on a miss."""
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is None:
+                return None
+            self._cache.move_to_end(session_id)
+            return cached[0]
+
+    def get_rig_data(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None:
+                self._cache.move_to_end(session_id)
+                return cached[0]
+            record = self._fetch(session_id)
+
+        if record is None or self.loader is None:
+            return None
+        loaded = self.loader(record)
+        if loaded is None:
+            return None
+        payload, nbytes = loaded
+        with self._lock:
+            self._put_cached(session_id, payload, nbytes)
+        return payload
+
+    def cache_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "bytes": self._cache_bytes,
+                "max_bytes": self.max_cache_bytes,
+            }
+
+    def _put_cached(self, session_id: str, payload: Any, nbytes: int) -> None:
+        self._drop_cached(session_id)
+        if nbytes > self.max_cache_bytes:
+            return
+        self._cache[session_id] = (payload, nbytes)
+        self._cache_bytes += nbytes
+        while self._cache_bytes > self.max_cache_bytes and self._cache:
+            _, (_, evicted_bytes) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted_bytes
+
+    def _drop_cached(self, session_id: str) -> None:
+        cached = self._cache.pop(session_id, None)
+        if cached is not None:
+            self._cache_bytes -= cached[1]
+
+    # ------------------------------------------------------------------
+    # TTL eviction
+    # ------------------------------------------------------------------
+
+    def expire(self) -> List[Dict[str, Any]]:
+        """Drop sessions idle for longer than the TTL; returns their metadata."""
+        if self.ttl_seconds is None:
+            return []
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM sessions WHERE accessed_at < ? AND status NOT IN ('queued', 'processing')",
+                (cutoff,),
+            ).fetchall()
+            expired = [dict(row) for row in rows]
+            for record in expired:
+                self.delete(record["session_id"])
+        self._cleanup(expired)
+        return expired
+
+    def evict(self, records: List[Dict[str, Any]]) -> None:
+        """Drop sessions from the index and call ``on_evict`` for each."""
+        with self._lock:
+            for record in records:
+                self.delete(record["session_id"])
+        self._cleanup(records)
+
+    def _is_expired(self, record: Dict[str, Any]) -> bool:
+        if self.ttl_seconds is None or record["status"] in ("queued", "processing"):
+            return False
+        return record["accessed_at"] < time.time() - self.ttl_seconds
+
+    def _cleanup(self, records: List[Dict[str, Any]]) -> None:
+        """Run ``on_evict`` for dropped sessions; never called under ``_lock``,
+        so file deletion does not block other store users."""
+        if self.on_evict is None:
+            return
+        for record in records:
+            try:
+                self.on_evict(record)
+            except Exception as exc:
+                print(f"[SessionStore] Cleanup failed for {record['session_id']}: {exc}")
+
+    def _fetch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return dict(row) if row is not None else None
@@ -0,0 +1,93 @@
+import hashlib
+import io
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .writer import atomic_write_bytes
+
+# Bump when the cached template layout or its derivation changes.
+TEMPLATE_CACHE_VERSION = 1
+
+_ARRAY_KEYS = ("joint_parents", "joint_offsets", "skin_indices", "skin_weights")
+
+
+def top_k_influences(
+    vert_indices: np.ndarray,
+    joint_indices: np.ndarray,
+    weights: np.ndarray,
+    num_vertices: int,
+    max_influences: int = 4,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the ``max_influences`` strongest joints per vertex from flat skinning triples.
+
+    Returns ``(num_vertices, max_influences)`` joint index and weight arrays.
+    Weights are renormalized per vertex; vertices without influences keep
+    all-zero rows. Ties keep the order of the input triples.
+    """
+    vert_indices = np.asarray(vert_indices, dtype=np.int64)
+    joint_indices = np.asarray(joint_indices, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float32)
+    valid = (vert_indices >= 0) & (vert_indices < num_vertices)
+    if not valid.all():
+        vert_indices, joint_indices, weights = vert_indices[valid], joint_indices[valid], weights[valid]
+
+    # Group by vertex, strongest weight first within each group
+    order = np.lexsort((-weights, vert_indices))
+    vert_sorted = vert_indices[order]
+    group_starts = np.flatnonzero(np.r_[True, vert_sorted[1:] != vert_sorted[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(vert_sorted)])
+    rank = np.arange(len(vert_sorted)) - np.repeat(group_starts, group_sizes)
+    keep = rank < max_influences
+    kept = order[keep]
+
+    skin_indices = np.zeros((num_vertices, max_influences), dtype=np.int32)
+    skin_weights = np.zeros((num_vertices, max_influences), dtype=np.float32)
+    skin_indices[vert_sorted[keep], rank[keep]] = joint_indices[kept]
+    skin_weights[vert_sorted[keep], rank[keep]] = weights[kept]
+
+    totals = skin_weights.sum(axis=1, keepdims=True)
+    totals[totals == 0] = 1.0
+    skin_weights /= totals
+    return skin_indices, skin_weights
+
+
+def buffer_checksum(buffers: Mapping[str, np.ndarray], *extra: Any) -> str:
+    """Stable digest of named arrays (name, dtype, shape and contents) plus ``extra`` values."""
+    digest = hashlib.sha256(f"v{TEMPLATE_CACHE_VERSION}".encode("utf-8"))
+    for name in sorted(buffers):
+        array = np.ascontiguousarray(buffers[name])
+        digest.update(f"\x00{name}\x00{array.dtype.str}\x00{array.shape}\x00".encode("utf-8"))
+        digest.update(array.tobytes())
+    for value in extra:
+        digest.update(f"\x00{value}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_template_npz(path, template: Mapping[str, Any]) -> None:
+    """Persist a rig template (arrays, joint names and root index) atomically."""
+    stream = io.BytesIO()
+    np.savez(
+        stream,
+        joint_names=np.asarray(list(template["joint_names"]), dtype=np.str_),
+        root_index=np.asarray(template["root_index"], dtype=np.int64),
+        **{key: np.asarray(template[key]) for key in _ARRAY_KEYS},
+    )
+    atomic_write_bytes(path, stream.getvalue())
+
+
+def load_template_npz(path) -> Optional[Dict[str, Any]]:
+    """Load a template written by :func:`save_template_npz`; ``None`` if missing or unreadable."""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            template = {key: data[key] for key in _ARRAY_KEYS}
+            template["joint_names"] = [str(name) for name in data["joint_names"]]
+            template["root_index"] = int(data["root_index"])
+    except Exception as exc:
+        print(f"[Template] Ignoring unreadable template cache {path}: {exc}")
+        return None
+    return template
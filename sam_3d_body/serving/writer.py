@@ -0,0 +1,98 @@
+import os
+import tempfile
+from pathlib import Path
+from queue import Queue
+from threading import Condition, Thread
+from typing import Callable, Dict, Optional, Set, Union
+
+PathLike = Union[str, Path]
+FileRenderer = Callable[[], Dict[PathLike, bytes]]
+
+
+def atomic_write_bytes(path: PathLike, data: bytes) -> None:
+    """Write ``data`` to ``path`` so readers never observe a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class AsyncFileWriter:
+    """Serialize and persist files on a background thread.
+
+    :meth:`submit` queues a renderer returning ``{path: bytes}`` under a key
+    (e.g. a session id) and returns immediately; serialization and I/O both
+    happen on the writer thread. Files are written with an atomic rename.
+    Readers that need the files call :meth:`wait` with the same key.
+    ``on_written(key, nbytes)`` is called after each batch of files lands.
+    Before deleting a key's files, call :meth:`discard` so no queued write
+    recreates them afterwards.
+    """
+
+    def __init__(self, name: str = "rig-writer", on_written: Optional[Callable[[str, int], None]] = None):
+        self._queue: "Queue[tuple]" = Queue()
+        self._pending: Dict[str, int] = {}
+        self._discarded: Set[str] = set()
+        self._active: Optional[str] = None
+        self._cond = Condition()
+        self.on_written = on_written
+        self._thread = Thread(target=self._run, daemon=True, name=name)
+        self._thread.start()
+
+    def submit(self, key: str, render: FileRenderer) -> None:
+        with self._cond:
+            self._pending[key] = self._pending.get(key, 0) + 1
+        self._queue.put((key, render))
+
+    def pending(self, key: str) -> bool:
+        with self._cond:
+            return self._pending.get(key, 0) > 0
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> bool:
+        """Block until all writes queued under ``key`` finished; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending.get(key, 0) == 0, timeout)
+
+    def discard(self, key: str) -> None:
+        """Skip writes still queued under ``key`` and wait for one in progress."""
+        with self._cond:
+            if self._pending.get(key, 0) > 0:
+                self._discarded.add(key)
+            self._cond.wait_for(lambda: self._active != key)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            key, render = self._queue.get()
+            with self._cond:
+                skip = key in self._discarded
+                if not skip:
+                    self._active = key
+            try:
+                if not skip:
+                    written = 0
+                    for path, data in render().items():
+                        atomic_write_bytes(path, data)
+                        written += len(data)
+                    if self.on_written is not None:
+                        self.on_written(key, written)
+            except Exception as exc:
+                print(f"[Writer] Failed to persist files for {key}: {exc}")
+            finally:
+                with self._cond:
+                    self._active = None
+                    remaining = self._pending.get(key, 1) - 1
+                    if remaining > 0:
+                        self._pending[key] = remaining
+                    else:
+                        self._pending.pop(key, None)
+                        self._discarded.discard(key)
+                    self._cond.notify_all()
@@ -15,6 +15,7 @@ class HumanDetector:
             print("########### Using human detector: ViTDet...")
             self.detector = load_detectron2_vitdet(**kwargs)
             self.detector_func = run_detectron2_vitdet
+            self.detector_batch_func = run_detectron2_vitdet_batch
 
             self.detector = self.detector.to(self.device)
             self.detector.eval()
@@ -24,6 +25,9 @@ class HumanDetector:
     def run_human_detection(self, img, **kwargs):
         return self.detector_func(self.detector, img, **kwargs)
 
+    def run_human_detection_batch(self, imgs, **kwargs):
+        return self.detector_batch_func(self.detector, imgs, **kwargs)
+
 
 def load_detectron2_vitdet(path=""):
     """
@@ -65,33 +69,56 @@ def run_detectron2_vitdet(
     nms_thr: float = 0.3,
     default_to_full_image: bool = True,
 ):
-    import detectron2.data.transforms as T
+    return run_detectron2_vitdet_batch(
+        detector,
+        [img],
+        det_cat_id=det_cat_id,
+        bbox_thr=bbox_thr,
+        nms_thr=nms_thr,
+        default_to_full_image=default_to_full_image,
+    )[0]
 
-    height, width = img.shape[:2]
+
+def run_detectron2_vitdet_batch(
+    detector,
+    imgs,
+    det_cat_id: int = 0,
+    bbox_thr: float = 0.5,
+    nms_thr: float = 0.3,
+    default_to_full_image: bool = True,
+):
+    """Detect humans in several BGR images with a single detector forward."""
+    import detectron2.data.transforms as T
 
     IMAGE_SIZE = 1024
     transforms = T.ResizeShortestEdge(short_edge_length=IMAGE_SIZE, max_size=IMAGE_SIZE)
-    img_transformed = transforms(T.AugInput(img)).apply_image(img)
-    img_transformed = torch.as_tensor(
-        img_transformed.astype("float32").transpose(2, 0, 1)
-    )
-    inputs = {"image": img_transformed, "height": height, "width": width}
+    inputs = []
+    for img in imgs:
+        height, width = img.shape[:2]
+        img_transformed = transforms(T.AugInput(img)).apply_image(img)
+        img_transformed = torch.as_tensor(
+            img_transformed.astype("float32").transpose(2, 0, 1)
+        )
+        inputs.append({"image": img_transformed, "height": height, "width": width})
 
     with torch.no_grad():
-        det_out = detector([inputs])
-
-    det_instances = det_out[0]["instances"]
-    valid_idx = (det_instances.pred_classes == det_cat_id) & (
-        det_instances.scores > bbox_thr
-    )
-    if valid_idx.sum() == 0 and default_to_full_image:
-        boxes = np.array([0, 0, width, height]).reshape(1, 4)
-    else:
-        boxes = det_instances.pred_boxes.tensor[valid_idx].cpu().numpy()
-
-    # Sort boxes to keep a consistent output order
-    sorted_indices = np.lexsort(
-        (boxes[:, 3], boxes[:, 2], boxes[:, 1], boxes[:, 0])
-    )  # shape: [len(boxes),]
-    boxes = boxes[sorted_indices]
-    return boxes
+        det_outs = detector(inputs)
+
+    all_boxes = []
+    for img, det_out in zip(imgs, det_outs):
+        height, width = img.shape[:2]
+        det_instances = det_out["instances"]
+        valid_idx = (det_instances.pred_classes == det_cat_id) & (
+            det_instances.scores > bbox_thr
+        )
+        if valid_idx.sum() == 0 and default_to_full_image:
+            boxes = np.array([0, 0, width, height]).reshape(1, 4)
+        else:
+            boxes = det_instances.pred_boxes.tensor[valid_idx].cpu().numpy()
+
+        # Sort boxes to keep a consistent output order
+        sorted_indices = np.lexsort(
+            (boxes[:, 3], boxes[:, 2], boxes[:, 1], boxes[:, 0])
+        )  # shape: [len(boxes),]
+        all_boxes.append(boxes[sorted_indices])
+    return all_boxes